@@ -2,14 +2,14 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from typing import Optional
-import google.auth.transport.requests
-import google.oauth2.id_token
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from supabase import Client
 
 from app.core.database import get_db
 from app.core.config import get_settings
+from app.services.google_token_verifier import get_google_token_verifier
+from app.services.user_principal_cache import get_user_principal_cache
 
 router = APIRouter()
 
@@ -52,19 +52,8 @@ def verify_google_token(token: str) -> dict:
         )
     
     try:
-        request = google.auth.transport.requests.Request()
-        id_info = google.oauth2.id_token.verify_oauth2_token(
-            token, 
-            request, 
-            settings.google_client_id,
-            clock_skew_in_seconds=10  # 시간 동기화 차이 허용 (10초)
-        )
-        
-        # 구글 토큰 검증
-        if id_info.get('iss') not in ['accounts.google.com', 'https://accounts.google.com']:
-            raise ValueError(f'Wrong issuer: {id_info.get("iss")}')
-            
-        return id_info
+        # 캐시된 구글 공개 인증서로 로컬 검증 (서명, 만료, audience, issuer)
+        return get_google_token_verifier().verify(token)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -139,6 +128,9 @@ async def get_or_create_user(db: Client, google_user_info: dict) -> dict:
                 'name': name,
                 'picture': picture
             }).eq('id', user['id']).execute()
+            # 프로필이 바뀌었으므로 캐시된 사용자 정보를 갱신
+            user = {**user, 'name': name, 'picture': picture}
+            get_user_principal_cache().set(user)
             return user
     except Exception as e:
         # 조회 실패 시 계속 진행 (새 사용자 생성)
@@ -156,6 +148,7 @@ async def get_or_create_user(db: Client, google_user_info: dict) -> dict:
         result = db.table('users').insert(new_user).execute()
         
         if result.data and len(result.data) > 0:
+            get_user_principal_cache().set(result.data[0])
             return result.data[0]
         else:
             raise HTTPException(
@@ -197,8 +190,13 @@ async def google_login(
     # 사용자 조회 또는 생성
     user = await get_or_create_user(db, google_user_info)
     
-    # JWT 토큰 생성
-    access_token = create_access_token(data={"sub": str(user['id'])})
+    # JWT 토큰 생성 (auth_trust_jwt_claims 사용 시 DB 조회 없이 사용자 정보를 복원할 수 있도록 프로필 클레임 포함)
+    access_token = create_access_token(data={
+        "sub": str(user['id']),
+        "email": user['email'],
+        "name": user.get('name'),
+        "picture": user.get('picture'),
+    })
     
     return TokenResponse(
         access_token=access_token,
@@ -211,13 +209,18 @@ async def google_login(
     )
 
 
-def get_current_user(token: str, db: Client) -> dict:
+def get_current_user(token: str, db: Client, trust_claims: bool = False) -> dict:
     """
     JWT 토큰에서 사용자 정보를 추출하고 검증합니다.
     
+    사용자 행은 UserPrincipalCache에 짧게 캐시되어 대부분의 요청은 DB를 조회하지 않습니다.
+    
     Args:
         token: JWT 토큰
         db: Supabase 클라이언트
+        trust_claims: 자주 호출되는 엔드포인트용. auth_trust_jwt_claims가 켜져 있으면
+            서명된 토큰의 클레임(sub, email, name, picture)만으로 사용자 정보를 만들고 DB를 조회하지 않음
+            (삭제된 사용자도 토큰 만료 전까지 인증되므로 민감한 엔드포인트에는 사용하지 마세요)
         
     Returns:
         사용자 정보 딕셔너리
@@ -244,14 +247,23 @@ def get_current_user(token: str, db: Client) -> dict:
     except JWTError:
         raise credentials_exception
     
-    # DB에서 사용자 조회
+    # 서명된 클레임 신뢰 (프로필 클레임이 없는 이전 토큰은 DB 조회로 처리)
+    if trust_claims and settings.auth_trust_jwt_claims and payload.get("email"):
+        return {
+            "id": user_id,
+            "email": payload["email"],
+            "name": payload.get("name"),
+            "picture": payload.get("picture"),
+        }
+    
+    # 캐시 또는 DB에서 사용자 조회
     try:
-        result = db.table('users').select('*').eq('id', user_id).eq('deleted_at', None).execute()
-        if not result.data or len(result.data) == 0:
-            raise credentials_exception
-        return result.data[0]
+        user = get_user_principal_cache().get(db, user_id)
     except Exception:
         raise credentials_exception
+    if user is None:
+        raise credentials_exception
+    return user
 
 
 @router.get("/me", response_model=UserResponse)
@@ -277,7 +289,8 @@ async def get_current_user_info(
         )
     
     token = authorization.split(" ")[1]
-    user = get_current_user(token, db)
+    # 프론트엔드가 세션 확인용으로 자주 호출하므로 서명된 클레임 신뢰 허용 (auth_trust_jwt_claims)
+    user = get_current_user(token, db, trust_claims=True)
     
     return UserResponse(
         id=str(user['id']),
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from typing import Optional, List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional, List, Tuple
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from pydantic import BaseModel
+import json
 import uuid
 
 from app.core.database import get_db
 from app.core.config import get_settings
+from app.services.admission import AdmissionRejected, get_admission_controller
+from app.services.answer_cache import document_set_version
+from app.services.change_stamps import etag_matches, get_change_stamp_tracker, sync_token_for
+from app.services.llm_metrics import get_llm_stage_metrics
 from app.services.qna_rag_service import QnARAGService
+from app.services.query_jobs import QueryJobQueueFull, get_query_job_manager
+from app.services.resilience import CircuitOpenError, UpstreamUnavailable, resilience_stats
+from app.services.status_broker import TooManySubscriptions, get_document_status_broker
+from app.services.user_principal_cache import get_user_principal_cache
+from app.utils.deadline import Deadline, DeadlineExceeded
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_filter
+from app.utils.singleflight import SingleFlight
+from app.utils.text import normalize_question
 from supabase import Client
 
 router = APIRouter()
@@ -16,9 +31,19 @@ router = APIRouter()
 UPLOAD_DIR = Path("storage")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# 폴더를 지정하지 않은 문서가 저장되는 기본 폴더
+RECENT_FOLDER_NAME = "최근 문서함"
+
+# 문서 상태 및 목록 조회 시 반환할 컬럼 (대시보드 표시용)
+DOCUMENT_STATUSES = ("uploaded", "processing", "completed", "failed")
+DOCUMENT_LIST_COLUMNS = "id, folder_id, original_filename, content_type, file_size, status, created_at, updated_at"
+
 # RAG 서비스 인스턴스 (싱글톤 패턴)
 _rag_service: Optional[QnARAGService] = None
 
+# 동시에 들어온 같은 질문 요청 병합
+_query_single_flight = SingleFlight()
+
 
 def get_rag_service() -> QnARAGService:
     """RAG 서비스 인스턴스 반환 (싱글톤)"""
@@ -34,6 +59,20 @@ def get_rag_service() -> QnARAGService:
     return _rag_service
 
 
+def _update_document_status(
+    db: Client,
+    document_id: str,
+    user_id: Optional[str],
+    status: str,
+    message: Optional[str] = None,
+) -> None:
+    """문서 상태 업데이트 후 상태 구독자에게 전달하고 목록 변경 스탬프 무효화"""
+    # updated_at은 DB 트리거가 now()로 기록 (db/migrations/012)
+    db.table("documents").update({"status": status}).eq("id", document_id).execute()
+    get_change_stamp_tracker().invalidate(user_id)
+    get_document_status_broker().publish(document_id=document_id, user_id=user_id, status=status, message=message)
+
+
 async def index_document_background(
     document_id: str,
     pdf_path: str,
@@ -54,18 +93,12 @@ async def index_document_background(
     
     try:
         # 상태를 'processing'으로 업데이트
-        db.table("documents").update({
-            "status": "processing",
-            "updated_at": datetime.now().isoformat(),
-        }).eq("id", document_id).execute()
+        _update_document_status(db, document_id, user_id, "processing")
         
         # PDF 파일만 인덱싱
         if not pdf_path.lower().endswith('.pdf'):
             print(f"PDF가 아닌 파일은 인덱싱하지 않습니다: {pdf_path}")
-            db.table("documents").update({
-                "status": "completed",
-                "updated_at": datetime.now().isoformat(),
-            }).eq("id", document_id).execute()
+            _update_document_status(db, document_id, user_id, "completed")
             return
         
         # RAG 서비스로 인덱싱 (PDF 단위 인덱싱, folder_id는 무시)
@@ -74,30 +107,35 @@ async def index_document_background(
             document_id=document_id,
             pdf_path=pdf_path,
             folder_id=folder_id,  # 메타데이터용, 인덱스 구조에는 영향 없음
+            user_id=user_id,
+            progress=lambda stage, info: get_document_status_broker().publish(
+                document_id=document_id,
+                user_id=user_id,
+                stage=stage,
+                progress=info,
+            ),
         )
         
         if success:
             # 상태를 'completed'로 업데이트
-            db.table("documents").update({
-                "status": "completed",
-                "updated_at": datetime.now().isoformat(),
-            }).eq("id", document_id).execute()
+            _update_document_status(db, document_id, user_id, "completed")
             print(f"문서 인덱싱 완료: {document_id}")
         else:
             # 상태를 'failed'로 업데이트
-            db.table("documents").update({
-                "status": "failed",
-                "updated_at": datetime.now().isoformat(),
-            }).eq("id", document_id).execute()
+            _update_document_status(db, document_id, user_id, "failed")
             print(f"문서 인덱싱 실패: {document_id}")
             
+    except (AdmissionRejected, UpstreamUnavailable) as e:
+        # LLM 일시 불가: 'uploaded'로 되돌려 배치 인덱싱 스케줄러가 재시도
+        try:
+            _update_document_status(db, document_id, user_id, "uploaded", message=f"LLM 일시 불가로 재시도 대기: {e}")
+        except Exception:
+            pass
+        print(f"문서 인덱싱 보류 (배치 스케줄러에서 재시도): {document_id} - {e}")
     except Exception as e:
         # 에러 발생 시 상태를 'failed'로 업데이트
         try:
-            db.table("documents").update({
-                "status": "failed",
-                "updated_at": datetime.now().isoformat(),
-            }).eq("id", document_id).execute()
+            _update_document_status(db, document_id, user_id, "failed", message=str(e))
         except:
             pass
         print(f"문서 인덱싱 중 에러 발생: {e}")
@@ -190,6 +228,10 @@ async def upload_document(
         # PDF인 경우 백그라운드에서 인덱싱이 시작되면 'processing'으로 변경됨
         initial_status = "uploaded" if file_extension.lower() == "pdf" else "completed"
         
+        # 폴더를 지정하지 않으면 '최근 문서함'에 저장 (폴더 목록 조회 시 문서를 옮기지 않도록)
+        if not folder_id:
+            folder_id = _ensure_recent_folder(db, user_id)
+        
         document_data = {
             "user_id": user_id,
             "folder_id": folder_id,  # folder_id 사용 (NULL 가능)
@@ -199,8 +241,7 @@ async def upload_document(
             "file_size": len(contents),
             "content_type": file.content_type,
             "status": initial_status,  # uploaded, processing, completed, failed
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            # created_at / updated_at은 DB 시계로 기록 (기본값 / db/migrations/012 트리거)
         }
         
         result = db.table("documents").insert(document_data).execute()
@@ -210,6 +251,13 @@ async def upload_document(
         print(f"DB 저장 실패: {e}")
         document_id = None
     
+    # 폴더 구성이 바뀌었으므로 폴더 단위 검색 캐시 및 목록 변경 스탬프 무효화
+    if document_id and folder_id and _rag_service is not None:
+        _rag_service.invalidate_folder_caches(folder_id)
+    if document_id:
+        get_change_stamp_tracker().invalidate(user_id)
+        get_document_status_broker().publish(document_id=document_id, user_id=user_id, status=initial_status)
+    
     # ============================================
     # 2단계: 즉시 응답 반환 (파일 저장 및 DB 저장 완료)
     # 인덱싱은 배치 작업에서 주기적으로 처리됩니다.
@@ -234,18 +282,65 @@ async def upload_document(
 
 @router.get("/list")
 async def list_documents(
+    response: Response,
     user_id: str = "00000000-0000-0000-0000-000000000001",  # UUID 형식
     folder_id: Optional[str] = None,  # UUID 형식
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
     db: Client = Depends(get_db),
 ):
     """
-    사용자의 문서 목록을 조회합니다.
+    사용자의 문서 목록을 조회합니다. (최신순, 커서 기반 페이지네이션)
     
     - **user_id**: 사용자 ID (UUID)
     - **folder_id**: 특정 폴더 ID로 필터링 (선택사항, UUID)
+    - **status**: 상태 필터 (쉼표로 구분, 예: processing,failed)
+    - **limit**: 페이지 크기 (기본값: document_list_page_size, 최대 document_list_max_page_size)
+    - **cursor**: 이전 응답의 next_cursor (없으면 첫 페이지)
+    - **since**: 이전 응답의 sync_token (지정하면 그 이후 변경된 문서만 updated_at 순으로 반환, 삭제된 문서는 deleted_at 포함,
+      늦게 커밋된 변경을 놓치지 않도록 최근 sync_token_lag_seconds 구간의 문서는 다시 올 수 있으므로 id로 병합)
+    
+    응답의 has_more가 true이면 next_cursor(변경분 모드에서는 sync_token)로 다음 페이지를 조회합니다.
+    사용자 데이터가 바뀌지 않았으면 If-None-Match에 대해 304를 반환합니다.
     """
+    settings = get_settings()
+    page_size = limit if limit and limit > 0 else settings.document_list_page_size
+    page_size = min(page_size, settings.document_list_max_page_size)
+    
+    statuses = [value.strip() for value in status.split(",") if value.strip()] if status else []
+    invalid_statuses = [value for value in statuses if value not in DOCUMENT_STATUSES]
+    if invalid_statuses:
+        raise HTTPException(
+            status_code=400,
+            detail=f"알 수 없는 상태입니다: {', '.join(invalid_statuses)} (가능한 값: {', '.join(DOCUMENT_STATUSES)})"
+        )
+    
+    if since and statuses:
+        # 상태가 바뀌어 필터에서 빠진 문서를 알 수 없으므로 변경분 모드에서는 상태 필터를 허용하지 않음
+        raise HTTPException(status_code=400, detail="since와 status는 함께 사용할 수 없습니다.")
+    
     try:
-        query = db.table("documents").select("*").eq("user_id", user_id)
+        after = decode_cursor(cursor)
+        changed_after = decode_cursor(since)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # 사용자 데이터가 바뀌지 않았으면 목록 쿼리 없이 304
+        stamp = get_change_stamp_tracker().get(db, user_id)
+        etag = stamp.etag("list", folder_id, status, page_size, cursor, since)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=_conditional_headers(etag))
+        response.headers.update(_conditional_headers(etag))
+        
+        if changed_after:
+            return _list_document_changes(db, user_id, folder_id, changed_after, page_size)
+        
+        # 대시보드에 필요한 컬럼만 조회
+        query = db.table("documents").select(DOCUMENT_LIST_COLUMNS).eq("user_id", user_id)
         
         # 소프트 딜리트 필터링
         query = query.is_("deleted_at", "null")
@@ -254,15 +349,30 @@ async def list_documents(
         if folder_id:
             query = query.eq("folder_id", folder_id)
         
-        # 생성일 기준 내림차순 정렬
-        query = query.order("created_at", desc=True)
+        # 상태 필터링
+        if statuses:
+            query = query.in_("status", statuses)
+        
+        # 커서 이후 행만 조회 (OFFSET 없이 (created_at, id) 인덱스로 바로 이동)
+        if after:
+            query = query.or_(keyset_filter(*after))
+        
+        # 생성일 기준 내림차순 정렬 (같은 생성일은 id로 순서 고정)
+        # 다음 페이지 존재 여부 확인을 위해 한 행 더 조회
+        query = query.order("created_at", desc=True).order("id", desc=True).limit(page_size + 1)
         
         result = query.execute()
+        rows = result.data or []
+        has_more = len(rows) > page_size
+        documents = rows[:page_size]
         
         return {
             "success": True,
-            "documents": result.data,
-            "count": len(result.data),
+            "documents": documents,
+            "count": len(documents),
+            "has_more": has_more,
+            "next_cursor": encode_cursor(documents[-1]) if has_more else None,
+            "sync_token": stamp.sync_token,  # 이후 since로 변경분만 조회
         }
     except Exception as e:
         raise HTTPException(
@@ -271,119 +381,266 @@ async def list_documents(
         )
 
 
-@router.get("/folders")
-async def list_folders(
-    user_id: str = "00000000-0000-0000-0000-000000000001",  # UUID 형식
-    db: Client = Depends(get_db),
-):
+def _conditional_headers(etag: str) -> dict:
+    """조건부 GET 응답 헤더 (브라우저가 항상 ETag로 재검증하도록 no-cache)"""
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _list_document_changes(
+    db: Client,
+    user_id: str,
+    folder_id: Optional[str],
+    changed_after: Tuple[str, str],
+    page_size: int,
+) -> dict:
     """
-    사용자의 폴더 목록을 조회합니다.
-    '최근 문서함' 폴더가 없으면 자동으로 생성합니다.
+    sync_token 이후 변경된 문서 조회 ((updated_at, id) 오름차순, 소프트 삭제된 문서 포함)
+
+    Returns:
+        문서 목록 응답 (has_more이면 sync_token은 마지막으로 반환한 변경 위치,
+        마지막 페이지이면 그보다 sync_token_lag_seconds 이전 위치)
+    """
+    query = (
+        db.table("documents")
+        .select(f"{DOCUMENT_LIST_COLUMNS}, deleted_at")
+        .eq("user_id", user_id)
+    )
+    if folder_id:
+        query = query.eq("folder_id", folder_id)
+    query = query.or_(keyset_filter(*changed_after, sort_key="updated_at", descending=False))
+    query = query.order("updated_at", desc=False).order("id", desc=False).limit(page_size + 1)
     
-    - **user_id**: 사용자 ID (UUID)
+    result = query.execute()
+    rows = result.data or []
+    has_more = len(rows) > page_size
+    documents = rows[:page_size]
+    
+    if has_more:
+        # 다음 페이지로 진행해야 하므로 정확한 위치
+        sync_token = encode_cursor(documents[-1], sort_key="updated_at")
+    elif documents:
+        # 동기화 완료: 긴 트랜잭션이 늦게 커밋할 수 있는 구간은 다음 동기화에서 다시 확인
+        sync_token = sync_token_for(documents[-1]["updated_at"], get_settings().sync_token_lag_seconds)
+    else:
+        sync_token = encode_cursor({"updated_at": changed_after[0], "id": changed_after[1]}, sort_key="updated_at")
+    
+    return {
+        "success": True,
+        "documents": documents,
+        "count": len(documents),
+        "has_more": has_more,
+        "next_cursor": None,
+        "sync_token": sync_token,
+    }
+
+
+def _ensure_recent_folder(db: Client, user_id: str) -> Optional[str]:
     """
+    '최근 문서함' 폴더를 보장하고 폴더 없이 저장된 루트 문서를 그 폴더로 이동 (멱등)
+
+    ensure_recent_folder RPC(db/migrations/009)를 사용하고, 없으면 같은 동작을 개별 쿼리로 수행합니다.
+    쓰기가 발생하므로 조회 경로에서는 폴더가 처음 없을 때만 호출합니다.
+
+    Returns:
+        '최근 문서함' 폴더 ID (실패 시 None)
+    """
+    try:
+        result = db.rpc("ensure_recent_folder", {"p_user_id": user_id}).execute()
+        if result.data:
+            get_change_stamp_tracker().invalidate(user_id)
+            return result.data if isinstance(result.data, str) else str(result.data)
+    except Exception as e:
+        print(f"ensure_recent_folder RPC 실패, 개별 쿼리로 폴백: {e}")
+
     try:
-        # '최근 문서함' 폴더가 있는지 확인
         recent_folder_result = (
             db.table("folders")
-            .select("*")
+            .select("id")
             .eq("user_id", user_id)
-            .eq("name", "최근 문서함")
+            .eq("name", RECENT_FOLDER_NAME)
             .is_("deleted_at", "null")
+            .order("created_at", desc=False)
+            .limit(1)
             .execute()
         )
-        
-        # '최근 문서함' 폴더가 없으면 생성
-        if not recent_folder_result.data or len(recent_folder_result.data) == 0:
-            new_folder = {
+        if recent_folder_result.data:
+            recent_folder_id = recent_folder_result.data[0]["id"]
+        else:
+            create_result = db.table("folders").insert({
                 "user_id": user_id,
-                "name": "최근 문서함",
+                "name": RECENT_FOLDER_NAME,
                 "parent_id": None,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
-            }
-            create_result = db.table("folders").insert(new_folder).execute()
+            }).execute()
             recent_folder_id = create_result.data[0]["id"] if create_result.data else None
-        else:
-            recent_folder_id = recent_folder_result.data[0]["id"]
-        
-        # folders 테이블에서 사용자의 폴더 조회
-        result = (
-            db.table("folders")
-            .select("*")
-            .eq("user_id", user_id)
-            .is_("deleted_at", "null")
-            .order("created_at", desc=False)
-            .execute()
-        )
         
-        # 각 폴더별 문서 개수 계산
-        folder_list = []
-        for folder in result.data:
-            count_result = (
-                db.table("documents")
-                .select("id", count="exact")
-                .eq("user_id", user_id)
-                .eq("folder_id", folder["id"])
-                .is_("deleted_at", "null")
-                .execute()
-            )
-            folder_list.append({
+        # folder_id가 NULL인 문서들을 '최근 문서함'으로 이동 (기존 루트 폴더 문서들)
+        if recent_folder_id:
+            db.table("documents").update({
+                "folder_id": recent_folder_id,
+            }).eq("user_id", user_id).is_("folder_id", "null").is_("deleted_at", "null").execute()
+            get_change_stamp_tracker().invalidate(user_id)
+        return recent_folder_id
+    except Exception as e:
+        print(f"'{RECENT_FOLDER_NAME}' 준비 실패: {e}")
+        return None
+
+
+def _list_folders_with_counts(db: Client, user_id: str) -> List[dict]:
+    """
+    폴더 목록과 폴더별 문서 수 조회 (읽기 전용)
+
+    list_folders_with_counts RPC(db/migrations/009)로 한 번에 조회하고,
+    없으면 폴더 목록과 문서의 folder_id 목록을 각각 한 번씩 조회하여 집계합니다.
+    """
+    try:
+        result = db.rpc("list_folders_with_counts", {"p_user_id": user_id}).execute()
+        return [
+            {
                 "id": folder["id"],
                 "name": folder["name"],
                 "parent_id": folder.get("parent_id"),
-                "document_count": count_result.count if hasattr(count_result, "count") else len(count_result.data),
+                "document_count": int(folder.get("document_count") or 0),
                 "created_at": folder["created_at"],
-            })
+            }
+            for folder in (result.data or [])
+        ]
+    except Exception as e:
+        print(f"list_folders_with_counts RPC 실패, 개별 쿼리로 폴백: {e}")
+
+    folders_result = (
+        db.table("folders")
+        .select("id, name, parent_id, created_at")
+        .eq("user_id", user_id)
+        .is_("deleted_at", "null")
+        .order("created_at", desc=False)
+        .execute()
+    )
+    docs_result = (
+        db.table("documents")
+        .select("folder_id")
+        .eq("user_id", user_id)
+        .is_("deleted_at", "null")
+        .execute()
+    )
+    counts: Dict[str, int] = {}
+    for doc in docs_result.data or []:
+        folder_id = doc.get("folder_id")
+        if folder_id:
+            counts[folder_id] = counts.get(folder_id, 0) + 1
+    
+    folder_list = [
+        {
+            "id": folder["id"],
+            "name": folder["name"],
+            "parent_id": folder.get("parent_id"),
+            "document_count": counts.get(folder["id"], 0),
+            "created_at": folder["created_at"],
+        }
+        for folder in (folders_result.data or [])
+    ]
+    # '최근 문서함' 폴더를 맨 앞으로 이동 (RPC와 같은 순서)
+    return sorted(folder_list, key=lambda folder: folder["name"] != RECENT_FOLDER_NAME)
+
+
+@router.get("/folders")
+async def list_folders(
+    response: Response,
+    user_id: str = "00000000-0000-0000-0000-000000000001",  # UUID 형식
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db: Client = Depends(get_db),
+):
+    """
+    사용자의 폴더 목록을 조회합니다.
+    '최근 문서함' 폴더가 없으면 자동으로 생성합니다.
+    
+    폴더별 문서 수는 한 번의 집계 쿼리로 조회하며,
+    '최근 문서함' 생성(및 루트 문서 이동)은 폴더가 없을 때만 한 번 수행합니다.
+    사용자 데이터가 바뀌지 않았으면 If-None-Match에 대해 304를 반환합니다.
+    
+    - **user_id**: 사용자 ID (UUID)
+    """
+    try:
+        stamp = get_change_stamp_tracker().get(db, user_id)
+        etag = stamp.etag("folders")
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=_conditional_headers(etag))
         
-        # folder_id가 NULL인 문서들을 '최근 문서함'으로 이동 (기존 루트 폴더 문서들)
-        root_docs_result = (
-            db.table("documents")
-            .select("id", count="exact")
+        folder_list = _list_folders_with_counts(db, user_id)
+        
+        # '최근 문서함' 폴더가 없으면 생성 후 다시 조회 (사용자당 최초 한 번)
+        if not any(folder["name"] == RECENT_FOLDER_NAME for folder in folder_list):
+            if _ensure_recent_folder(db, user_id):
+                folder_list = _list_folders_with_counts(db, user_id)
+                etag = get_change_stamp_tracker().get(db, user_id).etag("folders")
+        
+        response.headers.update(_conditional_headers(etag))
+        return {
+            "success": True,
+            "folders": folder_list,
+            "count": len(folder_list),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"폴더 목록 조회 실패: {str(e)}"
+        )
+
+
+@router.post("/folders/{folder_id}/prefetch")
+async def prefetch_folder(
+    folder_id: str,  # UUID 형식
+    user_id: str = "00000000-0000-0000-0000-000000000001",  # UUID 형식
+    db: Client = Depends(get_db),
+):
+    """
+    폴더의 벡터 검색 핫 인덱스를 미리 구축합니다.
+    이후 해당 폴더의 쿼리는 DB 왕복 없이 서버 메모리에서 벡터 검색을 수행합니다.
+    
+    - **folder_id**: 폴더 ID (UUID)
+    - **user_id**: 사용자 ID (UUID 형식)
+    """
+    try:
+        folder_result = (
+            db.table("folders")
+            .select("id")
+            .eq("id", folder_id)
             .eq("user_id", user_id)
-            .is_("folder_id", "null")
             .is_("deleted_at", "null")
             .execute()
         )
-        root_doc_count = root_docs_result.count if hasattr(root_docs_result, "count") else len(root_docs_result.data)
+        if not folder_result.data:
+            raise HTTPException(
+                status_code=404,
+                detail="폴더를 찾을 수 없습니다."
+            )
         
-        # folder_id가 NULL인 문서들을 '최근 문서함'으로 이동
-        if root_doc_count > 0 and recent_folder_id:
-            try:
-                db.table("documents").update({
-                    "folder_id": recent_folder_id,
-                    "updated_at": datetime.now().isoformat(),
-                }).eq("user_id", user_id).is_("folder_id", "null").is_("deleted_at", "null").execute()
-                
-                # '최근 문서함' 폴더의 문서 개수 업데이트
-                for folder in folder_list:
-                    if folder["id"] == recent_folder_id:
-                        folder["document_count"] += root_doc_count
-                        break
-            except Exception as e:
-                print(f"문서 이동 실패 (무시 가능): {e}")
-        
-        # '최근 문서함' 폴더를 맨 앞으로 이동
-        recent_folder = None
-        other_folders = []
-        for folder in folder_list:
-            if folder["id"] == recent_folder_id:
-                recent_folder = folder
-            else:
-                other_folders.append(folder)
+        document_ids = _filter_document_ids_with_chunks(
+            db, _get_folder_document_ids(db, user_id, folder_id)
+        )
+        if not document_ids:
+            raise HTTPException(
+                status_code=404,
+                detail="인덱싱된 문서가 없습니다."
+            )
         
-        if recent_folder:
-            folder_list = [recent_folder] + other_folders
+        rag_service = get_rag_service()
+        result = rag_service.prefetch_folder(folder_id, document_ids)
         
         return {
             "success": True,
-            "folders": folder_list,
-            "count": len(folder_list),
+            **result,
         }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"폴더 목록 조회 실패: {str(e)}"
+            detail=f"폴더 프리페치 실패: {str(e)}"
         )
 
 
@@ -423,8 +680,7 @@ async def delete_document(
         update_result = (
             db.table("documents")
             .update({
-                "deleted_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
+                "deleted_at": datetime.now(timezone.utc).isoformat(),
             })
             .eq("id", document_id)
             .eq("user_id", user_id)
@@ -437,12 +693,14 @@ async def delete_document(
                 status_code=500,
                 detail="문서 삭제에 실패했습니다."
             )
+        get_change_stamp_tracker().invalidate(user_id)
         
         # PDF 파일인 경우 인덱스에서도 제거
         if document.get("content_type") == "application/pdf":
             try:
                 rag_service = get_rag_service()
                 rag_service.remove_document_index(document_id=document_id)
+                rag_service.invalidate_folder_caches(folder_id)
             except Exception as e:
                 print(f"인덱스에서 문서 제거 실패 (무시 가능): {e}")
         
@@ -460,11 +718,153 @@ async def delete_document(
         )
 
 
+def _get_folder_document_ids(db: Client, user_id: str, folder_id: Optional[str]) -> List[str]:
+    """
+    폴더에 속한 (삭제되지 않은) 문서 ID 목록 조회
+
+    Args:
+        db: Supabase 클라이언트
+        user_id: 사용자 ID
+        folder_id: 폴더 ID (None이면 루트 폴더)
+    """
+    query = db.table("documents").select("id").eq("user_id", user_id)
+    if folder_id:
+        query = query.eq("folder_id", folder_id)
+    else:
+        query = query.is_("folder_id", "null")
+    query = query.is_("deleted_at", "null")
+    
+    docs_result = query.execute()
+    return [doc.get("id") for doc in (docs_result.data or [])]
+
+
+def _filter_document_ids_with_chunks(db: Client, document_ids: List[str]) -> List[str]:
+    """
+    document_chunks에 실제로 청크가 있는 문서 ID만 반환
+
+    Args:
+        db: Supabase 클라이언트
+        document_ids: 확인할 문서 ID 목록
+    """
+    if not document_ids:
+        return []
+    
+    # 배치로 청크 확인 (성능 개선)
+    chunks_result = (
+        db.table("document_chunks")
+        .select("document_id")
+        .in_("document_id", document_ids)
+        .execute()
+    )
+    
+    # 고유한 document_id 추출
+    doc_ids_with_chunks_set = set()
+    if chunks_result.data:
+        for chunk in chunks_result.data:
+            doc_id = chunk.get("document_id")
+            if doc_id:
+                doc_ids_with_chunks_set.add(doc_id)
+    
+    return list(doc_ids_with_chunks_set)
+
+
+def _resolve_queryable_document_ids(
+    db: Client,
+    user_id: str,
+    folder_id: Optional[str],
+) -> Tuple[List[str], List[str]]:
+    """
+    쿼리 대상 폴더의 소유권을 확인하고 검색 가능한 문서 ID 조회
+
+    Args:
+        db: Supabase 클라이언트
+        user_id: 사용자 ID
+        folder_id: 폴더 ID (None이면 루트 폴더)
+
+    Returns:
+        (폴더의 전체 문서 ID 목록, 그중 청크가 있는 문서 ID 목록)
+
+    Raises:
+        HTTPException: 폴더가 없거나 인덱싱된 문서가 없는 경우 (404)
+    """
+    # 폴더 소유권 확인 (folder_id가 None이면 루트 폴더로 처리)
+    if folder_id:
+        folder_result = (
+            db.table("folders")
+            .select("*")
+            .eq("id", folder_id)
+            .eq("user_id", user_id)
+            .is_("deleted_at", "null")
+            .execute()
+        )
+        if not folder_result.data:
+            raise HTTPException(
+                status_code=404,
+                detail="폴더를 찾을 수 없습니다."
+            )
+
+    # document_chunks에서 해당 폴더의 문서 ID를 먼저 찾기
+    # 1. 폴더의 문서 ID 목록 가져오기
+    all_doc_ids = _get_folder_document_ids(db, user_id, folder_id)
+
+    print(f"폴더 문서 조회: folder_id={folder_id or 'root'}, 문서 수={len(all_doc_ids)}")
+
+    if not all_doc_ids:
+        raise HTTPException(
+            status_code=404,
+            detail="폴더에 문서가 없습니다."
+        )
+
+    # 2. document_chunks에 실제로 청크가 있는 문서만 필터링
+    print(f"청크 확인 시작: {len(all_doc_ids)}개 문서 확인 중...")
+
+    document_ids_with_chunks = _filter_document_ids_with_chunks(db, all_doc_ids)
+
+    print(f"청크 확인 완료: {len(document_ids_with_chunks)}개 문서에 청크가 있습니다.")
+
+    if not document_ids_with_chunks:
+        raise HTTPException(
+            status_code=404,
+            detail="인덱싱된 문서가 없습니다. 먼저 문서를 업로드하고 인덱싱이 완료될 때까지 기다려주세요."
+        )
+
+    return all_doc_ids, document_ids_with_chunks
+
+
+def _run_single_flight(key, fn):
+    """query_single_flight_enabled 설정에 따라 동일 요청 병합을 적용하여 fn 실행"""
+    if not get_settings().query_single_flight_enabled:
+        return fn()
+    result, shared = _query_single_flight.do(key, fn)
+    if shared:
+        print(f"진행 중인 동일 질문 결과 공유: question='{key[2]}', folder_id={key[0]}")
+    return result
+
+
+def _request_deadline(request_timeout: Optional[float]) -> Deadline:
+    """
+    요청 도착 시점 기준 마감 시간 생성
+
+    X-Request-Timeout 헤더(초)가 있으면 query_deadline_max_seconds 이하로 제한하여 사용하고,
+    없으면 query_deadline_seconds를 사용합니다. (0 이하이면 제한 없음)
+    """
+    settings = get_settings()
+    if request_timeout is not None and request_timeout > 0:
+        timeout = request_timeout
+        if settings.query_deadline_max_seconds > 0:
+            timeout = min(timeout, settings.query_deadline_max_seconds)
+        return Deadline(timeout)
+    if settings.query_deadline_seconds > 0:
+        return Deadline(settings.query_deadline_seconds)
+    return Deadline(None)
+
+
 class QueryRequest(BaseModel):
     """RAG 쿼리 요청 모델"""
     question: str
     folder_id: Optional[str] = None
     similarity_top_k: int = 3
+    allow_direct_answer: bool = True  # False면 저장된 Q&A와 같은 질문도 항상 LLM으로 생성
 
 
 @router.post("/query")
@@ -472,6 +872,7 @@ async def query_documents(
     request: QueryRequest,
     user_id: str = "00000000-0000-0000-0000-000000000001",
     db: Client = Depends(get_db),
+    x_request_timeout: Optional[float] = Header(None, alias="X-Request-Timeout"),
 ):
     """
     특정 폴더의 문서들에서 RAG 쿼리를 수행합니다.
@@ -480,78 +881,35 @@ async def query_documents(
     - **folder_id**: 폴더 ID (None이면 루트 폴더)
     - **user_id**: 사용자 ID
     - **similarity_top_k**: 검색할 관련 문서 수 (기본값: 3)
+    - **allow_direct_answer**: 저장된 Q&A 직접 답변 허용 여부 (기본값: True)
+    - **X-Request-Timeout** (헤더): 요청 전체 제한 시간(초), 없으면 서버 기본값
+    
+    남은 시간이 부족하면 질문 검증, 출처 정보 조회 등 선택 단계를 생략하고,
+    마감 시간을 넘기면 504를 반환합니다.
+    """
+    # 대기열/스레드풀 대기 시간도 예산에 포함되도록 요청 도착 시점에 마감 시간 생성
+    deadline = _request_deadline(x_request_timeout)
+    # DB 조회, 검색, 답변 생성이 모두 블로킹 호출이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행
+    return await run_in_threadpool(_execute_query, db, user_id, request, deadline)
+
+
+def _execute_query(db: Client, user_id: str, request: QueryRequest, deadline: Optional[Deadline] = None) -> dict:
+    """
+    RAG 쿼리 실행 및 응답 구성 (/query 엔드포인트와 비동기 쿼리 작업에서 공용)
+
+    Args:
+        deadline: 요청 마감 시간 (None이면 제한 없음, 비동기 작업은 제한 없이 실행)
+
+    Raises:
+        HTTPException: 폴더/문서가 없거나 쿼리에 실패한 경우, 마감 시간 초과(504)
     """
     try:
         question = request.question
         folder_id = request.folder_id
         similarity_top_k = request.similarity_top_k
         
-        # 폴더 소유권 확인 (folder_id가 None이면 루트 폴더로 처리)
-        if folder_id:
-            folder_result = (
-                db.table("folders")
-                .select("*")
-                .eq("id", folder_id)
-                .eq("user_id", user_id)
-                .is_("deleted_at", "null")
-                .execute()
-            )
-            if not folder_result.data:
-                raise HTTPException(
-                    status_code=404,
-                    detail="폴더를 찾을 수 없습니다."
-                )
-        
-        # document_chunks에서 해당 폴더의 문서 ID를 먼저 찾기
-        # 1. 폴더의 문서 ID 목록 가져오기
-        query = db.table("documents").select("id").eq("user_id", user_id)
-        if folder_id:
-            query = query.eq("folder_id", folder_id)
-        else:
-            query = query.is_("folder_id", "null")
-        query = query.is_("deleted_at", "null")
-        
-        docs_result = query.execute()
-        
-        print(f"폴더 문서 조회: folder_id={folder_id or 'root'}, 문서 수={len(docs_result.data) if docs_result.data else 0}")
-        
-        if not docs_result.data or len(docs_result.data) == 0:
-            raise HTTPException(
-                status_code=404,
-                detail="폴더에 문서가 없습니다."
-            )
-        
-        # 2. document_chunks에 실제로 청크가 있는 문서만 필터링
-        document_ids_with_chunks = []
-        all_doc_ids = [doc.get("id") for doc in docs_result.data]
-        
-        print(f"청크 확인 시작: {len(all_doc_ids)}개 문서 확인 중...")
-        
-        # 배치로 청크 확인 (성능 개선)
-        chunks_result = (
-            db.table("document_chunks")
-            .select("document_id")
-            .in_("document_id", all_doc_ids)
-            .execute()
-        )
-        
-        # 고유한 document_id 추출
-        doc_ids_with_chunks_set = set()
-        if chunks_result.data:
-            for chunk in chunks_result.data:
-                doc_id = chunk.get("document_id")
-                if doc_id:
-                    doc_ids_with_chunks_set.add(doc_id)
-        
-        document_ids_with_chunks = list(doc_ids_with_chunks_set)
-        
-        print(f"청크 확인 완료: {len(document_ids_with_chunks)}개 문서에 청크가 있습니다.")
-        
-        if not document_ids_with_chunks:
-            raise HTTPException(
-                status_code=404,
-                detail="인덱싱된 문서가 없습니다. 먼저 문서를 업로드하고 인덱싱이 완료될 때까지 기다려주세요."
-            )
+        # 폴더 소유권 확인 및 인덱싱된 문서 ID 조회
+        all_doc_ids, document_ids_with_chunks = _resolve_queryable_document_ids(db, user_id, folder_id)
         
         # 실제로 청크가 있는 문서 ID만 사용
         document_ids = document_ids_with_chunks
@@ -563,16 +921,51 @@ async def query_documents(
         # RAG 서비스로 쿼리 수행 (각 PDF 인덱스에서 검색)
         rag_service = get_rag_service()
         try:
-            answer = rag_service.query_documents(
-                question=question,
-                document_ids=document_ids,
-                similarity_top_k=similarity_top_k,
+            # 같은 (폴더, 정규화된 질문, top_k) 요청이 진행 중이면 그 결과를 함께 사용
+            # (병합된 요청은 먼저 시작한 요청의 마감 시간을 따름)
+            single_flight_key = (
+                folder_id or f"root:{user_id}",
+                document_set_version(document_ids),
+                normalize_question(question),
+                similarity_top_k,
+                request.allow_direct_answer,
             )
-            print(f"쿼리 완료: answer 길이={len(answer) if answer else 0}")
+            query_result = _run_single_flight(
+                single_flight_key,
+                lambda: rag_service.query_documents_with_details(
+                    question=question,
+                    document_ids=document_ids,
+                    similarity_top_k=similarity_top_k,
+                    folder_id=folder_id,
+                    allow_direct_answer=request.allow_direct_answer,
+                    user_id=user_id,
+                    deadline=deadline,
+                ),
+            )
+            answer = query_result["answer"]
+            print(f"쿼리 완료: answer 길이={len(answer) if answer else 0}, 출처={query_result['answer_source']}")
             
             # 답변이 비어있으면 에러
             if not answer or not answer.strip():
                 raise ValueError("쿼리 결과가 비어있습니다.")
+        except DeadlineExceeded as e:
+            print(f"쿼리 마감 시간 초과: {e}")
+            raise HTTPException(status_code=504, detail=str(e))
+        except AdmissionRejected as e:
+            print(f"쿼리 거절 (LLM 승인 제어): {e}")
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(max(1, int(e.retry_after or 1)))},
+            )
+        except UpstreamUnavailable as e:
+            print(f"쿼리 실패 (OpenAI 응답 지연/장애): {e}")
+            retry_after = e.retry_after if isinstance(e, CircuitOpenError) else None
+            raise HTTPException(
+                status_code=503,
+                detail=f"답변 생성 서비스가 일시적으로 응답하지 않습니다. 잠시 후 다시 시도해주세요. ({e})",
+                headers={"Retry-After": str(max(1, int(retry_after or 5)))},
+            )
         except ValueError as e:
             error_detail = str(e)
             print(f"쿼리 실패: {error_detail}")
@@ -593,11 +986,27 @@ async def query_documents(
                 detail=f"쿼리 중 오류가 발생했습니다: {str(e)}"
             )
         
+        # 남은 시간이 부족하면 출처 정보(재검색 + 파일명 조회)를 생략하고 답변만 반환
+        if deadline is not None and not deadline.has_at_least(get_settings().deadline_skip_sources_below_seconds):
+            print(f"남은 시간 부족으로 출처 정보 조회 생략 (남은 시간={deadline.remaining():.1f}초)")
+            return {
+                "success": True,
+                "answer": answer,
+                "question": question,
+                "folder_id": folder_id,
+                "retrieved_nodes": [],
+                "pdf_sources": [],
+                "answer_source": query_result["answer_source"],
+                "retrieval_scores": query_result["scores"],
+                "sources_skipped": True,
+            }
+        
         # 참조된 노드 정보 가져오기 (각 PDF에서 검색)
         nodes = rag_service.get_retrieved_nodes_from_documents(
             question=question,
             document_ids=document_ids,
             similarity_top_k=similarity_top_k * 2,  # 삭제된 문서 필터링을 위해 더 많이 가져오기
+            folder_id=folder_id,
         )
         
         print(f"검색된 노드 수: {len(nodes)}, 활성 문서 수: {len(active_doc_ids)}")
@@ -706,7 +1115,7 @@ async def query_documents(
                     detail=(
                         "검색 결과가 없습니다. "
                         "질문을 다시 작성하거나 다른 폴더의 문서를 확인해주세요. "
-                        f"현재 폴더에는 {len(docs_result.data)}개의 인덱싱된 문서가 있습니다."
+                        f"현재 폴더에는 {len(all_doc_ids)}개의 인덱싱된 문서가 있습니다."
                     )
                 )
         
@@ -727,6 +1136,9 @@ async def query_documents(
             "folder_id": folder_id,
             "retrieved_nodes": retrieved_nodes,
             "pdf_sources": pdf_sources_list,  # PDF별 그룹화된 참고문헌
+            "answer_source": query_result["answer_source"],  # generated, faq, answer_cache, not_relevant, invalid_question
+            "retrieval_scores": query_result["scores"],  # 관련도 임계값 조정용 상위 검색 점수
+            "sources_skipped": False,  # 마감 시간이 임박해 출처 정보를 생략했는지 여부
         }
     except HTTPException:
         raise
@@ -737,19 +1149,451 @@ async def query_documents(
         )
 
 
+@router.post("/query/jobs", status_code=202)
+async def create_query_job(
+    request: QueryRequest,
+    user_id: str = "00000000-0000-0000-0000-000000000001",
+    db: Client = Depends(get_db),
+):
+    """
+    RAG 쿼리를 비동기 작업으로 등록합니다.
+    
+    답변은 워커 풀에서 생성되며, 반환된 job_id로 결과를 조회(GET /query/jobs/{job_id})하거나
+    SSE로 스트리밍(GET /query/jobs/{job_id}/stream)할 수 있습니다.
+    결과는 query_job_result_ttl_seconds 동안 보관됩니다.
+    
+    파라미터는 /query와 같습니다.
+    """
+    try:
+        manager = get_query_job_manager()
+        job = manager.submit(
+            user_id=user_id,
+            params=request.model_dump(),
+            fn=lambda: _execute_query(db, user_id, request),
+            error_status=lambda e: getattr(e, "status_code", 500),
+        )
+        return {
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/documents/query/jobs/{job.id}",
+            "stream_url": f"/documents/query/jobs/{job.id}/stream",
+        }
+    except QueryJobQueueFull as e:
+        print(f"쿼리 작업 거절: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, int(e.retry_after)))},
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"쿼리 작업 등록 실패: {str(e)}"
+        )
+
+
+@router.get("/query/jobs/{job_id}")
+async def get_query_job(
+    job_id: str,
+    user_id: str = "00000000-0000-0000-0000-000000000001",
+):
+    """
+    비동기 쿼리 작업의 상태와 결과를 조회합니다.
+    
+    - **status**: queued, running, completed, failed
+    - **result**: 완료 시 /query 응답과 같은 형식
+    - **error**, **error_status_code**: 실패 시 오류 내용
+    """
+    job = get_query_job_manager().get(job_id, user_id=user_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="쿼리 작업을 찾을 수 없습니다. 만료되었거나 존재하지 않는 작업입니다."
+        )
+    return {"success": True, **job.to_dict()}
+
+
+@router.get("/query/jobs/{job_id}/stream")
+async def stream_query_job(
+    job_id: str,
+    user_id: str = "00000000-0000-0000-0000-000000000001",
+):
+    """
+    비동기 쿼리 작업의 상태 변화를 SSE(text/event-stream)로 전송합니다.
+    
+    - event: status  → 상태가 바뀔 때마다 (결과 제외)
+    - event: result  → 완료 시 작업 전체 (결과 포함), 이후 스트림 종료
+    - event: error   → 실패 시 작업 전체 (오류 포함), 이후 스트림 종료
+    """
+    job = get_query_job_manager().get(job_id, user_id=user_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="쿼리 작업을 찾을 수 없습니다. 만료되었거나 존재하지 않는 작업입니다."
+        )
+    
+    def sse(event: str, data: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    async def event_stream():
+        version = -1
+        while True:
+            if job.done:
+                event = "result" if job.error is None else "error"
+                yield sse(event, job.to_dict())
+                return
+            current = await run_in_threadpool(job.wait_for_change, version, 15.0)
+            if current == version:
+                # 변화 없음: 프록시가 연결을 끊지 않도록 주석 줄 전송
+                yield ": keep-alive\n\n"
+                continue
+            version = current
+            if not job.done:
+                yield sse("status", job.to_dict(include_result=False))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class BatchQueryRequest(BaseModel):
+    """여러 질문 RAG 쿼리 요청 모델"""
+    questions: List[str]
+    folder_id: Optional[str] = None
+    similarity_top_k: int = 3
+    allow_direct_answer: bool = True
+
+
+def _load_batch_query_documents(
+    db: Client,
+    user_id: str,
+    folder_id: Optional[str],
+) -> Tuple[List[str], Dict[str, str]]:
+    """
+    배치 쿼리 대상 문서 ID와 출처 표시용 document_id -> original_filename 매핑 조회 (한 번만 조회)
+
+    Raises:
+        HTTPException: 폴더가 없거나 검색할 문서가 없는 경우
+    """
+    _, document_ids = _resolve_queryable_document_ids(db, user_id, folder_id)
+    docs_with_names = (
+        db.table("documents")
+        .select("id, original_filename")
+        .in_("id", document_ids)
+        .eq("user_id", user_id)
+        .is_("deleted_at", "null")
+        .execute()
+    )
+    doc_id_to_original_filename = {
+        doc.get("id"): doc.get("original_filename")
+        for doc in (docs_with_names.data or [])
+        if doc.get("id") and doc.get("original_filename")
+    }
+    return document_ids, doc_id_to_original_filename
+
+
+@router.post("/query/batch")
+async def query_documents_batch(
+    request: BatchQueryRequest,
+    user_id: str = "00000000-0000-0000-0000-000000000001",
+    db: Client = Depends(get_db),
+):
+    """
+    특정 폴더의 문서들에서 여러 질문에 대한 RAG 쿼리를 한 번에 수행합니다.
+    
+    폴더 조회와 청크 확인은 한 번만 수행하고, 질문 임베딩과 벡터 검색은 배치로 처리합니다.
+    응답은 NDJSON 스트림(줄마다 JSON 하나)이며 질문별 결과가 완료되는 순서대로 전송됩니다.
+    
+    - 첫 줄: {"type": "start", "total": 질문 수, ...}
+    - 질문별: {"type": "result", "index": 질문 순번, "question", "answer", "answer_source", "scores", "sources"}
+      (실패한 질문은 "answer" 대신 "error")
+    - 마지막 줄: {"type": "done", "completed": 성공 수, "failed": 실패 수}
+    
+    - **questions**: 질문 텍스트 목록
+    - **folder_id**: 폴더 ID (None이면 루트 폴더)
+    - **user_id**: 사용자 ID
+    - **similarity_top_k**: 질문별 검색할 관련 문서 수 (기본값: 3)
+    - **allow_direct_answer**: 저장된 Q&A 직접 답변 허용 여부 (기본값: True)
+    """
+    settings = get_settings()
+    questions = [q.strip() for q in request.questions if q and q.strip()]
+    if not questions:
+        raise HTTPException(
+            status_code=400,
+            detail="질문이 없습니다."
+        )
+    if len(questions) > settings.batch_query_max_questions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.batch_query_max_questions}개의 질문까지 처리할 수 있습니다."
+        )
+    
+    try:
+        folder_id = request.folder_id
+        # 동기 Supabase 클라이언트 호출이 이벤트 루프를 막지 않도록 스레드풀에서 실행 (/query와 동일)
+        document_ids, doc_id_to_original_filename = await run_in_threadpool(
+            _load_batch_query_documents, db, user_id, folder_id
+        )
+        rag_service = get_rag_service()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"배치 쿼리 실패: {str(e)}"
+        )
+    
+    print(f"배치 쿼리 시작: 질문 {len(questions)}개, folder_id={folder_id or 'root'}, PDF 수={len(document_ids)}")
+    
+    def stream_results():
+        completed = 0
+        failed = 0
+        yield json.dumps({
+            "type": "start",
+            "total": len(questions),
+            "folder_id": folder_id,
+            "document_count": len(document_ids),
+        }, ensure_ascii=False) + "\n"
+        
+        try:
+            for result in rag_service.query_documents_batch(
+                questions=questions,
+                document_ids=document_ids,
+                similarity_top_k=request.similarity_top_k,
+                folder_id=folder_id,
+                allow_direct_answer=request.allow_direct_answer,
+                user_id=user_id,
+            ):
+                if "error" in result:
+                    failed += 1
+                else:
+                    completed += 1
+                for source in result.get("sources", []):
+                    source["original_filename"] = doc_id_to_original_filename.get(
+                        source.get("document_id"), source.get("pdf_name")
+                    )
+                yield json.dumps({"type": "result", **result}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            print(f"배치 쿼리 중 오류: {e}")
+            yield json.dumps({"type": "error", "detail": str(e)}, ensure_ascii=False) + "\n"
+        
+        print(f"배치 쿼리 완료: 성공 {completed}개, 실패 {failed}개")
+        yield json.dumps({"type": "done", "completed": completed, "failed": failed}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    RAG 서비스의 프로세스 내 캐시 통계를 조회합니다.
+    """
+    try:
+        rag_service = get_rag_service()
+        return {
+            "success": True,
+            "caches": rag_service.cache_stats(),
+            "single_flight": _query_single_flight.stats(),
+            "query_jobs": get_query_job_manager().stats(),
+            "llm_admission": get_admission_controller().stats(),
+            "upstream": resilience_stats(),
+            "status_stream": get_document_status_broker().stats(),
+            "llm_stages": get_llm_stage_metrics().stats(),
+            "auth_users": get_user_principal_cache().stats(),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"캐시 통계 조회 실패: {str(e)}"
+        )
+
+
+@router.get("/status/stream")
+async def stream_document_status(
+    user_id: str = "00000000-0000-0000-0000-000000000001",
+    document_ids: Optional[str] = None,
+    db: Client = Depends(get_db),
+):
+    """
+    문서 상태 변화를 SSE(text/event-stream)로 전송합니다.
+    문서마다 /status/{document_id}를 폴링하는 대신 연결 하나로 모든 문서의 상태를 받습니다.
+    
+    - **user_id**: 사용자 ID (UUID 형식)
+    - **document_ids**: 구독할 문서 ID (쉼표로 구분, 없으면 사용자의 모든 문서)
+    
+    - event: snapshot → 연결 직후 현재 상태 (document_ids 지정 시 해당 문서, 아니면 처리 대기/중인 문서)
+    - event: status   → 상태 전환 (uploaded → processing → completed/failed)
+    - event: progress → 인덱싱 단계별 진행 (parsing: pages, extracting: nodes/chunks, embedding: done/total)
+    """
+    ids = [value.strip() for value in document_ids.split(",") if value.strip()] if document_ids else []
+    broker = get_document_status_broker()
+    # 스냅샷 조회 중 발생한 전환을 놓치지 않도록 먼저 구독
+    try:
+        subscription = broker.subscribe(user_id, ids or None)
+    except TooManySubscriptions as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    try:
+        query = (
+            db.table("documents")
+            .select("id, status, original_filename, updated_at")
+            .eq("user_id", user_id)
+            .is_("deleted_at", "null")
+        )
+        if ids:
+            query = query.in_("id", ids)
+        else:
+            query = query.in_("status", ["uploaded", "processing"])
+        snapshot = query.execute().data or []
+    except Exception as e:
+        broker.unsubscribe(subscription)
+        raise HTTPException(
+            status_code=500,
+            detail=f"상태 조회 실패: {str(e)}"
+        )
+    
+    def sse(event: str, data) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    async def event_stream():
+        try:
+            yield sse("snapshot", {"documents": snapshot})
+            while True:
+                # 스레드풀 워커를 점유하지 않고 이벤트 루프에서 대기
+                events = await subscription.next_events(15.0)
+                if not events:
+                    # 변화 없음: 프록시가 연결을 끊지 않도록 주석 줄 전송
+                    yield ": keep-alive\n\n"
+                    continue
+                for event in events:
+                    yield sse(event["type"], event)
+        finally:
+            broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class BulkStatusRequest(BaseModel):
+    """여러 문서 상태 조회 요청 모델 (document_ids 또는 folder_id 중 하나 이상)"""
+    document_ids: Optional[List[str]] = None
+    folder_id: Optional[str] = None
+    cursor: Optional[str] = None  # 이전 응답의 next_cursor (폴더 문서가 한 페이지를 넘는 경우)
+
+
+@router.post("/status/bulk")
+async def get_document_statuses_bulk(
+    request: BulkStatusRequest,
+    user_id: str = "00000000-0000-0000-0000-000000000001",
+    db: Client = Depends(get_db),
+):
+    """
+    여러 문서의 인덱싱 상태를 한 번에 조회합니다.
+    문서마다 /status/{document_id}를 호출하는 대신 한 번의 쿼리로 조회합니다.
+    
+    - **document_ids**: 조회할 문서 ID 목록 (최대 document_status_bulk_max_ids개)
+    - **folder_id**: 폴더 ID (지정하면 폴더의 모든 문서, document_ids와 함께 쓰면 교집합)
+    - **cursor**: 이전 응답의 next_cursor (없으면 첫 페이지)
+    - **user_id**: 사용자 ID (UUID 형식)
+    
+    결과는 최신순으로 최대 document_status_bulk_max_ids개씩 반환하며,
+    폴더 문서가 더 있으면 has_more가 true이고 next_cursor로 다음 페이지를 조회합니다.
+    인덱싱 중인 문서는 progress에 마지막 진행 단계(parsing/extracting/embedding)가 포함됩니다.
+    요청한 문서 중 없거나 삭제된 문서는 missing으로 반환합니다. (첫 페이지에서만)
+    """
+    settings = get_settings()
+    document_ids = list(dict.fromkeys(request.document_ids or []))
+    if not document_ids and not request.folder_id:
+        raise HTTPException(status_code=400, detail="document_ids 또는 folder_id가 필요합니다.")
+    if len(document_ids) > settings.document_status_bulk_max_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.document_status_bulk_max_ids}개 문서까지 조회할 수 있습니다."
+        )
+    
+    try:
+        after = decode_cursor(request.cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page_size = settings.document_status_bulk_max_ids
+    
+    try:
+        query = (
+            db.table("documents")
+            .select("id, folder_id, status, created_at, updated_at")
+            .eq("user_id", user_id)
+            .is_("deleted_at", "null")
+        )
+        if document_ids:
+            query = query.in_("id", document_ids)
+        if request.folder_id:
+            query = query.eq("folder_id", request.folder_id)
+        if after:
+            query = query.or_(keyset_filter(*after))
+        # 목록과 같은 (created_at, id) 순서로 페이지를 나누고, 다음 페이지 존재 여부 확인을 위해 한 행 더 조회
+        query = query.order("created_at", desc=True).order("id", desc=True).limit(page_size + 1)
+        rows = query.execute().data or []
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        
+        broker = get_document_status_broker()
+        statuses = []
+        for row in rows:
+            status = row.get("status", "unknown")
+            statuses.append({
+                "document_id": row["id"],
+                "folder_id": row.get("folder_id"),
+                "status": status,
+                "updated_at": row.get("updated_at"),
+                "progress": broker.latest_progress(row["id"]) if status == "processing" else None,
+            })
+        
+        found = {row["id"] for row in rows}
+        return {
+            "success": True,
+            "statuses": statuses,
+            "count": len(statuses),
+            "has_more": has_more,
+            "next_cursor": encode_cursor(rows[-1]) if has_more else None,
+            # 이후 페이지에서는 이전 페이지의 문서가 빠지므로 첫 페이지에서만 계산
+            "missing": [] if after else [document_id for document_id in document_ids if document_id not in found],
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"상태 조회 실패: {str(e)}"
+        )
+
+
 @router.get("/status/{document_id}")
 async def get_document_status(
+    response: Response,
     document_id: str,
     user_id: str = "00000000-0000-0000-0000-000000000001",
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
     db: Client = Depends(get_db),
 ):
     """
     문서의 인덱싱 상태를 조회합니다.
     
+    사용자 데이터가 바뀌지 않았으면 문서 조회 없이 If-None-Match에 대해 304를 반환합니다.
+    
     - **document_id**: 문서 ID (UUID)
     - **user_id**: 사용자 ID (UUID 형식)
     """
     try:
+        stamp = get_change_stamp_tracker().get(db, user_id)
+        etag = stamp.etag("status", document_id)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=_conditional_headers(etag))
+        response.headers.update(_conditional_headers(etag))
+        
         doc_result = (
             db.table("documents")
             .select("id, status, original_filename, created_at, updated_at")
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -25,20 +26,145 @@ class Settings(BaseSettings):
     postgres_database: Optional[str] = None
     postgres_user: Optional[str] = None
     postgres_password: Optional[str] = None
-    
+
+    # 벡터 검색 설정
+    fallback_matrix_cache_size: int = 32  # 폴백 검색용 임베딩 행렬 캐시 항목 수 (문서 집합 단위)
+    embedding_matrix_page_size: int = 1000  # 임베딩 행렬 구성 시 페이지당 조회 행 수 (PostgREST max-rows 이하)
+    vector_search_ef_search: int = 100  # HNSW 검색 후보 수 (db/migrations/004 필요)
+    vector_search_probes: int = 10  # IVFFlat 인덱스 사용 시 탐색할 리스트 수
+    vector_search_iterative_scan: str = "relaxed_order"  # off, relaxed_order, strict_order
+    vector_quantization: str = "none"  # none, halfvec, binary (halfvec/binary는 db/migrations/006 필요)
+    vector_rescore_factor: int = 4  # 양자화 검색 시 전체 정밀도로 재정렬할 후보 배수 (binary는 8 이상 권장)
+    # 축소 차원 임베딩 (0이면 비활성화, 256/512, db/migrations/007 필요)
+    # 활성화 시 1차 검색은 축소 차원, 재정렬은 저장된 전체 차원으로 수행 (vector_quantization보다 우선)
+    embedding_short_dims: int = 0
+
+    # 질문 임베딩 캐시 설정 (0이면 비활성화)
+    query_embedding_cache_size: int = 2048
+    query_embedding_cache_ttl_seconds: int = 60 * 60 * 24  # 1일
+
+    # 폴더별 의미 기반 답변 캐시 설정
+    answer_cache_enabled: bool = True
+    answer_cache_similarity_threshold: float = 0.97  # 이 값 이상으로 유사한 질문이면 캐시된 답변 반환
+    answer_cache_ttl_seconds: int = 60 * 60 * 24  # 1일
+    answer_cache_max_entries_per_folder: int = 200
+
+    # 저장된 Q&A 직접 답변 설정 (LLM 생성 생략)
+    faq_direct_answer_enabled: bool = True
+    faq_direct_answer_threshold: float = 0.9  # 저장된 질문과의 텍스트 유사도(difflib 비율) 기준, 1 이상이면 정확히 일치할 때만
+    faq_direct_answer_candidates: int = 2  # 검사할 상위 검색 결과 수
+
+    # 답변 생성 프롬프트 컨텍스트 구성 설정
+    context_max_tokens: int = 3000  # 참고 문서 컨텍스트 토큰 예산
+    context_dedup_threshold: float = 0.85  # 청크 간 문자 3-gram 유사도가 이 값 이상이면 중복으로 제외
+    context_min_relative_score: float = 0.75  # 최고 점수 대비 이 비율 미만인 청크는 제외 (0이면 비활성)
+
+    # 검색 관련도 게이트 설정 (미달 시 보고서 생성 없이 '관련 정보 없음' 안내)
+    relevance_gate_enabled: bool = True
+    relevance_min_top_score: float = 0.3  # 최고 코사인 유사도 기준
+    relevance_min_mean_score: float = 0.0  # 상위 결과 평균 유사도 기준 (0이면 비활성)
+    # 이 어휘 점수(질문 단어 일치 비율 / 트라이그램 단어 유사도, 0~1) 이상인 하이브리드 결과는 유사도 기준 예외
+    relevance_min_lexical_score: float = 0.5
+
+    # 문서 목록 페이지네이션 / 일괄 상태 조회 설정
+    document_list_page_size: int = 100  # 기본 페이지 크기
+    document_list_max_page_size: int = 500  # 요청으로 지정할 수 있는 최대 페이지 크기
+    document_status_bulk_max_ids: int = 500  # 일괄 상태 조회 요청당 최대 문서 수
+    document_status_stream_max_per_user: int = 5  # 사용자당 동시 상태 스트림(SSE) 연결 수
+
+    # 목록/상태 조회 ETag용 사용자별 변경 스탬프 캐시 시간(초, 이 프로세스의 쓰기는 즉시 무효화)
+    change_stamp_cache_ttl_seconds: float = 2.0
+    # 변경분 동기화 토큰(sync_token)을 이만큼 과거 위치로 발급 (가장 긴 쓰기 트랜잭션보다 길게)
+    # updated_at은 트랜잭션 시작 시각이라 늦게 커밋된 행이 이미 발급된 토큰보다 앞설 수 있으므로,
+    # 이 구간의 변경은 다시 전송됩니다 (클라이언트는 id로 병합)
+    sync_token_lag_seconds: float = 60.0
+
+    # 배치 쿼리 설정
+    batch_query_max_questions: int = 50  # 요청당 최대 질문 수
+    batch_query_max_concurrency: int = 4  # 동시 답변 생성 수
+
+    # 동시에 들어온 같은 질문 요청을 한 번만 실행 (single-flight)
+    query_single_flight_enabled: bool = True
+
+    # 비동기 쿼리 작업 설정
+    query_job_workers: int = 4  # 답변 생성 워커 수 (LLM 동시 호출 수에 맞춰 조정)
+    query_job_result_ttl_seconds: int = 60 * 60  # 작업 결과 보관 시간 (완료 시점부터 1시간)
+    query_job_max_jobs: int = 1000  # 대기/실행 중인 최대 작업 수 (초과 시 503), 완료 작업 보관 수
+
+    # 파이프라인 단계별 모델 설정
+    llm_model_generation: str = "gpt-4o-mini"  # 보고서 답변 생성
+    llm_model_validation: str = "gpt-4o-mini"  # 질문 검증 (작고 빠른 모델 권장)
+    llm_model_extraction: str = "gpt-4o-mini"  # 인덱싱 시 Q&A 쌍 추출 / 표 요약
+    llm_model_invalid_reply: str = "gpt-4o-mini"  # 비정상 질문 안내문 생성
+    llm_temperature: float = 0.1
+    embedding_model: str = "text-embedding-3-small"  # 변경 시 저장된 청크 전체 재인덱싱 필요
+
+    # LLM 호출 승인 제어 설정 (질의 + 인덱싱 공용)
+    llm_max_concurrency: int = 8  # 전역 동시 LLM 호출 수
+    llm_per_user_concurrency: int = 2  # 사용자별 동시 LLM 호출 수 (0이면 제한 없음)
+    llm_tokens_per_minute: int = 0  # 분당 토큰 수 제한 (0이면 제한 없음, OpenAI TPM 한도보다 약간 낮게 설정)
+    llm_expected_output_tokens: int = 800  # 토큰 예산 계산 시 가정하는 출력 토큰 수
+    llm_max_queue: int = 100  # 최대 대기 요청 수
+    llm_queue_timeout_interactive_seconds: float = 30.0  # 질의 요청 대기 기한
+    llm_queue_timeout_background_seconds: float = 600.0  # 인덱싱 요청 대기 기한
+
+    # LLM / 임베딩 호출 복원력 설정 (타임아웃, 헤지, 재시도, 서킷 브레이커)
+    llm_timeout_seconds: float = 60.0  # 시도별 LLM 호출 제한 시간
+    llm_max_retries: int = 2
+    llm_hedge_percentile: float = 0.0  # LLM 헤지 요청 기준 지연 백분위 (0이면 비활성, 비용이 두 배가 될 수 있음)
+    embedding_timeout_seconds: float = 10.0  # 시도별 임베딩 호출 제한 시간
+    embedding_max_retries: int = 2
+    embedding_hedge_percentile: float = 95.0  # 임베딩 헤지 요청 기준 지연 백분위 (0이면 비활성)
+    circuit_breaker_failure_threshold: int = 5  # 연속 실패 시 서킷 열림 (0이면 비활성)
+    circuit_breaker_recovery_seconds: float = 30.0  # 서킷이 열린 뒤 시험 호출까지의 시간
+
+    # 요청 마감 시간 설정 (/query 전체 시간 예산)
+    query_deadline_seconds: float = 90.0  # 기본 요청 마감 시간(초), 0이면 제한 없음
+    query_deadline_max_seconds: float = 300.0  # X-Request-Timeout 헤더로 지정할 수 있는 최대값(초)
+    deadline_skip_validation_below_seconds: float = 20.0  # 남은 시간이 이보다 적으면 LLM 질문 검증 생략
+    deadline_skip_sources_below_seconds: float = 3.0  # 남은 시간이 이보다 적으면 출처 정보 조회 생략
+
+    # 폴더 핫 인덱스 설정 (프로세스 내 메모리 맵 벡터 검색)
+    hot_index_enabled: bool = False
+    hot_index_dir: str = "storage/vector_index"  # 메모리 맵 파일 저장 경로
+    hot_index_max_mb: int = 512  # 전체 핫 인덱스 최대 크기 (초과 시 LRU 제거)
+
+    # 하이브리드 검색 설정 (어휘 + 벡터, db/migrations/005 필요)
+    # 활성화 시 질문 텍스트가 있는 검색은 핫 인덱스보다 하이브리드 RPC를 우선 사용
+    hybrid_search_enabled: bool = False
+    hybrid_candidate_count: int = 40  # 각 검색(어휘/벡터)에서 융합 전에 가져올 후보 수
+    hybrid_rrf_k: int = 60  # Reciprocal Rank Fusion 상수
+
     # Google OAuth 설정
     google_client_id: Optional[str] = None
     google_client_secret: Optional[str] = None
     google_redirect_uri: Optional[str] = None  # 예: http://localhost:3000/api/auth/callback
+    google_certs_url: str = "https://www.googleapis.com/oauth2/v1/certs"  # ID 토큰 서명 인증서
+    google_certs_fetch_timeout_seconds: float = 5.0
+    google_certs_default_max_age_seconds: float = 3600.0  # 응답에 Cache-Control max-age가 없을 때 캐시 시간
+    google_certs_refresh_margin_seconds: float = 300.0  # 만료 이 시간 전부터 백그라운드에서 미리 갱신
     
     # JWT 설정
     jwt_secret_key: str = "draft-ai-secret-key-change-in-production"  # 프로덕션에서는 반드시 변경하세요!
     jwt_algorithm: str = "HS256"
     jwt_access_token_expire_minutes: int = 60 * 24 * 7  # 7일
+
+    # 인증 사용자 캐시 설정 (get_current_user의 users 조회를 요청마다 반복하지 않음)
+    auth_user_cache_ttl_seconds: float = 30.0  # 사용자 정보 캐시 시간(초, 프로필 변경/삭제 시 즉시 무효화)
+    auth_user_cache_max_size: int = 10000  # 캐시할 최대 사용자 수
+    auth_trust_jwt_claims: bool = False  # True면 trust_claims 경로에서 서명된 JWT 클레임만으로 사용자 확인 (DB 조회 없음)
     
     # CORS 설정
     cors_origins: str = "http://localhost:3000,http://127.0.0.1:3000"  # 쉼표로 구분된 허용된 오리진 목록
 
+    @field_validator("embedding_short_dims")
+    @classmethod
+    def _validate_embedding_short_dims(cls, value: int) -> int:
+        # db/migrations/007에 부분 인덱스가 있는 차원만 허용
+        if value not in (0, 256, 512):
+            raise ValueError(f"embedding_short_dims는 0, 256, 512 중 하나여야 합니다: {value}")
+        return value
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -7,6 +7,7 @@ import atexit
 from .api import router as api_router
 from .core.config import get_settings
 from .services.batch_indexing_service import BatchIndexingService
+from .services.google_token_verifier import get_google_token_verifier
 
 
 def create_app() -> FastAPI:
@@ -52,6 +53,10 @@ def create_app() -> FastAPI:
     # 배치 인덱싱 스케줄러 시작
     _start_batch_scheduler()
 
+    # 첫 로그인이 인증서 조회를 기다리지 않도록 구글 인증서를 미리 가져옴
+    if settings.google_client_id:
+        get_google_token_verifier().refresh_in_background()
+
     return app
 
 
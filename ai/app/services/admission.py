@@ -0,0 +1,264 @@
+"""
+LLM 호출 승인 제어 (admission control)
+
+/query 답변 생성, 질문 검증, 인덱싱 시 Q&A 추출 등 모든 LLM 호출이 이 컨트롤러를 거쳐
+다음 제한을 공유합니다.
+
+- 전역 동시 실행 수 (llm_max_concurrency)
+- 사용자별 동시 실행 수 (llm_per_user_concurrency)
+- 분당 토큰 수 (llm_tokens_per_minute, 토큰 버킷)
+- 우선순위 레인: 대화형 질의(interactive)가 인덱싱(background)보다 먼저 실행
+- 대기열 기한: 레인별 제한 시간 안에 승인되지 않으면 AdmissionRejected
+
+API 라우터와 배치 인덱싱 서비스가 서로 다른 QnARAGService 인스턴스를 쓰므로
+모듈 단위 싱글톤으로 공유합니다.
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+LANE_INTERACTIVE = "interactive"
+LANE_BACKGROUND = "background"
+
+_LANE_PRIORITY = {LANE_INTERACTIVE: 0, LANE_BACKGROUND: 1}
+
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 찼거나 기한 안에 승인되지 않은 경우"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, seq: int, lane: str, user_id: Optional[str], tokens: float):
+        self.seq = seq
+        self.priority = _LANE_PRIORITY.get(lane, len(_LANE_PRIORITY))
+        self.lane = lane
+        self.user_id = user_id
+        self.tokens = tokens
+
+    @property
+    def order(self):
+        return (self.priority, self.seq)
+
+
+class AdmissionController:
+    """전역/사용자별 동시 실행 수와 토큰 속도를 제한하는 우선순위 대기열 (스레드 안전)"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_user_concurrency: int = 2,
+        tokens_per_minute: int = 0,
+        max_queue: int = 100,
+        lane_timeouts: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            max_concurrency: 전역 동시 실행 수
+            per_user_concurrency: 사용자별 동시 실행 수 (0이면 제한 없음)
+            tokens_per_minute: 분당 토큰 수 (0이면 제한 없음)
+            max_queue: 최대 대기 요청 수 (초과 시 즉시 거절)
+            lane_timeouts: 레인별 기본 대기 기한(초)
+            clock: 시간 함수 (테스트용으로 교체 가능)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_user_concurrency = per_user_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue = max_queue
+        self.lane_timeouts = lane_timeouts or {LANE_INTERACTIVE: 30.0, LANE_BACKGROUND: 600.0}
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._waiters: List[_Waiter] = []
+        self._active = 0
+        self._active_by_user: Dict[str, int] = {}
+        self._tokens = float(tokens_per_minute)
+        self._tokens_updated_at = clock()
+
+        self._admitted = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+
+    @contextmanager
+    def acquire(
+        self,
+        user_id: Optional[str] = None,
+        lane: str = LANE_INTERACTIVE,
+        estimated_tokens: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Iterator[None]:
+        """
+        승인될 때까지 대기한 뒤 블록을 실행하고 슬롯 반환
+
+        Args:
+            user_id: 요청 사용자 (None이면 사용자별 제한 미적용)
+            lane: LANE_INTERACTIVE 또는 LANE_BACKGROUND
+            estimated_tokens: 예상 토큰 수 (입력 + 출력)
+            timeout: 대기 기한(초), None이면 레인 기본값 (레인 기본값보다 길게 지정해도 레인 기본값으로 제한)
+
+        Raises:
+            AdmissionRejected: 대기열이 가득 찼거나 기한 안에 승인되지 않은 경우
+        """
+        self._admit(user_id, lane, estimated_tokens, timeout)
+        try:
+            yield
+        finally:
+            self._release(user_id)
+
+    def _admit(self, user_id: Optional[str], lane: str, estimated_tokens: int, timeout: Optional[float]) -> None:
+        lane_timeout = self.lane_timeouts.get(lane, 30.0)
+        # 요청 마감 시간에서 계산한 기한은 레인 기본값보다 짧을 때만 적용
+        timeout = lane_timeout if timeout is None else min(timeout, lane_timeout)
+        # 한 번에 버킷 용량보다 많이 요구하면 영원히 승인되지 않으므로 용량으로 제한
+        tokens = float(estimated_tokens)
+        if self.tokens_per_minute > 0:
+            tokens = min(tokens, float(self.tokens_per_minute))
+
+        started = self._clock()
+        deadline = started + timeout
+
+        with self._cond:
+            if len(self._waiters) >= self.max_queue:
+                self._rejected += 1
+                raise AdmissionRejected("LLM 요청 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.", retry_after=1.0)
+
+            waiter = _Waiter(next(self._seq), lane, user_id, tokens)
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    self._refill_tokens()
+                    if self._next_eligible() is waiter:
+                        break
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        self._rejected += 1
+                        raise AdmissionRejected(
+                            f"LLM 요청 대기 시간({timeout:g}초)을 초과했습니다. 잠시 후 다시 시도해주세요.",
+                            retry_after=self._retry_after(),
+                        )
+                    self._cond.wait(min(remaining, self._token_wait(waiter)))
+            finally:
+                self._waiters.remove(waiter)
+                # 순서가 바뀌었으므로 다른 대기자가 다시 확인하도록 깨움
+                self._cond.notify_all()
+
+            self._active += 1
+            if user_id is not None:
+                self._active_by_user[user_id] = self._active_by_user.get(user_id, 0) + 1
+            self._tokens -= tokens
+            self._admitted += 1
+            self._total_wait += self._clock() - started
+
+    def _release(self, user_id: Optional[str]) -> None:
+        with self._cond:
+            self._active -= 1
+            if user_id is not None:
+                count = self._active_by_user.get(user_id, 0) - 1
+                if count > 0:
+                    self._active_by_user[user_id] = count
+                else:
+                    self._active_by_user.pop(user_id, None)
+            self._cond.notify_all()
+
+    def _can_run(self, waiter: _Waiter) -> bool:
+        if self._active >= self.max_concurrency:
+            return False
+        if (
+            waiter.user_id is not None
+            and self.per_user_concurrency > 0
+            and self._active_by_user.get(waiter.user_id, 0) >= self.per_user_concurrency
+        ):
+            return False
+        if self.tokens_per_minute > 0 and self._tokens < waiter.tokens:
+            return False
+        return True
+
+    def _next_eligible(self) -> Optional[_Waiter]:
+        """
+        다음에 실행할 대기자 (우선순위 → 도착 순서)
+
+        사용자별 제한에 걸린 대기자는 건너뛰어 다른 사용자가 막히지 않게 하고,
+        전역 슬롯이나 토큰이 부족하면 앞선 대기자가 먼저 실행되도록 뒤 대기자도 기다립니다.
+        """
+        for waiter in sorted(self._waiters, key=lambda w: w.order):
+            if self._can_run(waiter):
+                return waiter
+            user_blocked = (
+                waiter.user_id is not None
+                and self.per_user_concurrency > 0
+                and self._active_by_user.get(waiter.user_id, 0) >= self.per_user_concurrency
+            )
+            if not user_blocked:
+                return None
+        return None
+
+    def _refill_tokens(self) -> None:
+        if self.tokens_per_minute <= 0:
+            return
+        now = self._clock()
+        elapsed = now - self._tokens_updated_at
+        self._tokens_updated_at = now
+        self._tokens = min(float(self.tokens_per_minute), self._tokens + elapsed * self.tokens_per_minute / 60.0)
+
+    def _token_wait(self, waiter: _Waiter) -> float:
+        """토큰이 부족할 때 다시 확인할 때까지의 시간 (슬롯 반환은 notify로 깨움)"""
+        if self.tokens_per_minute <= 0 or self._tokens >= waiter.tokens:
+            return 1.0
+        return max(0.05, (waiter.tokens - self._tokens) * 60.0 / self.tokens_per_minute)
+
+    def _retry_after(self) -> float:
+        if self.tokens_per_minute > 0 and self._tokens < 0:
+            return -self._tokens * 60.0 / self.tokens_per_minute
+        return 1.0
+
+    def stats(self) -> Dict:
+        with self._cond:
+            self._refill_tokens()
+            queued_by_lane: Dict[str, int] = {}
+            for waiter in self._waiters:
+                queued_by_lane[waiter.lane] = queued_by_lane.get(waiter.lane, 0) + 1
+            return {
+                "active": self._active,
+                "max_concurrency": self.max_concurrency,
+                "active_users": len(self._active_by_user),
+                "queued": len(self._waiters),
+                "queued_by_lane": queued_by_lane,
+                "tokens_available": round(self._tokens) if self.tokens_per_minute > 0 else None,
+                "tokens_per_minute": self.tokens_per_minute or None,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "avg_wait_seconds": round(self._total_wait / self._admitted, 3) if self._admitted else 0.0,
+            }
+
+
+_admission_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """프로세스 전역 AdmissionController 반환"""
+    global _admission_controller
+    if _admission_controller is None:
+        with _controller_lock:
+            if _admission_controller is None:
+                from app.core.config import get_settings
+                settings = get_settings()
+                _admission_controller = AdmissionController(
+                    max_concurrency=settings.llm_max_concurrency,
+                    per_user_concurrency=settings.llm_per_user_concurrency,
+                    tokens_per_minute=settings.llm_tokens_per_minute,
+                    max_queue=settings.llm_max_queue,
+                    lane_timeouts={
+                        LANE_INTERACTIVE: settings.llm_queue_timeout_interactive_seconds,
+                        LANE_BACKGROUND: settings.llm_queue_timeout_background_seconds,
+                    },
+                )
+    return _admission_controller
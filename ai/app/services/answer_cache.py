@@ -0,0 +1,187 @@
+"""
+폴더 단위 의미 기반 답변 캐시
+
+폴더의 문서가 바뀌지 않는 한 같은 질문의 답변은 바뀌지 않으므로,
+(폴더, 문서 집합 버전, 질문 임베딩)을 키로 생성된 답변을 저장해 두고
+유사도가 임계값 이상인 질문이 다시 들어오면 검색과 LLM 생성 없이 답변을 반환합니다.
+
+- 문서 집합 버전은 폴더의 (청크가 있는) 문서 ID 목록으로 계산하므로
+  업로드 후 인덱싱 완료, 삭제, 이동 시 자동으로 바뀝니다.
+- 같은 문서가 재인덱싱되는 경우는 invalidate_document로 명시적으로 무효화합니다.
+- API 라우터와 배치 인덱싱 서비스가 함께 무효화할 수 있도록 모듈 단위 싱글톤으로 공유합니다.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+import numpy as np
+
+
+def document_set_version(document_ids: Iterable[str]) -> str:
+    """문서 ID 목록으로 문서 집합 버전 문자열 계산 (순서 무관)"""
+    joined = ",".join(sorted(str(doc_id) for doc_id in document_ids))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+class CachedAnswer:
+    """캐시된 답변 항목"""
+
+    def __init__(self, question: str, embedding: np.ndarray, answer: str):
+        self.question = question
+        self.embedding = embedding
+        self.answer = answer
+        self.created_at = time.time()
+
+
+class _FolderBucket:
+    """폴더 하나의 캐시 항목 묶음 (같은 문서 집합 버전)"""
+
+    def __init__(self, version: str, document_set: FrozenSet[str]):
+        self.version = version
+        self.document_set = document_set
+        self.entries: List[CachedAnswer] = []
+
+
+class SemanticAnswerCache:
+    """폴더별 의미 기반 답변 캐시 (스레드 안전)"""
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.97,
+        ttl_seconds: float = 60 * 60 * 24,
+        max_entries_per_folder: int = 200,
+        max_folders: int = 1000,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_folder = max_entries_per_folder
+        self.max_folders = max_folders
+        self._buckets: "OrderedDict[str, _FolderBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def lookup(
+        self,
+        folder_key: str,
+        document_ids: Iterable[str],
+        query_embedding: List[float],
+    ) -> Optional[Dict]:
+        """
+        유사한 질문의 캐시된 답변 조회
+
+        Returns:
+            {"answer", "question", "similarity"} 또는 None
+        """
+        version = document_set_version(document_ids)
+        query = self._normalize(query_embedding)
+        now = time.time()
+
+        with self._lock:
+            bucket = self._buckets.get(folder_key)
+            if bucket is None or bucket.version != version:
+                self._misses += 1
+                return None
+            bucket.entries = [e for e in bucket.entries if now - e.created_at < self.ttl_seconds]
+            if not bucket.entries:
+                self._misses += 1
+                return None
+            entries = list(bucket.entries)
+            self._buckets.move_to_end(folder_key)
+
+        scores = np.vstack([e.embedding for e in entries]) @ query
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+
+        with self._lock:
+            if similarity < self.similarity_threshold:
+                self._misses += 1
+                return None
+            self._hits += 1
+
+        return {
+            "answer": entries[best].answer,
+            "question": entries[best].question,
+            "similarity": similarity,
+        }
+
+    def store(
+        self,
+        folder_key: str,
+        document_ids: Iterable[str],
+        question: str,
+        query_embedding: List[float],
+        answer: str,
+    ) -> None:
+        """생성된 답변 저장"""
+        document_ids = [str(doc_id) for doc_id in document_ids]
+        version = document_set_version(document_ids)
+        entry = CachedAnswer(question, self._normalize(query_embedding), answer)
+
+        with self._lock:
+            bucket = self._buckets.get(folder_key)
+            if bucket is None or bucket.version != version:
+                bucket = _FolderBucket(version, frozenset(document_ids))
+                self._buckets[folder_key] = bucket
+            bucket.entries.append(entry)
+            if len(bucket.entries) > self.max_entries_per_folder:
+                bucket.entries = bucket.entries[-self.max_entries_per_folder:]
+            self._buckets.move_to_end(folder_key)
+            while len(self._buckets) > self.max_folders:
+                self._buckets.popitem(last=False)
+
+    def invalidate_folder(self, folder_key: str) -> bool:
+        with self._lock:
+            return self._buckets.pop(folder_key, None) is not None
+
+    def invalidate_document(self, document_id: str) -> int:
+        """해당 문서를 포함하는 모든 폴더의 캐시 제거 (재인덱싱 등)"""
+        document_id = str(document_id)
+        with self._lock:
+            stale = [key for key, bucket in self._buckets.items() if document_id in bucket.document_set]
+            for key in stale:
+                del self._buckets[key]
+            return len(stale)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "folders": len(self._buckets),
+                "entries": sum(len(bucket.entries) for bucket in self._buckets.values()),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "similarity_threshold": self.similarity_threshold,
+            }
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+_semantic_answer_cache: Optional[SemanticAnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_answer_cache() -> Optional[SemanticAnswerCache]:
+    """프로세스 전역 SemanticAnswerCache 반환 (answer_cache_enabled가 False면 None)"""
+    global _semantic_answer_cache
+    from app.core.config import get_settings
+    settings = get_settings()
+    if not settings.answer_cache_enabled:
+        return None
+    if _semantic_answer_cache is None:
+        with _cache_lock:
+            if _semantic_answer_cache is None:
+                _semantic_answer_cache = SemanticAnswerCache(
+                    similarity_threshold=settings.answer_cache_similarity_threshold,
+                    ttl_seconds=settings.answer_cache_ttl_seconds,
+                    max_entries_per_folder=settings.answer_cache_max_entries_per_folder,
+                )
+    return _semantic_answer_cache
@@ -5,10 +5,14 @@
 """
 import os
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, List, Optional
 from datetime import datetime
 from app.core.database import Database
+from app.services.admission import AdmissionRejected
+from app.services.change_stamps import get_change_stamp_tracker
 from app.services.qna_rag_service import QnARAGService
+from app.services.resilience import UpstreamUnavailable
+from app.services.status_broker import get_document_status_broker
 from app.core.config import get_settings
 
 
@@ -31,6 +35,27 @@ class BatchIndexingService:
             )
         return self.rag_service
     
+    @staticmethod
+    def _set_status(db, document: Dict, status: str, message: Optional[str] = None) -> None:
+        """
+        문서 상태 업데이트 후 상태 구독자에게 전달하고 목록 변경 스탬프 무효화
+        
+        Args:
+            db: Supabase 클라이언트
+            document: 문서 정보 딕셔너리 (id, user_id 사용)
+            status: 새 상태 (uploaded, processing, completed, failed)
+            message: 실패 사유 등 설명 (구독자에게만 전달)
+        """
+        # updated_at은 DB 트리거가 now()로 기록 (db/migrations/012)
+        db.table("documents").update({"status": status}).eq("id", document.get("id")).execute()
+        get_change_stamp_tracker().invalidate(document.get("user_id"))
+        get_document_status_broker().publish(
+            document_id=document.get("id"),
+            user_id=document.get("user_id"),
+            status=status,
+            message=message,
+        )
+    
     def get_pending_documents(self, limit: int = 10) -> List[Dict]:
         """
         인덱싱이 필요한 문서 목록 조회
@@ -93,58 +118,56 @@ class BatchIndexingService:
             if not os.path.exists(absolute_path):
                 print(f"파일을 찾을 수 없습니다: {absolute_path}")
                 # 상태를 'failed'로 업데이트
-                db.table("documents").update({
-                    "status": "failed",
-                    "updated_at": datetime.now().isoformat(),
-                }).eq("id", document_id).execute()
+                self._set_status(db, document, "failed", message="파일을 찾을 수 없습니다.")
                 return False
         except Exception as e:
             print(f"파일 경로 변환 실패: {e}")
-            db.table("documents").update({
-                "status": "failed",
-                "updated_at": datetime.now().isoformat(),
-            }).eq("id", document_id).execute()
+            self._set_status(db, document, "failed", message=f"파일 경로 변환 실패: {e}")
             return False
         
         try:
             # 상태를 'processing'으로 업데이트
-            db.table("documents").update({
-                "status": "processing",
-                "updated_at": datetime.now().isoformat(),
-            }).eq("id", document_id).execute()
+            self._set_status(db, document, "processing")
             
-            # RAG 서비스로 인덱싱
+            # RAG 서비스로 인덱싱 (단계별 진행 상황은 상태 구독자에게 전달)
+            broker = get_document_status_broker()
             rag_service = self._get_rag_service()
             success = rag_service.build_index_for_document(
                 document_id=document_id,
                 pdf_path=absolute_path,
                 folder_id=folder_id,
+                user_id=document.get("user_id"),
+                progress=lambda stage, info: broker.publish(
+                    document_id=document_id,
+                    user_id=document.get("user_id"),
+                    stage=stage,
+                    progress=info,
+                ),
             )
             
             if success:
                 # 상태를 'completed'로 업데이트
-                db.table("documents").update({
-                    "status": "completed",
-                    "updated_at": datetime.now().isoformat(),
-                }).eq("id", document_id).execute()
+                self._set_status(db, document, "completed")
                 print(f"문서 인덱싱 완료: {document_id} ({document.get('original_filename', 'unknown')})")
                 return True
             else:
                 # 상태를 'failed'로 업데이트
-                db.table("documents").update({
-                    "status": "failed",
-                    "updated_at": datetime.now().isoformat(),
-                }).eq("id", document_id).execute()
+                self._set_status(db, document, "failed", message="인덱싱 실패 (질의응답쌍 없음 또는 저장 실패)")
                 print(f"문서 인덱싱 실패: {document_id} ({document.get('original_filename', 'unknown')})")
                 return False
                 
+        except (AdmissionRejected, UpstreamUnavailable) as e:
+            # LLM 일시 불가: 실패로 분류하지 않고 'uploaded'로 되돌려 다음 배치에서 재시도
+            try:
+                self._set_status(db, document, "uploaded", message=f"LLM 일시 불가로 재시도 대기: {e}")
+            except Exception:
+                pass
+            print(f"문서 인덱싱 보류 (다음 배치에서 재시도): {document_id} - {e}")
+            return False
         except Exception as e:
             # 에러 발생 시 상태를 'failed'로 업데이트
             try:
-                db.table("documents").update({
-                    "status": "failed",
-                    "updated_at": datetime.now().isoformat(),
-                }).eq("id", document_id).execute()
+                self._set_status(db, document, "failed", message=str(e))
             except:
                 pass
             print(f"문서 인덱싱 중 에러 발생: {e}")
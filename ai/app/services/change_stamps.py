@@ -0,0 +1,183 @@
+"""
+사용자별 변경 스탬프 (ETag / 조건부 GET / 변경분 동기화용)
+
+프론트엔드가 문서 목록, 폴더 목록, 문서 상태를 주기적으로 폴링하므로
+사용자의 documents / folders 최신 updated_at을 변경 스탬프로 사용하여
+
+- 스탬프가 같으면 목록 쿼리와 직렬화 없이 304 Not Modified 응답
+- 스탬프를 동기화 토큰으로 내려주어 이후에는 변경된 행만 조회 (since)
+
+할 수 있게 합니다. 문서 쓰기(업로드, 상태 변경, 소프트 삭제)는 모두 updated_at을 갱신하므로
+최신 updated_at만으로 변경 여부를 판단할 수 있습니다. updated_at은 DB 트리거가 now()로만 기록하므로
+(db/migrations/012) 애플리케이션 서버의 시계나 timezone과 무관합니다.
+
+단, now()는 트랜잭션 시작 시각이므로 긴 쓰기 트랜잭션은 이미 발급된 토큰보다 이른 updated_at으로
+나중에 커밋될 수 있습니다. 그래서 동기화 토큰은 sync_token_lag_seconds만큼 과거 위치로 발급하고,
+그 구간의 변경은 다시 전송합니다. (클라이언트는 문서 id로 병합하여 중복을 제거)
+같은 이유로 최근 변경이 그 구간 안에 있으면 최신 updated_at이 그대로여도 목록이 바뀔 수 있으므로
+ETag를 매번 다르게 만들어 304를 보내지 않습니다.
+
+스탬프 조회 자체도 (user_id, updated_at) 인덱스 한 번이면 되지만,
+짧은 TTL(change_stamp_cache_ttl_seconds) 동안 메모리에 보관하여 유휴 폴링은 DB 왕복 없이 처리하고
+이 프로세스의 쓰기 경로에서는 invalidate()로 즉시 무효화합니다.
+"""
+
+import hashlib
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from supabase import Client
+
+from app.utils.cache import TTLCache
+from app.utils.pagination import encode_cursor
+
+# 변경분 동기화 토큰의 id 자리 값 (같은 updated_at의 모든 행 이후 / 모든 행 포함)
+_MAX_UUID = "ffffffff-ffff-ffff-ffff-ffffffffffff"
+_MIN_UUID = "00000000-0000-0000-0000-000000000000"
+_EPOCH = "1970-01-01T00:00:00+00:00"
+
+
+def sync_token_for(updated_at: Optional[str], lag_seconds: float) -> str:
+    """
+    updated_at까지의 변경을 반영했음을 나타내는 since 토큰
+
+    늦게 커밋되는 긴 트랜잭션의 행을 놓치지 않도록 lag_seconds만큼 과거 위치를 가리킵니다.
+    (lag_seconds가 0 이하이면 updated_at의 모든 행 이후)
+    """
+    if not updated_at:
+        return encode_cursor({"updated_at": _EPOCH, "id": _MIN_UUID}, sort_key="updated_at")
+    if lag_seconds <= 0:
+        return encode_cursor({"updated_at": updated_at, "id": _MAX_UUID}, sort_key="updated_at")
+    moment = _parse_timestamp(updated_at) - timedelta(seconds=lag_seconds)
+    return encode_cursor({"updated_at": moment.isoformat(), "id": _MIN_UUID}, sort_key="updated_at")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+class ChangeStamp:
+    """사용자 데이터의 변경 스탬프"""
+
+    def __init__(
+        self,
+        documents_updated_at: Optional[str],
+        folders_updated_at: Optional[str],
+        sync_lag_seconds: float = 0.0,
+    ):
+        self.documents_updated_at = documents_updated_at
+        self.folders_updated_at = folders_updated_at
+        self.sync_lag_seconds = sync_lag_seconds
+
+    def etag(self, *parts) -> str:
+        """스탬프와 요청 파라미터로 만든 약한 ETag (최근 변경이 sync_lag_seconds 안이면 매번 다른 값)"""
+        raw = "|".join(str(part) for part in (self.documents_updated_at, self.folders_updated_at, *parts))
+        if not self.settled():
+            raw += f"|{uuid.uuid4().hex}"
+        return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]}"'
+
+    def settled(self) -> bool:
+        """마지막 변경 후 sync_lag_seconds가 지나 늦게 커밋될 수 있는 이전 시각의 쓰기가 없는지"""
+        if self.sync_lag_seconds <= 0:
+            return True
+        now = datetime.now(timezone.utc)
+        for updated_at in (self.documents_updated_at, self.folders_updated_at):
+            if not updated_at:
+                continue
+            try:
+                if (now - _parse_timestamp(updated_at)).total_seconds() < self.sync_lag_seconds:
+                    return False
+            except (TypeError, ValueError):
+                return False
+        return True
+
+    @property
+    def sync_token(self) -> str:
+        """현재까지의 문서 변경을 모두 반영했음을 나타내는 since 토큰 (sync_lag_seconds 구간은 다시 전송)"""
+        return sync_token_for(self.documents_updated_at, self.sync_lag_seconds)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 ETag와 일치하는지 (약한 비교, 목록 및 * 지원)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_strip_weak(tag) == _strip_weak(etag) for tag in if_none_match.split(","))
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+class ChangeStampTracker:
+    """사용자별 변경 스탬프 조회 및 단기 캐시 (스레드 안전)"""
+
+    def __init__(self, ttl_seconds: float = 2.0, maxsize: int = 10000, sync_lag_seconds: float = 0.0):
+        self._cache: TTLCache[ChangeStamp] = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.sync_lag_seconds = sync_lag_seconds
+
+    def get(self, db: Client, user_id: str) -> ChangeStamp:
+        """
+        사용자의 변경 스탬프 반환
+
+        get_user_change_stamp RPC(db/migrations/011)를 사용하고,
+        없으면 documents / folders에서 최신 updated_at을 각각 한 행씩 조회합니다.
+        """
+        stamp = self._cache.get(user_id)
+        if stamp is None:
+            stamp = self._load(db, user_id, self.sync_lag_seconds)
+            self._cache.set(user_id, stamp)
+        return stamp
+
+    def invalidate(self, user_id: Optional[str]) -> None:
+        """사용자 데이터가 바뀐 경우 캐시된 스탬프 제거"""
+        if user_id:
+            self._cache.pop(user_id)
+
+    def stats(self):
+        return self._cache.stats()
+
+    @staticmethod
+    def _load(db: Client, user_id: str, sync_lag_seconds: float) -> ChangeStamp:
+        try:
+            result = db.rpc("get_user_change_stamp", {"p_user_id": user_id}).execute()
+            row = result.data[0] if isinstance(result.data, list) and result.data else (result.data or {})
+            return ChangeStamp(row.get("documents_updated_at"), row.get("folders_updated_at"), sync_lag_seconds)
+        except Exception as e:
+            print(f"get_user_change_stamp RPC 실패, 개별 쿼리로 폴백: {e}")
+
+        latest = {}
+        for table in ("documents", "folders"):
+            result = (
+                db.table(table)
+                .select("updated_at")
+                .eq("user_id", user_id)
+                .order("updated_at", desc=True)
+                .limit(1)
+                .execute()
+            )
+            latest[table] = result.data[0].get("updated_at") if result.data else None
+        return ChangeStamp(latest["documents"], latest["folders"], sync_lag_seconds)
+
+
+_change_stamp_tracker: Optional[ChangeStampTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_change_stamp_tracker() -> ChangeStampTracker:
+    """프로세스 전역 ChangeStampTracker 반환"""
+    global _change_stamp_tracker
+    if _change_stamp_tracker is None:
+        with _tracker_lock:
+            if _change_stamp_tracker is None:
+                from app.core.config import get_settings
+                settings = get_settings()
+                _change_stamp_tracker = ChangeStampTracker(
+                    ttl_seconds=settings.change_stamp_cache_ttl_seconds,
+                    sync_lag_seconds=settings.sync_token_lag_seconds,
+                )
+    return _change_stamp_tracker
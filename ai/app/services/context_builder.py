@@ -0,0 +1,165 @@
+"""
+RAG 프롬프트 컨텍스트 구성
+
+검색된 청크를 그대로 이어 붙이지 않고 다음 단계를 거쳐 프롬프트에 넣을 청크를 고릅니다.
+
+1. 적응형 k: 최고 점수 대비 점수가 크게 떨어지는 청크는 제외 (최소 min_k개는 유지)
+2. 중복 제거: 여러 PDF에 같은 Q&A가 있는 경우처럼 내용이 거의 같은 청크는 하나만 사용
+3. 토큰 예산: 선택된 청크의 토큰 합이 max_tokens를 넘지 않도록 제한
+"""
+
+import re
+from typing import Dict, FrozenSet, List
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken 미설치 또는 인코딩 파일 다운로드 실패
+    _ENCODING = None
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수 계산
+
+    tiktoken이 없으면 보수적으로 추정합니다 (ASCII 4자당 1토큰, 한글 등은 1자당 1토큰).
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """텍스트를 max_tokens 토큰 이하로 자르기"""
+    if max_tokens <= 0:
+        return ""
+    if _ENCODING is not None:
+        tokens = _ENCODING.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return _ENCODING.decode(tokens[:max_tokens])
+    if count_tokens(text) <= max_tokens:
+        return text
+    # 추정치 기준으로 이진 탐색
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def _shingles(text: str, size: int = 3) -> FrozenSet[str]:
+    """공백을 제거한 문자 n-gram 집합 (한글 띄어쓰기 차이에 영향받지 않고 형태소 분석 없이 비교 가능)"""
+    normalized = _WHITESPACE.sub("", text).casefold()
+    if len(normalized) <= size:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(normalized[i:i + size] for i in range(len(normalized) - size + 1))
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def is_strong_lexical_match(node: Dict, min_lexical_score: float) -> bool:
+    """
+    하이브리드 검색의 어휘 일치가 임베딩 점수를 무시할 만큼 강한지 여부
+
+    lexical_rank는 흔한 단어 하나만 겹쳐도 붙으므로 RPC가 반환한 lexical_score(0~1)로 판단합니다.
+    (db/migrations/005 참고, 점수가 없는 검색 결과는 해당 없음)
+    """
+    score = node.get("lexical_score")
+    return node.get("lexical_rank") is not None and score is not None and float(score) >= min_lexical_score
+
+
+def select_context_nodes(
+    nodes: List[Dict],
+    max_k: int,
+    max_tokens: int = 3000,
+    min_k: int = 1,
+    min_relative_score: float = 0.0,
+    dedup_threshold: float = 0.85,
+    min_lexical_score: float = 0.5,
+) -> List[Dict]:
+    """
+    프롬프트에 넣을 청크 선택
+
+    Args:
+        nodes: 검색 결과 (검색 순위순, content/score 키 포함, 하이브리드 검색은 RRF 순위라 score 순이 아닐 수 있음)
+        max_k: 최대 청크 수 (요청의 similarity_top_k)
+        max_tokens: 컨텍스트 전체 토큰 예산
+        min_k: 점수와 무관하게 유지할 최소 청크 수
+        min_relative_score: 최고 점수 대비 이 비율 미만인 청크는 제외 (0이면 비활성, 강한 어휘 일치 청크는 예외)
+        dedup_threshold: 문자 3-gram Jaccard 유사도가 이 값 이상이면 중복으로 간주 (1 이상이면 비활성)
+        min_lexical_score: 점수 컷 예외로 인정할 최소 어휘 점수 (is_strong_lexical_match)
+
+    Returns:
+        선택된 청크 리스트 (순서 유지, 예산 때문에 잘린 청크는 content가 축약됨)
+    """
+    candidates = [node for node in nodes if node.get("content")]
+    if not candidates or max_k <= 0:
+        return []
+
+    # 하이브리드 검색 결과는 score(벡터 유사도) 순이 아니므로 첫 청크가 아닌 최댓값을 기준으로 사용
+    scores = [node["score"] for node in candidates if node.get("score") is not None]
+    top_score = max(scores) if scores else None
+    selected: List[Dict] = []
+    selected_shingles: List[FrozenSet[str]] = []
+    used_tokens = 0
+    skipped_duplicates = 0
+    skipped_low_score = 0
+    skipped_budget = 0
+
+    for node in candidates:
+        if len(selected) >= max_k:
+            break
+
+        score = node.get("score")
+        if (
+            len(selected) >= min_k
+            and min_relative_score > 0
+            and top_score and top_score > 0
+            and score is not None
+            and score < top_score * min_relative_score
+            and not is_strong_lexical_match(node, min_lexical_score)
+        ):
+            # 강한 어휘 일치 청크는 임베딩 점수가 낮아도 유지 (_passes_relevance_gate와 같은 기준)
+            skipped_low_score += 1
+            continue
+
+        content = node["content"]
+        shingles = _shingles(content)
+        if dedup_threshold < 1 and any(_jaccard(shingles, prev) >= dedup_threshold for prev in selected_shingles):
+            skipped_duplicates += 1
+            continue
+
+        tokens = count_tokens(content)
+        remaining = max_tokens - used_tokens
+        if tokens > remaining:
+            if selected:
+                # 더 짧은 다음 청크는 들어갈 수 있으므로 계속 진행
+                skipped_budget += 1
+                continue
+            # 첫 청크가 예산보다 크면 잘라서라도 사용
+            content = truncate_to_tokens(content, remaining)
+            tokens = count_tokens(content)
+            node = {**node, "content": content}
+
+        selected.append(node)
+        selected_shingles.append(shingles)
+        used_tokens += tokens
+
+    print(
+        f"컨텍스트 구성: 후보 {len(candidates)}개 → 선택 {len(selected)}개, 토큰={used_tokens}/{max_tokens} "
+        f"(중복 제외 {skipped_duplicates}, 예산 초과 {skipped_budget}, 점수 미달 {skipped_low_score})"
+    )
+    return selected
@@ -0,0 +1,219 @@
+"""
+구글 ID 토큰 검증기 (공개 인증서 캐시)
+
+google.oauth2.id_token.verify_oauth2_token은 호출마다 구글 서명 인증서를 네트워크로 내려받으므로
+로그인 지연이 외부 HTTP 요청에 좌우됩니다. 이 모듈은
+
+- 인증서를 응답의 Cache-Control max-age 동안 메모리에 보관하고
+- 커넥션 풀을 공유하는 requests.Session 하나로 인증서를 가져오며
+- 만료가 가까워지면 백그라운드 스레드에서 미리 갱신하여 (그동안 기존 인증서로 검증)
+
+토큰 서명을 로컬에서 검증합니다. 구글이 키를 교체하여 토큰의 kid가 캐시에 없으면 한 번 동기 갱신합니다.
+fetcher를 주입하면 네트워크 없이 로컬 키 세트로 검증할 수 있습니다.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import google.auth.jwt
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# 인증서 조회 함수: (kid → PEM 인증서, 캐시 유효 시간(초, 헤더가 없으면 None))
+CertsFetcher = Callable[[], Tuple[Dict[str, str], Optional[float]]]
+
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+def parse_max_age(cache_control: Optional[str]) -> Optional[float]:
+    """Cache-Control 헤더의 max-age(초), no-cache/no-store이거나 없으면 None"""
+    if not cache_control:
+        return None
+    directives = cache_control.lower()
+    if "no-cache" in directives or "no-store" in directives:
+        return None
+    match = _MAX_AGE_PATTERN.search(directives)
+    return float(match.group(1)) if match else None
+
+
+class HTTPCertsFetcher:
+    """풀링된 세션으로 구글 공개 인증서를 가져오는 기본 fetcher"""
+
+    def __init__(self, url: str = GOOGLE_CERTS_URL, timeout: float = 5.0):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+    def __call__(self) -> Tuple[Dict[str, str], Optional[float]]:
+        response = self.session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json(), parse_max_age(response.headers.get("Cache-Control"))
+
+
+class GoogleTokenVerifier:
+    """캐시된 공개 인증서로 구글 ID 토큰을 로컬 검증 (스레드 안전)"""
+
+    def __init__(
+        self,
+        client_id: str,
+        fetcher: Optional[CertsFetcher] = None,
+        default_max_age_seconds: float = 3600.0,
+        refresh_margin_seconds: float = 300.0,
+        min_refresh_interval_seconds: float = 30.0,
+        clock_skew_seconds: int = 10,
+    ):
+        self.client_id = client_id
+        self.fetcher: CertsFetcher = fetcher or HTTPCertsFetcher()
+        self.default_max_age_seconds = default_max_age_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self.clock_skew_seconds = clock_skew_seconds
+
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._last_fetch_at = 0.0
+        self._last_attempt_at = 0.0  # 성공 여부와 무관한 마지막 조회 시도 (재조회 간격 제한용)
+        self._lock = threading.Lock()  # 동기 갱신 직렬화 (조회하는 동안 보유)
+        self._refreshing_lock = threading.Lock()  # _refreshing 플래그 전용 (조회를 기다리지 않음)
+        self._refreshing = False  # 백그라운드 갱신 진행 여부
+        self._fetches = 0
+        self._fetch_errors = 0
+        self._background_refreshes = 0
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        토큰 서명, 만료, audience, issuer 검증
+
+        Returns:
+            토큰 클레임 (sub, email, name, picture 등)
+
+        Raises:
+            ValueError: 토큰이 유효하지 않은 경우
+        """
+        certs = self._certs_for(token)
+        id_info = google.auth.jwt.decode(
+            token,
+            certs=certs,
+            audience=self.client_id,
+            clock_skew_in_seconds=self.clock_skew_seconds,  # 시간 동기화 차이 허용
+        )
+        if id_info.get('iss') not in GOOGLE_ISSUERS:
+            raise ValueError(f'Wrong issuer: {id_info.get("iss")}')
+        return id_info
+
+    def certs(self) -> Dict[str, str]:
+        """
+        현재 인증서 반환
+
+        만료됐거나 없으면 동기 갱신하고, 만료가 가까우면 백그라운드 갱신을 시작한 뒤 기존 인증서를 반환합니다.
+        """
+        now = time.monotonic()
+        if not self._certs or now >= self._expires_at:
+            self.refresh()
+        elif (
+            now >= self._expires_at - self.refresh_margin_seconds
+            and now - self._last_attempt_at >= self.min_refresh_interval_seconds
+        ):
+            # 갱신 실패 후에는 간격을 두고 재시도 (장애 중 검증마다 조회하지 않도록)
+            self.refresh_in_background()
+        return self._certs
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        인증서 동기 갱신 (동시 호출은 한 번만 조회)
+
+        조회 실패 시 기존 인증서가 있으면 계속 사용하고, 없으면 예외를 그대로 전달합니다.
+        """
+        started = time.monotonic()
+        with self._lock:
+            # 대기하는 동안 다른 스레드가 갱신했으면 생략
+            if self._last_fetch_at > started or (not force and self._certs and time.monotonic() < self._expires_at):
+                return
+            try:
+                self._fetch()
+            except Exception as e:
+                self._fetch_errors += 1
+                if not self._certs:
+                    raise
+                # 장애 중에 모든 로그인이 조회 타임아웃을 기다리지 않도록 잠시 기존 인증서 유지
+                self._expires_at = max(self._expires_at, time.monotonic() + self.min_refresh_interval_seconds)
+                print(f"구글 인증서 갱신 실패, 기존 인증서 사용: {e}")
+
+    def refresh_in_background(self) -> None:
+        """이미 진행 중이 아니면 데몬 스레드에서 인증서 갱신 (호출 스레드는 조회를 기다리지 않음)"""
+        with self._refreshing_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        self._background_refreshes += 1
+        threading.Thread(target=self._background_refresh, name="google-certs-refresh", daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._certs),
+            "expires_in_seconds": max(0.0, round(self._expires_at - time.monotonic(), 1)),
+            "fetches": self._fetches,
+            "fetch_errors": self._fetch_errors,
+            "background_refreshes": self._background_refreshes,
+        }
+
+    def _certs_for(self, token: str) -> Dict[str, str]:
+        certs = self.certs()
+        kid = google.auth.jwt.decode_header(token).get("kid")
+        if kid and kid not in certs and time.monotonic() - self._last_attempt_at >= self.min_refresh_interval_seconds:
+            # 키 교체 직후: 캐시 만료 전이라도 한 번 다시 조회 (잘못된 kid로 조회를 반복하지 않도록 간격 제한)
+            self.refresh(force=True)
+            certs = self._certs
+        return certs
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh(force=True)
+        except Exception as e:
+            print(f"구글 인증서 백그라운드 갱신 실패: {e}")
+        finally:
+            with self._refreshing_lock:
+                self._refreshing = False
+
+    def _fetch(self) -> None:
+        """호출자가 self._lock을 보유한 상태에서 인증서 조회"""
+        self._last_attempt_at = time.monotonic()
+        certs, max_age = self.fetcher()
+        if not certs:
+            raise ValueError("구글 인증서 응답이 비어 있습니다.")
+        now = time.monotonic()
+        self._certs = dict(certs)
+        self._expires_at = now + (max_age if max_age is not None else self.default_max_age_seconds)
+        self._last_fetch_at = now
+        self._fetches += 1
+
+
+_google_token_verifier: Optional[GoogleTokenVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_google_token_verifier() -> GoogleTokenVerifier:
+    """프로세스 전역 GoogleTokenVerifier 반환 (google_client_id 필요)"""
+    global _google_token_verifier
+    if _google_token_verifier is None:
+        with _verifier_lock:
+            if _google_token_verifier is None:
+                from app.core.config import get_settings
+                settings = get_settings()
+                _google_token_verifier = GoogleTokenVerifier(
+                    client_id=settings.google_client_id,
+                    fetcher=HTTPCertsFetcher(
+                        url=settings.google_certs_url,
+                        timeout=settings.google_certs_fetch_timeout_seconds,
+                    ),
+                    default_max_age_seconds=settings.google_certs_default_max_age_seconds,
+                    refresh_margin_seconds=settings.google_certs_refresh_margin_seconds,
+                )
+    return _google_token_verifier
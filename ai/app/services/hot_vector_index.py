@@ -0,0 +1,230 @@
+"""
+폴더 단위 프로세스 내 벡터 인덱스 (핫 티어)
+
+자주 조회되는 폴더의 청크 임베딩을 정규화된 float32 행렬로 메모리 맵 파일에 저장해 두고,
+해당 폴더의 벡터 검색을 Postgres 왕복 없이 로컬에서 처리합니다.
+
+- 원본 데이터는 항상 Postgres(document_chunks)이며, 이 인덱스는 캐시입니다.
+- 첫 조회 시 백그라운드로 워밍하고(그 요청은 Postgres로 처리), 프리페치 API로 미리 워밍할 수 있습니다.
+- 각 항목은 만들 때의 문서 집합을 기억하며, 조회 시 문서 집합이 다르면(업로드/삭제/이동) 사용하지 않습니다.
+- 전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 폴더부터 제거합니다.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.vector_cache import EmbeddingMatrix
+
+# document_ids를 받아 EmbeddingMatrix를 만드는 함수 (DB 조회)
+MatrixLoader = Callable[[List[str]], EmbeddingMatrix]
+
+
+class HotFolderEntry:
+    """폴더 하나의 메모리 맵 인덱스 항목"""
+
+    def __init__(self, matrix: EmbeddingMatrix, document_set: FrozenSet[str], path: Optional[Path]):
+        self.matrix = matrix
+        self.document_set = document_set
+        self.path = path
+        self.loaded_at = time.time()
+
+    @property
+    def nbytes(self) -> int:
+        # 행렬 + 본문/메타데이터(대략적인 크기)
+        text_bytes = sum(len(content or "") for content in self.matrix.contents) * 3
+        return self.matrix.nbytes + text_bytes
+
+
+class HotVectorIndex:
+    """폴더별 메모리 맵 임베딩 인덱스 (크기 제한 LRU, 스레드 안전)"""
+
+    def __init__(self, storage_dir: str, max_bytes: int):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, HotFolderEntry]" = OrderedDict()
+        self._warming: set = set()
+        # 무효화 시 증가 (워밍 도중 무효화된 결과를 등록하지 않기 위함)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def search(
+        self,
+        folder_id: str,
+        document_ids: Iterable[str],
+        query_embedding: List[float],
+        top_k: int,
+    ) -> Optional[List[Dict]]:
+        """
+        핫 인덱스에서 검색
+
+        Returns:
+            검색 결과 (인덱스가 없거나 문서 집합이 달라진 경우 None)
+        """
+        document_set = frozenset(str(doc_id) for doc_id in document_ids)
+        with self._lock:
+            entry = self._entries.get(folder_id)
+            if entry is None:
+                return None
+            if entry.document_set != document_set:
+                # 폴더 구성이 바뀜 → 더 이상 유효하지 않음
+                self._drop(folder_id)
+                return None
+            self._entries.move_to_end(folder_id)
+        return entry.matrix.search(query_embedding, top_k)
+
+    def warm(self, folder_id: str, document_ids: Iterable[str], loader: MatrixLoader) -> HotFolderEntry:
+        """
+        폴더 인덱스를 동기적으로 구축하여 등록
+
+        Args:
+            folder_id: 폴더 ID
+            document_ids: 폴더의 (청크가 있는) 문서 ID 목록
+            loader: document_ids로 EmbeddingMatrix를 만드는 함수
+        """
+        document_ids = [str(doc_id) for doc_id in document_ids]
+        with self._lock:
+            generation = self._generation
+        matrix = loader(document_ids)
+        path = None
+        if len(matrix) > 0:
+            path = self.storage_dir / f"{os.getpid()}-{uuid.uuid4().hex}.f32"
+            matrix = self._to_memmap(matrix, path)
+            if os.name == "posix":
+                # 매핑은 유지되므로 파일 이름만 제거 (프로세스 종료 시 디스크 공간 자동 회수)
+                path.unlink()
+                path = None
+        entry = HotFolderEntry(matrix, frozenset(document_ids), path)
+
+        with self._lock:
+            if generation != self._generation:
+                print(f"핫 인덱스 워밍 중 문서 변경 감지, 등록하지 않음: folder_id={folder_id}")
+                self._discard_file(path)
+                return entry
+            if folder_id in self._entries:
+                self._drop(folder_id)
+            self._entries[folder_id] = entry
+            self._evict()
+        print(f"핫 인덱스 워밍 완료: folder_id={folder_id}, 청크 수={len(matrix)}, {entry.nbytes / (1024 * 1024):.1f}MB")
+        return entry
+
+    def warm_in_background(self, folder_id: str, document_ids: Iterable[str], loader: MatrixLoader) -> bool:
+        """
+        폴더 인덱스를 백그라운드 스레드에서 구축 (이미 워밍 중이면 무시)
+
+        Returns:
+            새로 워밍을 시작했는지 여부
+        """
+        document_ids = list(document_ids)
+        with self._lock:
+            if folder_id in self._warming:
+                return False
+            self._warming.add(folder_id)
+
+        def _run():
+            try:
+                self.warm(folder_id, document_ids, loader)
+            except Exception as e:
+                print(f"핫 인덱스 워밍 실패: folder_id={folder_id}, {e}")
+            finally:
+                with self._lock:
+                    self._warming.discard(folder_id)
+
+        threading.Thread(target=_run, name=f"hot-index-{folder_id}", daemon=True).start()
+        return True
+
+    def invalidate_folder(self, folder_id: str) -> bool:
+        """폴더 인덱스 제거"""
+        with self._lock:
+            self._generation += 1
+            if folder_id in self._entries:
+                self._drop(folder_id)
+                return True
+            return False
+
+    def invalidate_document(self, document_id: str) -> int:
+        """해당 문서를 포함하는 모든 폴더 인덱스 제거"""
+        document_id = str(document_id)
+        with self._lock:
+            self._generation += 1
+            stale = [fid for fid, entry in self._entries.items() if document_id in entry.document_set]
+            for folder_id in stale:
+                self._drop(folder_id)
+            return len(stale)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "folders": len(self._entries),
+                "total_bytes": sum(entry.nbytes for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "warming": len(self._warming),
+            }
+
+    def _evict(self) -> None:
+        """max_bytes를 넘으면 오래된 폴더부터 제거 (lock 보유 상태에서 호출)"""
+        total = sum(entry.nbytes for entry in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            folder_id, entry = next(iter(self._entries.items()))
+            total -= entry.nbytes
+            self._drop(folder_id)
+            print(f"핫 인덱스 제거 (용량 초과): folder_id={folder_id}")
+
+    def _drop(self, folder_id: str) -> None:
+        """항목 및 메모리 맵 파일 제거 (lock 보유 상태에서 호출)"""
+        entry = self._entries.pop(folder_id, None)
+        if entry is not None:
+            self._discard_file(entry.path)
+
+    @staticmethod
+    def _discard_file(path: Optional[Path]) -> None:
+        if path is None:
+            return
+        try:
+            path.unlink()
+        except OSError:
+            # 다른 스레드가 아직 검색 중이면 (Windows) 삭제 실패 가능
+            pass
+
+    @staticmethod
+    def _to_memmap(matrix: EmbeddingMatrix, path: Path) -> EmbeddingMatrix:
+        """행렬을 파일에 기록하고 읽기 전용 메모리 맵으로 교체"""
+        writer = np.memmap(path, dtype=np.float32, mode="w+", shape=matrix.matrix.shape)
+        writer[:] = matrix.matrix
+        writer.flush()
+        del writer
+        mapped = np.memmap(path, dtype=np.float32, mode="r", shape=matrix.matrix.shape)
+        return EmbeddingMatrix(matrix.ids, matrix.document_ids, matrix.contents, matrix.metadatas, mapped)
+
+
+_hot_vector_index: Optional[HotVectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_hot_vector_index() -> Optional[HotVectorIndex]:
+    """프로세스 전역 HotVectorIndex 반환 (hot_index_enabled가 False면 None)"""
+    global _hot_vector_index
+    from app.core.config import get_settings
+    settings = get_settings()
+    if not settings.hot_index_enabled:
+        return None
+    if _hot_vector_index is None:
+        with _index_lock:
+            if _hot_vector_index is None:
+                _hot_vector_index = HotVectorIndex(
+                    storage_dir=settings.hot_index_dir,
+                    max_bytes=settings.hot_index_max_mb * 1024 * 1024,
+                )
+    return _hot_vector_index
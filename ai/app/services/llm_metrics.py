@@ -0,0 +1,107 @@
+"""
+파이프라인 단계별 LLM 호출 지표
+
+질문 검증, Q&A 추출, 비정상 질문 안내, 보고서 생성은 단계마다 모델과 지연 시간/토큰 특성이
+다르므로 단계별로 호출 수, 실패 수, 지연 시간 분포, 토큰 사용량을 따로 집계합니다.
+(모델 선택이나 admission 토큰 예산 조정의 근거로 사용)
+
+API 라우터와 배치 인덱싱 서비스가 서로 다른 QnARAGService 인스턴스를 쓰므로
+모듈 단위 싱글톤으로 공유합니다.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+from app.services.resilience import LatencyTracker
+
+
+class _StageStats:
+    def __init__(self, model: str):
+        self.model = model
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_calls = 0  # 응답에 usage가 없어 토큰 수를 추정한 호출 수
+        self.latency = LatencyTracker()
+
+
+class LLMStageMetrics:
+    """단계별 LLM 호출 지표 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self._stages: Dict[str, _StageStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        stage: str,
+        model: str,
+        seconds: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        estimated: bool = False,
+        error: bool = False,
+    ) -> None:
+        """
+        호출 하나의 결과 기록
+
+        Args:
+            stage: 파이프라인 단계 (validation, extraction, invalid_reply, generation)
+            model: 호출한 모델 이름
+            seconds: 업스트림 호출 시간(초, 승인 대기 제외)
+            prompt_tokens: 입력 토큰 수
+            completion_tokens: 출력 토큰 수
+            estimated: 토큰 수가 추정값인지 여부
+            error: 호출 실패 여부
+        """
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None or stats.model != model:
+                stats = _StageStats(model)
+                self._stages[stage] = stats
+            stats.calls += 1
+            if error:
+                stats.errors += 1
+                return
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            if estimated:
+                stats.estimated_calls += 1
+        stats.latency.record(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stages = dict(self._stages)
+        result: Dict[str, Dict[str, Any]] = {}
+        for stage, stats in stages.items():
+            succeeded = stats.calls - stats.errors
+            p50 = stats.latency.percentile(50)
+            p95 = stats.latency.percentile(95)
+            result[stage] = {
+                "model": stats.model,
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "latency_p50": round(p50, 3) if p50 is not None else None,
+                "latency_p95": round(p95, 3) if p95 is not None else None,
+                "prompt_tokens": stats.prompt_tokens,
+                "completion_tokens": stats.completion_tokens,
+                "avg_prompt_tokens": round(stats.prompt_tokens / succeeded) if succeeded else 0,
+                "avg_completion_tokens": round(stats.completion_tokens / succeeded) if succeeded else 0,
+                "estimated_calls": stats.estimated_calls,
+            }
+        return result
+
+
+_llm_stage_metrics: Optional[LLMStageMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_llm_stage_metrics() -> LLMStageMetrics:
+    """프로세스 전역 LLMStageMetrics 반환"""
+    global _llm_stage_metrics
+    if _llm_stage_metrics is None:
+        with _metrics_lock:
+            if _llm_stage_metrics is None:
+                _llm_stage_metrics = LLMStageMetrics()
+    return _llm_stage_metrics
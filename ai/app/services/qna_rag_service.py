@@ -11,23 +11,46 @@ LlamaParse와 LlamaIndex를 사용하여 질문-답변 형식의 PDF 문서를 
 - 재인덱싱 없음: 한번 인덱싱된 PDF는 DB에 영구 저장
 """
 
+import difflib
 import os
 import uuid
 import re
 import json
+import time
 from pathlib import Path
-from typing import Optional, List, Dict
-from llama_index.core import (
-    Settings,
-    Document,
-)
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional, List, Dict, Iterator, Tuple
+from llama_index.core import Document
 from llama_index.core.node_parser import MarkdownElementNodeParser
 from llama_index.core.schema import TextNode
 from llama_index.core.prompts import PromptTemplate
 from llama_index.llms.openai import OpenAI
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_parse import LlamaParse
+from app.core.config import get_settings
 from app.core.database import Database
+from app.services.admission import LANE_BACKGROUND, LANE_INTERACTIVE, AdmissionRejected, get_admission_controller
+from app.services.answer_cache import get_semantic_answer_cache
+from app.services.context_builder import count_tokens, is_strong_lexical_match, select_context_nodes
+from app.services.hot_vector_index import get_hot_vector_index
+from app.services.llm_metrics import get_llm_stage_metrics
+from app.services.resilience import UpstreamUnavailable, get_resilient_caller
+from app.services.vector_cache import EmbeddingMatrix, get_embedding_matrix_cache
+from app.utils.cache import TTLCache
+from app.utils.deadline import Deadline
+from app.utils.text import normalize_question
+from app.utils.vectors import shorten_embedding
+
+# LLM을 호출하는 파이프라인 단계 (단계별로 모델, 복원력 계층, 지표를 분리)
+STAGE_VALIDATION = "validation"  # 질문 검증
+STAGE_EXTRACTION = "extraction"  # 인덱싱 시 Q&A 쌍 추출 / 표 요약
+STAGE_INVALID_REPLY = "invalid_reply"  # 비정상 질문 안내문 생성
+STAGE_GENERATION = "generation"  # 보고서 답변 생성
+
+
+def _compact_question(question: str) -> str:
+    """FAQ 직접 답변 비교용 질문 정규화 (띄어쓰기 차이도 무시, 예: '신청 방법' = '신청방법')"""
+    return normalize_question(question).replace(" ", "")
 
 
 class QnARAGService:
@@ -45,15 +68,18 @@ class QnARAGService:
             openai_api_key: OpenAI API 키
             llama_cloud_api_key: LlamaCloud API 키 (LlamaParse 사용)
         """
-        # OpenAI LLM 및 임베딩 설정
-        Settings.llm = OpenAI(
-            model="gpt-4o-mini",
-            api_key=openai_api_key,
-            temperature=0.1,
-        )
-        Settings.embed_model = OpenAIEmbedding(
-            model_name="text-embedding-3-small",
+        self.settings = get_settings()
+
+        # 단계별 OpenAI LLM 및 임베딩 설정
+        # 프로세스 전역 llama_index Settings를 바꾸지 않고 인스턴스별로 보관하므로
+        # 설정이 다른 서비스 인스턴스끼리 서로 덮어쓰지 않음
+        # 타임아웃과 재시도는 resilience 계층에서 처리하므로 클라이언트 자체 재시도는 끔
+        self.llms = self._build_stage_llms(openai_api_key)
+        self.embed_model = OpenAIEmbedding(
+            model_name=self.settings.embedding_model,
             api_key=openai_api_key,
+            timeout=self.settings.embedding_timeout_seconds,
+            max_retries=0,
         )
 
         # LlamaParse 초기화
@@ -64,13 +90,124 @@ class QnARAGService:
             verbose=True,
         )
         
-        # 임베딩 모델 저장 (청크 저장 시 사용)
-        self.embed_model = Settings.embed_model
+        # 기본 LLM 인스턴스 (보고서 생성용)
+        self.llm = self.llms[STAGE_GENERATION]
+        
+        # LLM / 임베딩 호출 복원력 계층 (타임아웃, 헤지, 재시도, 서킷 브레이커)
+        # 단계마다 지연 시간 분포가 크게 다르므로 헤지 기준이 섞이지 않도록 단계별로 분리
+        self.llm_callers = {stage: get_resilient_caller(f"llm.{stage}") for stage in self.llms}
+        self.embedding_caller = get_resilient_caller("embedding")
         
-        # LLM 인스턴스 저장 (구조화 파싱용)
-        self.llm = Settings.llm
+        # 질문 임베딩 캐시 (정규화된 질문 → 임베딩)
+        self.query_embedding_cache: TTLCache[List[float]] = TTLCache(
+            maxsize=self.settings.query_embedding_cache_size,
+            ttl=self.settings.query_embedding_cache_ttl_seconds,
+        )
+
+    def _build_stage_llms(self, openai_api_key: str) -> Dict[str, OpenAI]:
+        """
+        단계별 LLM 인스턴스 생성 (같은 모델을 쓰는 단계는 인스턴스 공유)
 
-    def _parse_qna_pairs_with_llm(self, text: str) -> List[Dict[str, str]]:
+        Returns:
+            단계 → OpenAI 인스턴스
+        """
+        stage_models = {
+            STAGE_VALIDATION: self.settings.llm_model_validation,
+            STAGE_EXTRACTION: self.settings.llm_model_extraction,
+            STAGE_INVALID_REPLY: self.settings.llm_model_invalid_reply,
+            STAGE_GENERATION: self.settings.llm_model_generation,
+        }
+        instances: Dict[str, OpenAI] = {}
+        llms: Dict[str, OpenAI] = {}
+        for stage, model in stage_models.items():
+            if model not in instances:
+                instances[model] = OpenAI(
+                    model=model,
+                    api_key=openai_api_key,
+                    temperature=self.settings.llm_temperature,
+                    timeout=self.settings.llm_timeout_seconds,
+                    max_retries=0,
+                )
+            llms[stage] = instances[model]
+        print(f"단계별 LLM 모델: {stage_models}")
+        return llms
+
+    def _complete(
+        self,
+        prompt: str,
+        stage: str = STAGE_GENERATION,
+        user_id: Optional[str] = None,
+        lane: str = LANE_INTERACTIVE,
+        deadline: Optional[Deadline] = None,
+    ):
+        """
+        승인 제어(전역/사용자별 동시 실행 수, 토큰 속도, 우선순위)를 거쳐 단계별 모델로 LLM 호출
+
+        단계별 지연 시간과 토큰 사용량을 get_llm_stage_metrics()에 기록합니다.
+
+        Args:
+            prompt: 프롬프트
+            stage: 파이프라인 단계 (STAGE_* 상수, 단계별 모델 선택)
+            user_id: 요청 사용자 (사용자별 동시 실행 제한용)
+            lane: LANE_INTERACTIVE(질의) 또는 LANE_BACKGROUND(인덱싱)
+            deadline: 요청 마감 시간 (대기와 호출 모두 남은 시간 안에서만 수행)
+
+        Raises:
+            AdmissionRejected: 대기열이 가득 찼거나 대기 기한을 넘긴 경우
+            UpstreamUnavailable: 타임아웃/재시도 후에도 실패했거나 서킷이 열린 경우
+            DeadlineExceeded: 요청 마감 시간을 넘긴 경우
+        """
+        estimated_tokens = count_tokens(prompt) + self.settings.llm_expected_output_tokens
+        queue_timeout = None
+        if deadline is not None:
+            deadline.check("LLM 대기")
+            queue_timeout = deadline.remaining()
+        with get_admission_controller().acquire(
+            user_id=user_id,
+            lane=lane,
+            estimated_tokens=estimated_tokens,
+            timeout=queue_timeout,
+        ):
+            llm = self.llms[stage]
+            metrics = get_llm_stage_metrics()
+            started = time.perf_counter()
+            try:
+                response = self.llm_callers[stage].call_with_deadline(deadline, llm.complete, prompt)
+            except Exception:
+                metrics.record(stage, llm.model, time.perf_counter() - started, error=True)
+                raise
+            prompt_tokens, completion_tokens, estimated = self._response_token_usage(prompt, response)
+            metrics.record(
+                stage,
+                llm.model,
+                time.perf_counter() - started,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                estimated=estimated,
+            )
+            return response
+
+    @staticmethod
+    def _response_token_usage(prompt: str, response) -> Tuple[int, int, bool]:
+        """
+        LLM 응답의 토큰 사용량 (OpenAI usage가 없으면 tiktoken 추정값)
+
+        Returns:
+            (입력 토큰 수, 출력 토큰 수, 추정값 여부)
+        """
+        raw = getattr(response, 'raw', None)
+        usage = raw.get('usage') if isinstance(raw, dict) else getattr(raw, 'usage', None)
+        if isinstance(usage, dict):
+            prompt_tokens = usage.get('prompt_tokens')
+            completion_tokens = usage.get('completion_tokens')
+        else:
+            prompt_tokens = getattr(usage, 'prompt_tokens', None)
+            completion_tokens = getattr(usage, 'completion_tokens', None)
+        if prompt_tokens is not None and completion_tokens is not None:
+            return int(prompt_tokens), int(completion_tokens), False
+        return count_tokens(prompt), count_tokens(str(response or "")), True
+
+    def _parse_qna_pairs_with_llm(self, text: str, user_id: Optional[str] = None) -> List[Dict[str, str]]:
         """
         LLM을 사용하여 질문-답변 쌍을 구조화된 방식으로 추출
         
@@ -78,9 +215,14 @@ class QnARAGService:
         
         Args:
             text: 마크다운 텍스트
+            user_id: 문서 소유자 (LLM 승인 제어용)
             
         Returns:
             질문-답변 쌍 리스트 [{"question": "...", "answer": "..."}, ...]
+
+        Raises:
+            AdmissionRejected, UpstreamUnavailable: LLM을 일시적으로 사용할 수 없는 경우
+                ('Q&A 쌍 없음'으로 처리하지 않고 문서를 재시도 대상으로 남기기 위해 전달)
         """
         try:
             # 프롬프트 구성
@@ -100,8 +242,8 @@ class QnARAGService:
 
 질문-답변 쌍이 없다면 빈 배열을 반환해주세요."""
 
-            # LLM 호출 (구조화된 출력)
-            response = self.llm.complete(prompt)
+            # LLM 호출 (구조화된 출력, 인덱싱은 질의보다 낮은 우선순위)
+            response = self._complete(prompt, stage=STAGE_EXTRACTION, user_id=user_id, lane=LANE_BACKGROUND)
             response_text = str(response).strip()
             
             # JSON 추출 시도
@@ -136,6 +278,8 @@ class QnARAGService:
                 print(f"LLM 응답 JSON 파싱 실패: {e}")
                 print(f"응답 내용: {response_text[:500]}")
         
+        except (AdmissionRejected, UpstreamUnavailable):
+            raise
         except Exception as e:
             print(f"LLM 기반 파싱 실패: {e}")
             import traceback
@@ -230,7 +374,12 @@ class QnARAGService:
         
         return qna_pairs
 
-    def _parse_qna_pairs_from_text(self, text: str, use_llm: bool = True) -> List[Dict[str, str]]:
+    def _parse_qna_pairs_from_text(
+        self,
+        text: str,
+        use_llm: bool = True,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
         """
         마크다운 텍스트에서 질문-답변 쌍을 추출
         
@@ -241,6 +390,7 @@ class QnARAGService:
         Args:
             text: 마크다운 텍스트
             use_llm: LLM 기반 파싱 사용 여부 (기본값: True)
+            user_id: 문서 소유자 (LLM 승인 제어용)
             
         Returns:
             질문-답변 쌍 리스트 [{"question": "...", "answer": "..."}, ...]
@@ -253,7 +403,7 @@ class QnARAGService:
         # 방법 2: 마크다운 구조 분석이 실패하면 LLM 사용 (옵션)
         if not qna_pairs and use_llm:
             print("마크다운 구조 분석 실패, LLM 기반 파싱 시도...")
-            llm_pairs = self._parse_qna_pairs_with_llm(text)
+            llm_pairs = self._parse_qna_pairs_with_llm(text, user_id=user_id)
             if llm_pairs:
                 qna_pairs = llm_pairs
         
@@ -264,6 +414,7 @@ class QnARAGService:
         documents: List[Document],
         document_id: str,
         pdf_path: str,
+        user_id: Optional[str] = None,
     ) -> List[TextNode]:
         """
         Document 리스트에서 질문-답변 쌍을 추출하여 TextNode 리스트 생성
@@ -272,6 +423,7 @@ class QnARAGService:
             documents: LlamaParse로 파싱된 Document 리스트
             document_id: 문서 ID
             pdf_path: PDF 파일 경로
+            user_id: 문서 소유자 (LLM 승인 제어용)
             
         Returns:
             질문-답변 쌍으로 구성된 TextNode 리스트
@@ -285,7 +437,7 @@ class QnARAGService:
             # 질문-답변 쌍 추출 (LLM 사용 옵션 포함)
             # 텍스트가 짧으면 LLM 사용 안 함 (비용 절감)
             use_llm = len(doc_text) > 500 and len(doc_text) < 10000  # 적당한 길이일 때만
-            qna_pairs = self._parse_qna_pairs_from_text(doc_text, use_llm=use_llm)
+            qna_pairs = self._parse_qna_pairs_from_text(doc_text, use_llm=use_llm, user_id=user_id)
             
             if qna_pairs:
                 print(f"문서 {doc_idx + 1}에서 {len(qna_pairs)}개의 Q&A 쌍 추출")
@@ -322,8 +474,7 @@ class QnARAGService:
                 # Q&A 쌍을 찾지 못한 경우, 원본 텍스트를 그대로 사용
                 # (MarkdownElementNodeParser로 폴백)
                 print(f"문서 {doc_idx + 1}에서 Q&A 쌍을 찾지 못함. 원본 텍스트 사용")
-                node_parser = MarkdownElementNodeParser()
-                fallback_nodes = node_parser.get_nodes_from_documents([doc])
+                fallback_nodes = self._parse_markdown_elements(doc, doc_text, user_id=user_id)
                 
                 for node in fallback_nodes:
                     # 메타데이터 추가
@@ -338,6 +489,31 @@ class QnARAGService:
         
         return all_nodes
 
+    def _parse_markdown_elements(self, doc: Document, doc_text: str, user_id: Optional[str] = None) -> List[TextNode]:
+        """
+        MarkdownElementNodeParser로 문서를 노드로 분할
+
+        파서는 표마다 요약 LLM을 직접 호출하므로(_complete를 거치지 않음),
+        표가 있으면 백그라운드 레인 승인 슬롯 하나를 잡은 상태에서 한 번에 하나씩 요약하게 합니다.
+        (다른 LLM 호출과 같은 동시 실행 수와 토큰 속도 제한을 공유)
+
+        Raises:
+            AdmissionRejected: 승인 대기열이 가득 찼거나 대기 기한을 넘긴 경우 (재시도 대상)
+        """
+        node_parser = MarkdownElementNodeParser(llm=self.llms[STAGE_EXTRACTION], num_workers=1)
+        table_text = "\n".join(line for line in doc_text.splitlines() if line.lstrip().startswith("|"))
+        if not table_text:
+            # 표가 없으면 요약 호출이 없으므로 승인 없이 분할
+            return node_parser.get_nodes_from_documents([doc])
+
+        estimated_tokens = count_tokens(table_text) + self.settings.llm_expected_output_tokens
+        with get_admission_controller().acquire(
+            user_id=user_id,
+            lane=LANE_BACKGROUND,
+            estimated_tokens=estimated_tokens,
+        ):
+            return node_parser.get_nodes_from_documents([doc])
+
     def _parse_pdf(self, pdf_path: str) -> List[Document]:
         """
         PDF 파일을 파싱하여 Document 리스트로 변환
@@ -361,6 +537,8 @@ class QnARAGService:
         document_id: str,
         pdf_path: str,
         folder_id: Optional[str] = None,  # 폴더 정보는 메타데이터에만 저장
+        user_id: Optional[str] = None,
+        progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
     ) -> bool:
         """
         특정 PDF 문서에 대한 인덱스 구축 (document_chunks 테이블에 저장)
@@ -369,9 +547,15 @@ class QnARAGService:
             document_id: 문서 ID (UUID)
             pdf_path: PDF 파일 경로
             folder_id: 폴더 ID (메타데이터용, 인덱스 구조에는 영향 없음)
+            user_id: 문서 소유자 (LLM 승인 제어용)
+            progress: 단계별 진행 콜백 progress(stage, info)
+                (parsing: {"pages"}, extracting: {"nodes", "chunks"}, embedding: {"done", "total"})
 
         Returns:
             성공 여부
+
+        Raises:
+            AdmissionRejected, UpstreamUnavailable: LLM을 일시적으로 사용할 수 없는 경우 (재시도 대상)
         """
         try:
             # 기존 청크가 있는지 확인 (재인덱싱 방지)
@@ -387,14 +571,24 @@ class QnARAGService:
                 print(f"기존 인덱스가 있습니다. document_id={document_id}, 청크 수={existing_chunks.count}")
                 return True
             
+            def report(stage: str, **info) -> None:
+                if progress is None:
+                    return
+                try:
+                    progress(stage, info)
+                except Exception as e:
+                    print(f"진행 상황 전달 실패 (무시): {e}")
+            
             # PDF 파싱
             documents = self._parse_pdf(pdf_path)
+            report("parsing", pages=len(documents))
             
             # 질문-답변 쌍으로 노드 생성
             all_nodes = self._create_qna_nodes_from_documents(
                 documents=documents,
                 document_id=document_id,
                 pdf_path=pdf_path,
+                user_id=user_id,
             )
             
             print(f"총 {len(all_nodes)}개의 노드 생성")
@@ -406,6 +600,7 @@ class QnARAGService:
             ]
             
             print(f"질의응답쌍이 있는 노드: {len(qna_nodes)}개 (전체 {len(all_nodes)}개 중)")
+            report("extracting", nodes=len(all_nodes), chunks=len(qna_nodes))
             
             if len(qna_nodes) == 0:
                 print("경고: 질의응답쌍을 발견하지 못했습니다. DB에 저장하지 않습니다.")
@@ -415,10 +610,12 @@ class QnARAGService:
             db = Database.get_client()
             saved_count = 0
             
-            for node in qna_nodes:
+            for index, node in enumerate(qna_nodes):
+                if index:
+                    report("embedding", done=index, total=len(qna_nodes), saved=saved_count)
                 try:
                     # 노드 텍스트 임베딩 생성
-                    embedding = self.embed_model.get_text_embedding(node.text)
+                    embedding = self.embedding_caller.call(self.embed_model.get_text_embedding, node.text)
                     
                     # 메타데이터 추출
                     node_metadata = node.metadata if hasattr(node, 'metadata') and node.metadata else {}
@@ -431,17 +628,22 @@ class QnARAGService:
                         **{k: v for k, v in node_metadata.items() if k not in ['pdf_name', 'pdf_path']},
                     }
                     
+                    chunk_params = {
+                        "p_document_id": document_id,
+                        "p_content": node.text,
+                        "p_embedding": embedding,  # VECTOR 타입으로 저장
+                        "p_metadata": chunk_metadata,
+                    }
+                    
+                    # 축소 차원 임베딩 (1차 검색용, 차원 수는 청크별로 기록)
+                    short_dims = self.settings.embedding_short_dims
+                    if short_dims:
+                        chunk_params["p_embedding_short"] = shorten_embedding(embedding, short_dims)
+                        chunk_params["p_embedding_short_dims"] = short_dims
+                    
                     # RPC 함수 호출
                     try:
-                        result = db.rpc(
-                            "insert_document_chunk",
-                            {
-                                "p_document_id": document_id,
-                                "p_content": node.text,
-                                "p_embedding": embedding,  # VECTOR 타입으로 저장
-                                "p_metadata": chunk_metadata,
-                            }
-                        ).execute()
+                        result = db.rpc("insert_document_chunk", chunk_params).execute()
                         
                         if result.data:
                             saved_count += 1
@@ -474,6 +676,10 @@ class QnARAGService:
                     continue
             
             print(f"document_chunks 테이블에 {saved_count}/{len(qna_nodes)}개 청크 저장 완료")
+            report("embedding", done=len(qna_nodes), total=len(qna_nodes), saved=saved_count)
+            
+            # 이 문서를 포함하는 검색 캐시 무효화
+            self._invalidate_document_caches(document_id, folder_id=folder_id)
             
             if saved_count > 0:
                 return True
@@ -481,6 +687,9 @@ class QnARAGService:
                 print("경고: 저장된 청크가 없습니다.")
                 return False
                 
+        except (AdmissionRejected, UpstreamUnavailable):
+            # LLM 일시 불가: 실패로 처리하지 않고 호출자가 재시도하도록 전달
+            raise
         except Exception as e:
             print(f"인덱스 구축 실패: {e}")
             import traceback
@@ -512,13 +721,84 @@ class QnARAGService:
         except Exception as e:
             print(f"PDF 인덱스 제거 실패: {e}")
             return False
+        finally:
+            self._invalidate_document_caches(document_id)
+
+    def _invalidate_document_caches(self, document_id: str, folder_id: Optional[str] = None) -> None:
+        """
+        문서 청크가 변경되었을 때 프로세스 내 검색 캐시 무효화
+
+        Args:
+            document_id: 변경된 문서 ID
+            folder_id: 문서가 속한 폴더 ID (알고 있는 경우)
+        """
+        removed = get_embedding_matrix_cache().invalidate_document(document_id)
+        if removed:
+            print(f"임베딩 행렬 캐시 무효화: document_id={document_id}, {removed}개 항목 제거")
+
+        answer_cache = get_semantic_answer_cache()
+        if answer_cache is not None:
+            answer_cache.invalidate_document(document_id)
+            if folder_id:
+                answer_cache.invalidate_folder(folder_id)
+
+        hot_index = get_hot_vector_index()
+        if hot_index is not None:
+            hot_index.invalidate_document(document_id)
+            if folder_id:
+                hot_index.invalidate_folder(folder_id)
+
+    def invalidate_folder_caches(self, folder_id: Optional[str]) -> None:
+        """
+        폴더 구성이 바뀌었을 때 (업로드, 삭제, 이동) 폴더 단위 캐시 무효화
 
-    def _validate_question(self, question: str) -> bool:
+        Args:
+            folder_id: 변경된 폴더 ID
+        """
+        if not folder_id:
+            return
+        hot_index = get_hot_vector_index()
+        if hot_index is not None and hot_index.invalidate_folder(folder_id):
+            print(f"핫 인덱스 무효화: folder_id={folder_id}")
+        answer_cache = get_semantic_answer_cache()
+        if answer_cache is not None and answer_cache.invalidate_folder(folder_id):
+            print(f"답변 캐시 무효화: folder_id={folder_id}")
+
+    def prefetch_folder(self, folder_id: str, document_ids: List[str]) -> Dict:
+        """
+        폴더의 핫 인덱스를 미리 구축
+
+        Args:
+            folder_id: 폴더 ID
+            document_ids: 폴더의 (청크가 있는) 문서 ID 목록
+
+        Returns:
+            워밍 결과 통계
+        """
+        hot_index = get_hot_vector_index()
+        if hot_index is None:
+            raise ValueError("핫 인덱스가 비활성화되어 있습니다. (HOT_INDEX_ENABLED)")
+        entry = hot_index.warm(folder_id, document_ids, self._load_embedding_matrix)
+        return {
+            "folder_id": folder_id,
+            "document_count": len(document_ids),
+            "chunk_count": len(entry.matrix),
+            "bytes": entry.nbytes,
+        }
+
+    def _validate_question(
+        self,
+        question: str,
+        user_id: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> bool:
         """
         질문이 정상적인지 검증
         
         Args:
             question: 사용자 질문
+            user_id: 요청 사용자 (LLM 승인 제어용)
+            deadline: 요청 마감 시간
             
         Returns:
             정상적인 질문이면 True, 그렇지 않으면 False
@@ -534,6 +814,11 @@ class QnARAGService:
         cleaned_question = question.strip()
         if not cleaned_question or len(cleaned_question.replace(' ', '').replace('?', '').replace('？', '')) < 3:
             return False
+
+        # 남은 시간이 부족하면 LLM 검증을 생략하고 답변 생성에 시간을 남김
+        if deadline is not None and not deadline.has_at_least(self.settings.deadline_skip_validation_below_seconds):
+            print(f"남은 시간 부족으로 질문 검증 생략 (남은 시간={deadline.remaining():.1f}초)")
+            return True
         
         # LLM으로 질문이 정상적인지 검증
         validation_prompt = f"""다음 텍스트가 정상적인 질문인지 판단해주세요.
@@ -548,7 +833,7 @@ class QnARAGService:
 }}"""
 
         try:
-            response = self.llm.complete(validation_prompt)
+            response = self._complete(validation_prompt, stage=STAGE_VALIDATION, user_id=user_id, deadline=deadline)
             response_text = str(response).strip()
             
             # JSON 추출
@@ -573,11 +858,86 @@ class QnARAGService:
             # 검증 실패 시 기본 규칙으로 판단
             return len(question.strip()) >= 5
 
+    def _get_query_embedding(self, question: str, deadline: Optional[Deadline] = None) -> List[float]:
+        """
+        질문 임베딩 반환 (캐시 사용)
+
+        공백, 구두점, 유니코드 정규화 차이만 있는 같은 질문은 임베딩 API를 다시 호출하지 않습니다.
+
+        Args:
+            question: 사용자 질문
+            deadline: 요청 마감 시간
+
+        Returns:
+            질문 임베딩
+        """
+        def embed() -> List[float]:
+            return self.embedding_caller.call_with_deadline(deadline, self.embed_model.get_query_embedding, question)
+
+        if self.settings.query_embedding_cache_size <= 0:
+            return embed()
+        
+        key = normalize_question(question)
+        return self.query_embedding_cache.get_or_set(key, embed)
+
+    def _get_query_embeddings(self, questions: List[str]) -> List[List[float]]:
+        """
+        여러 질문의 임베딩을 한 번의 배치 API 호출로 계산 (캐시 사용)
+
+        캐시에 있는 질문과 정규화 후 중복되는 질문은 API 요청에서 제외합니다.
+        text-embedding-3 계열은 질문/문서 임베딩 모델이 같으므로 get_text_embedding_batch 결과를
+        get_query_embedding과 같은 캐시에 저장합니다.
+
+        Args:
+            questions: 질문 리스트
+
+        Returns:
+            질문 순서와 같은 임베딩 리스트
+        """
+        use_cache = self.settings.query_embedding_cache_size > 0
+        embeddings: List[Optional[List[float]]] = [None] * len(questions)
+        missing: Dict[str, List[int]] = {}  # 정규화된 질문 → 질문 인덱스 목록
+
+        for i, question in enumerate(questions):
+            key = normalize_question(question)
+            cached = self.query_embedding_cache.get(key) if use_cache else None
+            if cached is not None:
+                embeddings[i] = cached
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            keys = list(missing.keys())
+            texts = [questions[missing[key][0]] for key in keys]
+            print(f"질문 임베딩 배치 계산: {len(texts)}개 (캐시 적중 {len(questions) - sum(len(v) for v in missing.values())}개)")
+            vectors = self.embedding_caller.call(self.embed_model.get_text_embedding_batch, texts)
+            for key, vector in zip(keys, vectors):
+                if use_cache:
+                    self.query_embedding_cache.set(key, vector)
+                for i in missing[key]:
+                    embeddings[i] = vector
+
+        return embeddings
+
+    def cache_stats(self) -> Dict:
+        """프로세스 내 캐시 통계"""
+        hot_index = get_hot_vector_index()
+        answer_cache = get_semantic_answer_cache()
+        return {
+            "query_embedding": self.query_embedding_cache.stats(),
+            "hot_index": hot_index.stats() if hot_index is not None else None,
+            "answer": answer_cache.stats() if answer_cache is not None else None,
+        }
+
     def query_documents(
         self,
         question: str,
         document_ids: List[str],
         similarity_top_k: int = 3,
+        folder_id: Optional[str] = None,
+        allow_direct_answer: bool = True,
+        user_id: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
     ) -> str:
         """
         여러 PDF 문서들에서 질문에 대한 답변 생성
@@ -586,15 +946,259 @@ class QnARAGService:
             question: 사용자 질문
             document_ids: 검색할 문서 ID 리스트
             similarity_top_k: 각 문서에서 검색할 관련 문서 수 (기본값: 3)
+            folder_id: 문서들이 속한 폴더 ID (핫 인덱스, 답변 캐시 사용 시)
+            allow_direct_answer: 저장된 Q&A와 거의 같은 질문이면 LLM 없이 저장된 답변으로 보고서 작성
+            user_id: 요청 사용자 (LLM 승인 제어용)
+            deadline: 요청 마감 시간 (단계별로 남은 시간을 사용하고, 부족하면 선택 단계 생략)
 
         Returns:
             생성된 답변
         """
+        return self.query_documents_with_details(
+            question=question,
+            document_ids=document_ids,
+            similarity_top_k=similarity_top_k,
+            folder_id=folder_id,
+            allow_direct_answer=allow_direct_answer,
+            user_id=user_id,
+            deadline=deadline,
+        )["answer"]
+
+    def query_documents_with_details(
+        self,
+        question: str,
+        document_ids: List[str],
+        similarity_top_k: int = 3,
+        folder_id: Optional[str] = None,
+        allow_direct_answer: bool = True,
+        user_id: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict:
+        """
+        query_documents와 같지만 답변 출처와 검색 점수를 함께 반환
+
+        Returns:
+            {
+                "answer": 답변,
+                "answer_source": "answer_cache" | "faq" | "not_relevant" | "invalid_question" | "generated",
+                "scores": 상위 검색 결과 점수 리스트 (임계값 조정용),
+            }
+        """
         if not document_ids:
             raise ValueError("검색할 문서가 없습니다.")
 
+        # 질문을 임베딩으로 변환
+        query_embedding = self._get_query_embedding(question, deadline=deadline)
+
+        # 같은 문서 집합에 대한 유사 질문의 답변이 캐시되어 있으면 바로 반환
+        cached = self._lookup_cached_answer(question, document_ids, query_embedding, folder_id, user_id)
+        if cached is not None:
+            return cached
+        
+        # pgvector를 사용하여 document_chunks 테이블에서 검색
+        # Supabase의 경우 RPC 함수를 사용하거나 직접 SQL 쿼리 필요
+        # (검색은 질문 검증과 무관하므로 먼저 수행하여 FAQ 적중 시 검증 LLM 호출도 생략)
+        if deadline is not None:
+            deadline.check("검색")
+        nodes = self._search_chunks_with_pgvector(
+            query_embedding=query_embedding,
+            document_ids=document_ids,
+            similarity_top_k=similarity_top_k,
+            folder_id=folder_id,
+            query_text=question,
+        )
+        
+        return self._answer_from_nodes(
+            question=question,
+            document_ids=document_ids,
+            similarity_top_k=similarity_top_k,
+            query_embedding=query_embedding,
+            nodes=nodes,
+            folder_id=folder_id,
+            allow_direct_answer=allow_direct_answer,
+            user_id=user_id,
+            deadline=deadline,
+        )
+
+    def query_documents_batch(
+        self,
+        questions: List[str],
+        document_ids: List[str],
+        similarity_top_k: int = 3,
+        folder_id: Optional[str] = None,
+        allow_direct_answer: bool = True,
+        user_id: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> Iterator[Dict]:
+        """
+        여러 질문에 대한 답변을 생성하여 완료되는 순서대로 반환
+
+        - 질문 임베딩은 한 번의 배치 호출로 계산
+        - 벡터 검색은 search_document_chunks_batch RPC 한 번으로 처리
+        - 답변 생성은 최대 max_concurrency개까지 동시에 수행
+
+        Args:
+            questions: 질문 리스트
+            document_ids: 검색할 문서 ID 리스트
+            similarity_top_k: 질문별 검색할 관련 문서 수
+            folder_id: 문서들이 속한 폴더 ID
+            allow_direct_answer: 저장된 Q&A 직접 답변 허용 여부
+            user_id: 요청 사용자 (LLM 승인 제어용)
+            max_concurrency: 동시 답변 생성 수 (None이면 batch_query_max_concurrency)
+
+        Yields:
+            {"index", "question", "answer", "answer_source", "scores", "sources"}
+            또는 실패 시 {"index", "question", "error"}
+        """
+        if not document_ids:
+            raise ValueError("검색할 문서가 없습니다.")
+        if not questions:
+            return
+
+        query_embeddings = self._get_query_embeddings(questions)
+
+        # 답변 캐시에 있는 질문은 검색 없이 바로 반환
+        pending: List[int] = []
+        for i, question in enumerate(questions):
+            cached = self._lookup_cached_answer(question, document_ids, query_embeddings[i], folder_id, user_id)
+            if cached is not None:
+                yield {"index": i, "question": question, **cached, "sources": []}
+            else:
+                pending.append(i)
+
+        if not pending:
+            return
+
+        node_lists = self._search_chunks_batch(
+            query_embeddings=[query_embeddings[i] for i in pending],
+            query_texts=[questions[i] for i in pending],
+            document_ids=document_ids,
+            similarity_top_k=similarity_top_k,
+            folder_id=folder_id,
+        )
+
+        def answer_one(index: int, nodes: List[Dict]) -> Dict:
+            result = self._answer_from_nodes(
+                question=questions[index],
+                document_ids=document_ids,
+                similarity_top_k=similarity_top_k,
+                query_embedding=query_embeddings[index],
+                nodes=nodes,
+                folder_id=folder_id,
+                allow_direct_answer=allow_direct_answer,
+                user_id=user_id,
+            )
+            return {
+                "index": index,
+                "question": questions[index],
+                **result,
+                "sources": self._summarize_sources(nodes[:similarity_top_k]),
+            }
+
+        workers = max(1, min(max_concurrency or self.settings.batch_query_max_concurrency, len(pending)))
+        print(f"배치 답변 생성 시작: {len(pending)}개 질문, 동시 실행 {workers}개")
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-query")
+        try:
+            futures = {
+                executor.submit(answer_one, index, nodes): index
+                for index, nodes in zip(pending, node_lists)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield future.result()
+                except Exception as e:
+                    print(f"배치 질문 처리 실패: index={index}, {e}")
+                    yield {"index": index, "question": questions[index], "error": str(e)}
+        finally:
+            # 클라이언트 연결이 끊겨 제너레이터가 닫힌 경우 아직 시작하지 않은 생성은 취소
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _summarize_sources(nodes: List[Dict]) -> List[Dict]:
+        """답변에 사용된 청크의 출처 요약 (배치 응답용)"""
+        sources = []
+        for node in nodes:
+            metadata = node.get('metadata') or {}
+            sources.append({
+                "document_id": node.get('document_id') or metadata.get('document_id'),
+                "pdf_name": metadata.get('pdf_name'),
+                "question": metadata.get('question'),
+                "score": node.get('score'),
+            })
+        return sources
+
+    def _lookup_cached_answer(
+        self,
+        question: str,
+        document_ids: List[str],
+        query_embedding: List[float],
+        folder_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """의미 기반 답변 캐시 조회 (적중 시 query_documents_with_details 형식으로 반환)"""
+        answer_cache = get_semantic_answer_cache()
+        if answer_cache is None:
+            return None
+        cached = answer_cache.lookup(self._answer_cache_key(folder_id, user_id), document_ids, query_embedding)
+        if not cached:
+            return None
+        answer = self._refresh_report_header(cached["answer"], cached["question"], question)
+        if answer is None:
+            # 보고서 머리의 질문 줄을 찾지 못하면 다른 질문 문구가 그대로 보이므로 사용하지 않음
+            return None
+        print(f"답변 캐시 적중: '{question}' ≈ '{cached['question']}' (유사도={cached['similarity']:.4f})")
+        return {
+            "answer": answer,
+            "answer_source": "answer_cache",
+            "scores": [],
+        }
+
+    def _answer_from_nodes(
+        self,
+        question: str,
+        document_ids: List[str],
+        similarity_top_k: int,
+        query_embedding: List[float],
+        nodes: List[Dict],
+        folder_id: Optional[str] = None,
+        allow_direct_answer: bool = True,
+        user_id: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict:
+        """
+        검색 결과로 답변 생성 (FAQ 직접 답변 → 관련도 게이트 → 질문 검증 → LLM 생성 → 답변 캐시 저장)
+
+        Returns:
+            query_documents_with_details와 같은 형식
+        """
+        scores = [
+            round(float(node['score']), 4)
+            for node in nodes[:max(similarity_top_k, 1)]
+            if node.get('score') is not None
+        ]
+        
+        # 저장된 질문과 거의 같은 질문이면 LLM 생성 없이 저장된 답변으로 보고서 작성
+        if allow_direct_answer and self.settings.faq_direct_answer_enabled and nodes:
+            faq_node = self._find_direct_faq_match(question, nodes)
+            if faq_node is not None:
+                return {
+                    "answer": self._render_faq_answer(question, faq_node),
+                    "answer_source": "faq",
+                    "scores": scores,
+                }
+        
+        # 검색 신뢰도가 낮으면 보고서 생성 없이 '관련 정보 없음' 안내
+        if nodes and not self._passes_relevance_gate(nodes[:max(similarity_top_k, 1)]):
+            print(f"관련도 미달로 생성 생략: '{question}' (점수={scores})")
+            return {
+                "answer": self._render_not_relevant_answer(question, len(document_ids)),
+                "answer_source": "not_relevant",
+                "scores": scores,
+            }
+
         # 질문 검증
-        if not self._validate_question(question):
+        if not self._validate_question(question, user_id=user_id, deadline=deadline):
             # 정상적이지 않은 질문인 경우 RAG 없이 바로 답변 생성
             from datetime import datetime
             current_date = datetime.now().strftime("%Y. %m. %d.")
@@ -637,26 +1241,32 @@ info
 """
             
             print(f"질문 검증 실패: '{question}' - RAG 없이 답변 생성")
-            response = self.llm.complete(invalid_question_prompt)
+            response = self._complete(
+                invalid_question_prompt,
+                stage=STAGE_INVALID_REPLY,
+                user_id=user_id,
+                deadline=deadline,
+            )
             answer = str(response).strip() if response else ""
-            return answer
+            return {
+                "answer": answer,
+                "answer_source": "invalid_question",
+                "scores": scores,
+            }
 
-        # 질문을 임베딩으로 변환
-        query_embedding = self.embed_model.get_query_embedding(question)
-        
-        # pgvector를 사용하여 document_chunks 테이블에서 검색
-        # Supabase의 경우 RPC 함수를 사용하거나 직접 SQL 쿼리 필요
-        nodes = self._search_chunks_with_pgvector(
-            query_embedding=query_embedding,
-            document_ids=document_ids,
-            similarity_top_k=similarity_top_k,
-        )
-        
         if not nodes:
             raise ValueError("검색 결과가 없습니다.")
         
-        # 상위 k개 노드 선택
-        top_nodes = nodes[:similarity_top_k]
+        # 상위 k개 노드 선택 (점수 분포에 따른 적응형 k, 중복 제거, 토큰 예산 적용)
+        top_nodes = select_context_nodes(
+            nodes,
+            max_k=similarity_top_k,
+            max_tokens=self.settings.context_max_tokens,
+            min_k=1,
+            min_relative_score=self.settings.context_min_relative_score,
+            dedup_threshold=self.settings.context_dedup_threshold,
+            min_lexical_score=self.settings.relevance_min_lexical_score,
+        )
         
         # 커스텀 프롬프트 생성 (민원 답변서 형식)
         from datetime import datetime
@@ -732,23 +1342,213 @@ info
         print(f"질문: {question} ({len(document_ids)}개 PDF에서 검색)")
         
         # LLM을 직접 사용하여 답변 생성
-        response = self.llm.complete(prompt_text)
+        if deadline is not None:
+            deadline.check("답변 생성")
+        response = self._complete(prompt_text, stage=STAGE_GENERATION, user_id=user_id, deadline=deadline)
         answer = str(response).strip() if response else ""
         print(f"답변 생성 완료: 길이={len(answer)}")
+        
+        answer_cache = get_semantic_answer_cache()
+        if answer_cache is not None and answer:
+            answer_cache.store(self._answer_cache_key(folder_id, user_id), document_ids, question, query_embedding, answer)
+
+        return {
+            "answer": answer,
+            "answer_source": "generated",
+            "scores": scores,
+        }
+
+    def _passes_relevance_gate(self, nodes: List[Dict]) -> bool:
+        """
+        검색 결과가 답변을 생성할 만큼 관련 있는지 판단
+
+        - 최고 점수가 relevance_min_top_score 이상이어야 함
+        - 상위 결과 평균 점수가 relevance_min_mean_score 이상이어야 함 (0이면 검사 안 함)
+        - 하이브리드 검색에서 어휘 점수(lexical_score)가 relevance_min_lexical_score 이상인 청크가 있으면 점수와 무관하게 통과
+          (고유명사, 법령명 등은 임베딩 점수가 낮아도 정확히 일치할 수 있음,
+           흔한 단어 하나만 겹친 lexical_rank만으로는 통과하지 않음)
+        """
+        if not self.settings.relevance_gate_enabled:
+            return True
+        min_lexical_score = self.settings.relevance_min_lexical_score
+        if any(is_strong_lexical_match(node, min_lexical_score) for node in nodes):
+            return True
+
+        scores = [float(node['score']) for node in nodes if node.get('score') is not None]
+        if not scores:
+            return True
+        if max(scores) < self.settings.relevance_min_top_score:
+            return False
+        min_mean = self.settings.relevance_min_mean_score
+        if min_mean > 0 and sum(scores) / len(scores) < min_mean:
+            return False
+        return True
+
+    @staticmethod
+    def _render_not_relevant_answer(question: str, document_count: int) -> str:
+        """관련 정보를 찾지 못했을 때의 보고서 (LLM 호출 없음)"""
+        from datetime import datetime
+        current_date = datetime.now().strftime("%Y. %m. %d.")
+        return f"""보고서 (초안)
+일자: {current_date}
+
+질문: {question}
+
+info
+관련 정보 없음
+
+검색한 {document_count}개 문서에서 질문과 관련된 내용을 찾지 못했습니다.
+
+[상세 답변 내용]
+
+1. 확인 결과
+현재 폴더의 문서에는 질문에 답할 수 있는 충분히 관련된 내용이 없습니다.
+
+2. 추가 안내
+- 질문에 문서에서 사용하는 용어(법령명, 제품명, 기준명 등)를 포함해 다시 작성해 주세요.
+- 관련 문서가 다른 폴더에 있다면 해당 폴더에서 질문해 주세요."""
+
+    def _find_direct_faq_match(self, question: str, nodes: List[Dict]) -> Optional[Dict]:
+        """
+        검색 상위 청크 중 저장된 질문이 사용자 질문과 같거나 거의 같은 Q&A 청크 찾기
+
+        청크 점수는 '질문 + 답변' 결합 텍스트와의 유사도이므로 그대로 쓰지 않고,
+        정규화한 질문 텍스트(구두점, 대소문자, 띄어쓰기 차이 무시)가 같거나
+        문자열 유사도(difflib 비율)가 faq_direct_answer_threshold 이상인 경우만 적중으로 봅니다.
+        저장된 질문을 임베딩하지 않으므로 FAQ가 아닌 일반 질문 경로에 네트워크 비용이 없습니다.
+
+        Args:
+            question: 사용자 질문
+            nodes: 검색 결과 (점수 내림차순)
+
+        Returns:
+            적중한 청크 (faq_similarity에 질문 간 유사도 기록) 또는 None
+        """
+        threshold = self.settings.faq_direct_answer_threshold
+        normalized = _compact_question(question)
+
+        for node in nodes[:max(1, self.settings.faq_direct_answer_candidates)]:
+            metadata = node.get('metadata') or {}
+            stored_question = str(metadata.get('question') or '').strip()
+            stored_answer = str(metadata.get('answer') or '').strip()
+            if metadata.get('chunk_type') != 'qna_pair' or not stored_question or not stored_answer:
+                continue
+
+            stored_normalized = _compact_question(stored_question)
+            if stored_normalized == normalized:
+                similarity = 1.0
+            elif threshold < 1:
+                similarity = difflib.SequenceMatcher(None, normalized, stored_normalized, autojunk=False).ratio()
+            else:
+                continue
+
+            if similarity >= threshold:
+                print(f"FAQ 직접 답변: '{question}' ≈ '{stored_question}' (유사도={similarity:.4f})")
+                return {**node, 'faq_similarity': similarity}
+
+        return None
+
+    @staticmethod
+    def _render_faq_answer(question: str, node: Dict) -> str:
+        """저장된 Q&A 답변을 보고서 형식으로 작성 (LLM 호출 없음)"""
+        from datetime import datetime
+        current_date = datetime.now().strftime("%Y. %m. %d.")
+
+        metadata = node.get('metadata') or {}
+        stored_question = str(metadata.get('question', '')).strip()
+        stored_answer = str(metadata.get('answer', '')).strip()
+        pdf_name = metadata.get('pdf_name') or ''
+
+        # 핵심 답변 요약: 답변의 첫 문장 (없으면 첫 줄)
+        first_line = stored_answer.splitlines()[0].strip() if stored_answer else ''
+        sentences = re.split(r'(?<=[.!?。])\s+', first_line, maxsplit=1)
+        summary = sentences[0] if sentences and sentences[0] else first_line
+
+        lines = [
+            "보고서 (초안)",
+            f"일자: {current_date}",
+            "",
+            f"질문: {question}",
+            "",
+            "info",
+            "핵심 답변 요약",
+            "",
+            summary,
+            "",
+            "[상세 답변 내용]",
+            "",
+            f"1. {stored_question}",
+            stored_answer,
+        ]
+        if pdf_name:
+            lines += ["", "2. 참고 사항", f"- 출처 문서: {pdf_name}"]
+        return "\n".join(lines)
+
+    @staticmethod
+    def _answer_cache_key(folder_id: Optional[str], user_id: Optional[str]) -> str:
+        """답변 캐시 폴더 키 (루트 문서는 사용자마다 문서 집합이 다르므로 사용자별로 분리)"""
+        return folder_id or f"root:{user_id}"
+
+    @staticmethod
+    def _refresh_report_header(answer: str, cached_question: str, question: str) -> Optional[str]:
+        """
+        캐시된 보고서의 머리('일자:', '질문:' 줄)를 현재 요청 기준으로 다시 작성
+
+        Args:
+            answer: 캐시된 보고서
+            cached_question: 보고서를 생성할 때의 질문
+            question: 현재 질문
+
+        Returns:
+            갱신된 보고서 (질문 줄을 찾지 못하면 None)
+        """
+        from datetime import datetime
+        current_date = datetime.now().strftime("%Y. %m. %d.")
+        answer = re.sub(r'(일자:\s*)\d{4}\. \d{1,2}\. \d{1,2}\.', rf'\g<1>{current_date}', answer, count=1)
 
-        return answer
+        # 생성 시 질문 문구 그대로인 줄을 우선 교체하고, 모델이 바꿔 쓴 경우 첫 '질문:' 줄을 교체
+        original_line = f"질문: {cached_question}"
+        if original_line in answer:
+            return answer.replace(original_line, f"질문: {question}", 1)
+        pattern = re.compile(r'^(\**질문:\**[ \t]*).*$', re.MULTILINE)
+        if not pattern.search(answer):
+            return None
+        return pattern.sub(lambda match: f"{match.group(1)}{question}", answer, count=1)
 
     def _search_chunks_with_pgvector(
         self,
         query_embedding: List[float],
         document_ids: List[str],
         similarity_top_k: int,
+        folder_id: Optional[str] = None,
+        query_text: Optional[str] = None,
     ) -> List[Dict]:
         """
         pgvector를 사용하여 document_chunks 테이블에서 검색
         
         Supabase RPC 함수를 사용하여 pgvector 검색 수행
+        하이브리드 검색이 활성화되어 있고 질문 텍스트가 있으면 어휘 + 벡터 융합 검색을 우선 사용
+        폴더 핫 인덱스가 준비되어 있으면 Postgres 대신 프로세스 내에서 검색
         """
+        if query_text and self.settings.hybrid_search_enabled:
+            hybrid_chunks = self._search_chunks_hybrid(
+                query_text=query_text,
+                query_embedding=query_embedding,
+                document_ids=document_ids,
+                similarity_top_k=similarity_top_k,
+            )
+            if hybrid_chunks:
+                return hybrid_chunks
+
+        hot_index = get_hot_vector_index() if folder_id else None
+        if hot_index is not None:
+            hot_chunks = hot_index.search(folder_id, document_ids, query_embedding, similarity_top_k * 2)
+            if hot_chunks is not None:
+                print(f"핫 인덱스 검색 완료: folder_id={folder_id}, {len(hot_chunks)}개 청크 반환")
+                return hot_chunks
+            # 첫 조회: 이번 요청은 Postgres로 처리하고 백그라운드에서 워밍
+            hot_index.warm_in_background(folder_id, document_ids, self._load_embedding_matrix)
+
         try:
             db = Database.get_client()
             
@@ -756,14 +1556,12 @@ info
             print(f"query_embedding 길이: {len(query_embedding)}")
             
             # RPC 함수 호출 (pgvector 검색)
-            result = db.rpc(
-                "search_document_chunks",
-                {
-                    "query_embedding": query_embedding,
-                    "document_ids": document_ids,
-                    "match_count": similarity_top_k * 2,  # 필터링을 위해 더 많이 가져오기
-                }
-            ).execute()
+            rpc_name, rpc_params = self._build_vector_search_rpc(
+                query_embedding=query_embedding,
+                document_ids=document_ids,
+                match_count=similarity_top_k * 2,  # 필터링을 위해 더 많이 가져오기
+            )
+            result = db.rpc(rpc_name, rpc_params).execute()
             
             print(f"RPC 함수 호출 결과: {len(result.data) if result.data else 0}개 청크 반환")
             
@@ -794,102 +1592,295 @@ info
             # 폴백: 직접 쿼리
             return self._search_chunks_fallback(query_embedding, document_ids, similarity_top_k)
     
-    def _search_chunks_fallback(
+    def _search_chunks_batch(
+        self,
+        query_embeddings: List[List[float]],
+        query_texts: List[str],
+        document_ids: List[str],
+        similarity_top_k: int,
+        folder_id: Optional[str] = None,
+    ) -> List[List[Dict]]:
+        """
+        여러 질문의 벡터 검색을 한 번에 수행
+
+        핫 인덱스가 준비된 폴더는 프로세스 내에서 검색하고, 나머지 질문은
+        search_document_chunks_batch RPC 한 번으로 검색합니다.
+        양자화 / 축소 차원 설정은 단일 검색(_build_vector_search_rpc)과 같게 적용됩니다.
+        하이브리드 검색은 질문 텍스트별 RPC가 필요하므로 질문마다 기존 경로를 사용합니다.
+
+        Returns:
+            질문 순서와 같은 검색 결과 리스트
+        """
+        if self.settings.hybrid_search_enabled:
+            return [
+                self._search_chunks_with_pgvector(
+                    query_embedding=embedding,
+                    document_ids=document_ids,
+                    similarity_top_k=similarity_top_k,
+                    folder_id=folder_id,
+                    query_text=text,
+                )
+                for embedding, text in zip(query_embeddings, query_texts)
+            ]
+
+        results: List[Optional[List[Dict]]] = [None] * len(query_embeddings)
+        match_count = similarity_top_k * 2  # 필터링을 위해 더 많이 가져오기
+
+        hot_index = get_hot_vector_index() if folder_id else None
+        if hot_index is not None:
+            for i, embedding in enumerate(query_embeddings):
+                results[i] = hot_index.search(folder_id, document_ids, embedding, match_count)
+            if any(result is None for result in results):
+                hot_index.warm_in_background(folder_id, document_ids, self._load_embedding_matrix)
+            else:
+                print(f"핫 인덱스 배치 검색 완료: folder_id={folder_id}, {len(results)}개 질문")
+                return results
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        try:
+            db = Database.get_client()
+            rpc_params = {
+                "query_embeddings": [query_embeddings[i] for i in pending],
+                "document_ids": document_ids,
+                "match_count": match_count,
+                "ef_search": self.settings.vector_search_ef_search,
+                "iterative_scan": self.settings.vector_search_iterative_scan,
+            }
+            # 단일 검색과 같은 1차 검색 방식 (db/migrations/008)
+            short_dims = self.settings.embedding_short_dims
+            quantization = self.settings.vector_quantization
+            if short_dims:
+                rpc_params["query_embeddings_short"] = [
+                    shorten_embedding(query_embeddings[i], short_dims) for i in pending
+                ]
+                rpc_params["short_dims"] = short_dims
+                rpc_params["candidate_count"] = match_count * self.settings.vector_rescore_factor
+            elif quantization in ("halfvec", "binary"):
+                rpc_params["quantization"] = quantization
+                rpc_params["candidate_count"] = match_count * self.settings.vector_rescore_factor
+            result = db.rpc("search_document_chunks_batch", rpc_params).execute()
+
+            grouped: Dict[int, List[Dict]] = {}
+            for row in result.data or []:
+                grouped.setdefault(row.get('query_index'), []).append({
+                    'id': row.get('id'),
+                    'document_id': row.get('document_id'),
+                    'content': row.get('content'),
+                    'metadata': row.get('metadata', {}),
+                    'score': row.get('similarity', 0.0),
+                })
+            print(f"배치 RPC 검색 완료: {len(pending)}개 질문, {len(result.data or [])}개 청크 반환")
+
+            for position, i in enumerate(pending):
+                chunks = grouped.get(position)
+                results[i] = chunks if chunks else self._search_chunks_fallback(
+                    query_embeddings[i], document_ids, similarity_top_k
+                )
+        except Exception as e:
+            print(f"배치 RPC 검색 실패: {e} - 질문별 검색으로 폴백합니다.")
+            for i in pending:
+                results[i] = self._search_chunks_with_pgvector(
+                    query_embedding=query_embeddings[i],
+                    document_ids=document_ids,
+                    similarity_top_k=similarity_top_k,
+                )
+
+        return results
+
+    def _build_vector_search_rpc(
         self,
         query_embedding: List[float],
         document_ids: List[str],
+        match_count: int,
+    ) -> Tuple[str, Dict]:
+        """
+        설정에 맞는 벡터 검색 RPC 함수 이름과 파라미터 구성
+
+        - vector_quantization=none: search_document_chunks (float32 HNSW, db/migrations/004)
+        - vector_quantization=halfvec|binary: search_document_chunks_quantized
+          (압축 인덱스로 후보 추출 후 전체 정밀도로 재정렬, db/migrations/006)
+        - embedding_short_dims>0: search_document_chunks_two_stage
+          (축소 차원으로 후보 추출 후 전체 차원으로 재정렬, db/migrations/007)
+        """
+        params = {
+            "query_embedding": query_embedding,
+            "document_ids": document_ids,
+            "match_count": match_count,
+            # ANN 인덱스 검색 파라미터 (db/migrations/004)
+            "ef_search": self.settings.vector_search_ef_search,
+            "iterative_scan": self.settings.vector_search_iterative_scan,
+        }
+        
+        short_dims = self.settings.embedding_short_dims
+        if short_dims:
+            params["query_embedding_short"] = shorten_embedding(query_embedding, short_dims)
+            params["short_dims"] = short_dims
+            params["candidate_count"] = match_count * self.settings.vector_rescore_factor
+            return "search_document_chunks_two_stage", params
+        
+        quantization = self.settings.vector_quantization
+        if quantization in ("halfvec", "binary"):
+            params["quantization"] = quantization
+            params["candidate_count"] = match_count * self.settings.vector_rescore_factor
+            return "search_document_chunks_quantized", params
+        
+        params["probes"] = self.settings.vector_search_probes
+        return "search_document_chunks", params
+
+    def _search_chunks_hybrid(
+        self,
+        query_text: str,
+        query_embedding: List[float],
+        document_ids: List[str],
         similarity_top_k: int,
     ) -> List[Dict]:
         """
-        RPC 함수가 없을 때 폴백: 직접 쿼리로 검색
+        어휘 검색과 벡터 검색 순위를 RRF로 결합하는 하이브리드 검색 (db/migrations/005)
+
+        법령 번호, 제품명, 성분명 등 정확한 문자열 일치가 중요한 질문의 검색 품질을 보완합니다.
+        실패하거나 결과가 없으면 빈 리스트를 반환하여 벡터 검색으로 이어지게 합니다.
         """
         try:
             db = Database.get_client()
+            result = db.rpc(
+                "hybrid_search_document_chunks",
+                {
+                    "query_text": query_text,
+                    "query_embedding": query_embedding,
+                    "document_ids": document_ids,
+                    "match_count": similarity_top_k * 2,  # 필터링을 위해 더 많이 가져오기
+                    "candidate_count": max(self.settings.hybrid_candidate_count, similarity_top_k * 2),
+                    "rrf_k": self.settings.hybrid_rrf_k,
+                    "ef_search": self.settings.vector_search_ef_search,
+                    "iterative_scan": self.settings.vector_search_iterative_scan,
+                }
+            ).execute()
             
-            print("폴백: 직접 쿼리로 청크 검색")
-            
-            # document_chunks 테이블에서 해당 document_ids의 모든 청크 가져오기
-            all_chunks = (
-                db.table("document_chunks")
-                .select("*")
-                .in_("document_id", document_ids)
-                .execute()
-            )
-            
-            if not all_chunks.data:
-                print("폴백 검색: 청크가 없습니다.")
+            if not result.data:
+                print("하이브리드 검색: 빈 결과, 벡터 검색으로 진행")
                 return []
             
-            print(f"폴백 검색: {len(all_chunks.data)}개 청크 발견, 유사도 계산 중...")
-            
-            # 각 청크의 임베딩과 쿼리 임베딩의 유사도 계산
-            scored_chunks = []
-            for chunk in all_chunks.data:
-                if chunk.get('embedding'):
-                    # 임베딩이 문자열로 저장되어 있을 수 있으므로 변환
-                    chunk_embedding = chunk['embedding']
-                    if isinstance(chunk_embedding, str):
-                        import json
-                        try:
-                            chunk_embedding = json.loads(chunk_embedding)
-                        except:
-                            continue
-                    
-                    similarity = self._cosine_similarity(query_embedding, chunk_embedding)
-                    scored_chunks.append({
-                        'id': chunk['id'],
-                        'document_id': chunk['document_id'],
-                        'content': chunk['content'],
-                        'metadata': chunk.get('metadata', {}),
-                        'score': similarity,
-                    })
-            
-            # 점수 순으로 정렬
-            scored_chunks.sort(key=lambda x: x['score'], reverse=True)
+            # score는 기존과 같은 코사인 유사도, 순서는 RRF 점수 기준
+            chunks = []
+            for row in result.data:
+                chunks.append({
+                    'id': row.get('id'),
+                    'document_id': row.get('document_id'),
+                    'content': row.get('content'),
+                    'metadata': row.get('metadata', {}),
+                    'score': row.get('similarity', 0.0),
+                    'rrf_score': row.get('rrf_score'),
+                    'vector_rank': row.get('vector_rank'),
+                    'lexical_rank': row.get('lexical_rank'),
+                    'lexical_score': row.get('lexical_score'),
+                })
             
+            print(f"하이브리드 검색 완료: {len(chunks)}개 청크 반환 (어휘 일치 {sum(1 for c in chunks if c['lexical_rank'])}개)")
+            return chunks
+        except Exception as e:
+            print(f"하이브리드 검색 실패, 벡터 검색으로 진행: {e}")
+            return []
+
+    def _search_chunks_fallback(
+        self,
+        query_embedding: List[float],
+        document_ids: List[str],
+        similarity_top_k: int,
+    ) -> List[Dict]:
+        """
+        RPC 함수가 없을 때 폴백: 직접 쿼리로 검색
+        """
+        try:
+            cache = get_embedding_matrix_cache()
+            matrix = cache.get(document_ids)
+
+            if matrix is None:
+                print("폴백: 직접 쿼리로 청크 임베딩 행렬 구성")
+                rows, expected_count = self._fetch_embedding_rows(document_ids)
+                matrix = EmbeddingMatrix.from_rows(rows)
+
+                if len(matrix) == 0:
+                    print("폴백 검색: 청크가 없습니다.")
+                    return []
+
+                if expected_count is None or len(rows) == expected_count:
+                    # 문서 변경 시 무효화되므로 다음 폴백 검색부터는 DB 조회 없이 처리
+                    cache.put(document_ids, matrix)
+                    print(f"폴백 검색: {len(matrix)}개 청크 행렬 캐시 ({matrix.nbytes / (1024 * 1024):.1f}MB)")
+                else:
+                    # 조회 중 청크가 바뀜 → 이번 검색에만 사용하고 캐시하지 않음
+                    print(f"폴백 검색: 청크 수 불일치 ({len(rows)}/{expected_count}), 행렬 캐시 생략")
+
+            # 행렬-벡터 곱 한 번으로 전체 유사도 계산 후 상위 k개 선택
+            scored_chunks = matrix.search(query_embedding, similarity_top_k * 2)
+
             print(f"폴백 검색 완료: {len(scored_chunks)}개 청크 반환")
-            return scored_chunks[:similarity_top_k * 2]
-            
+            return scored_chunks
+
         except Exception as e:
             print(f"폴백 검색 실패: {e}")
             import traceback
             traceback.print_exc()
             return []
 
-    def _cosine_similarity(self, vec1: List[float], vec2) -> float:
+    def _load_embedding_matrix(self, document_ids: List[str]) -> EmbeddingMatrix:
         """
-        코사인 유사도 계산
-        
-        vec2는 리스트 또는 문자열일 수 있음
+        document_chunks에서 문서들의 청크를 읽어 정규화된 임베딩 행렬 생성 (캐시용)
+
+        Args:
+            document_ids: 문서 ID 리스트
+
+        Returns:
+            EmbeddingMatrix (청크가 없으면 빈 행렬)
+
+        Raises:
+            RuntimeError: 읽은 행 수가 청크 수와 다른 경우 (불완전한 행렬을 캐시하지 않도록)
         """
-        try:
-            # vec2가 문자열이면 파싱
-            if isinstance(vec2, str):
-                import json
-                vec2 = json.loads(vec2)
-            
-            # 벡터 길이 계산
-            import numpy as np
-            vec1 = np.array(vec1)
-            vec2 = np.array(vec2)
-            
-            dot_product = np.dot(vec1, vec2)
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-            
-            return float(dot_product / (norm1 * norm2))
-        except Exception as e:
-            print(f"유사도 계산 실패: {e}")
-            return 0.0
+        rows, expected_count = self._fetch_embedding_rows(document_ids)
+        if expected_count is not None and len(rows) != expected_count:
+            raise RuntimeError(f"청크 임베딩 조회가 불완전합니다. ({len(rows)}/{expected_count}개)")
+        return EmbeddingMatrix.from_rows(rows)
+
+    def _fetch_embedding_rows(self, document_ids: List[str]) -> Tuple[List[Dict], Optional[int]]:
+        """
+        문서들의 청크 임베딩 행을 페이지 단위로 모두 조회
+
+        PostgREST는 응답 행 수를 max-rows(기본 1000)로 자르므로 짧은 페이지가 올 때까지 range로 나누어 읽습니다.
+
+        Returns:
+            (청크 행 목록, 첫 페이지 기준 전체 청크 수)
+        """
+        db = Database.get_client()
+        page_size = max(1, get_settings().embedding_matrix_page_size)
+        rows: List[Dict] = []
+        expected_count: Optional[int] = None
+        start = 0
+        while True:
+            # 검색에 필요한 컬럼만 가져오기 (페이지 경계가 흔들리지 않도록 id 순서 고정)
+            page = (
+                db.table("document_chunks")
+                .select("id, document_id, content, metadata, embedding", count="exact" if start == 0 else None)
+                .in_("document_id", document_ids)
+                .order("id")
+                .range(start, start + page_size - 1)
+                .execute()
+            )
+            if start == 0:
+                expected_count = page.count
+            data = page.data or []
+            rows.extend(data)
+            # 서버의 max-rows가 page_size보다 작아도 전체 수에 도달할 때까지 계속 읽음
+            if not data or (len(data) < page_size and (expected_count is None or len(rows) >= expected_count)):
+                break
+            start += len(data)
+        return rows, expected_count
 
     def get_retrieved_nodes_from_documents(
         self,
         question: str,
         document_ids: List[str],
         similarity_top_k: int = 3,
+        folder_id: Optional[str] = None,
     ) -> List:
         """
         여러 PDF 문서들에서 질문에 대한 관련 노드(청크) 검색
@@ -898,6 +1889,7 @@ info
             question: 사용자 질문
             document_ids: 검색할 문서 ID 리스트
             similarity_top_k: 각 문서에서 검색할 관련 문서 수
+            folder_id: 문서들이 속한 폴더 ID (핫 인덱스 사용 시)
 
         Returns:
             검색된 노드 리스트 (점수 순으로 정렬)
@@ -906,13 +1898,15 @@ info
             return []
 
         # 질문을 임베딩으로 변환
-        query_embedding = self.embed_model.get_query_embedding(question)
+        query_embedding = self._get_query_embedding(question)
         
         # pgvector를 사용하여 검색
         chunks = self._search_chunks_with_pgvector(
             query_embedding=query_embedding,
             document_ids=document_ids,
             similarity_top_k=similarity_top_k * 2,  # 필터링을 위해 더 많이 가져오기
+            folder_id=folder_id,
+            query_text=question,
         )
         
         # LlamaIndex Node 형식으로 변환
@@ -934,7 +1928,5 @@ info
             )
             nodes.append(node_with_score)
         
-        # 점수 순으로 정렬
-        nodes.sort(key=lambda x: x.score or 0, reverse=True)
-        
+        # 검색 결과 순서 유지 (하이브리드 검색은 score가 아닌 RRF 순위로 정렬되어 있음)
         return nodes[:similarity_top_k]
@@ -0,0 +1,209 @@
+"""
+비동기 쿼리 작업 관리
+
+보고서 생성은 프록시 타임아웃을 넘길 만큼 오래 걸릴 수 있으므로,
+요청 시 작업 ID만 반환하고 전용 워커 풀에서 답변을 생성한 뒤
+결과를 TTL 저장소에 보관하여 작업 ID로 조회하거나 스트리밍할 수 있게 합니다.
+
+대기/실행 중인 작업은 크기 제한으로 제거되지 않도록 별도로 보관하고(가득 차면 새 작업을 거절),
+완료된 작업만 완료 시점부터 result_ttl_seconds 동안 LRU + TTL 저장소에 보관합니다.
+
+워커 수(query_job_workers)는 HTTP 연결 처리와 별개로 LLM 동시 호출 수에 맞춰 조정합니다.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.utils.cache import TTLCache
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class QueryJobQueueFull(Exception):
+    """대기/실행 중인 작업 수가 한도에 도달하여 새 작업을 받을 수 없음"""
+
+    def __init__(self, message: str, retry_after: float = 5.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueryJob:
+    """비동기 쿼리 작업 하나"""
+
+    def __init__(self, job_id: str, user_id: str, params: Dict[str, Any]):
+        self.id = job_id
+        self.user_id = user_id
+        self.params = params
+        self.status = JOB_QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.error_status_code: Optional[int] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._changed = threading.Condition()
+        self._version = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def _set_status(self, status: str, **fields) -> None:
+        with self._changed:
+            self.status = status
+            for key, value in fields.items():
+                setattr(self, key, value)
+            self._version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """
+        상태가 version 이후로 바뀔 때까지 대기
+
+        Returns:
+            현재 버전 (타임아웃 시 그대로)
+        """
+        with self._changed:
+            if self._version == version and not self.done:
+                self._changed.wait(timeout)
+            return self._version
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+            data["error_status_code"] = self.error_status_code
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+class QueryJobManager:
+    """쿼리 작업 워커 풀과 결과 저장소"""
+
+    def __init__(self, max_workers: int = 4, result_ttl_seconds: float = 3600, max_jobs: int = 1000):
+        """
+        Args:
+            max_workers: 동시에 답변을 생성할 워커 수
+            result_ttl_seconds: 완료된 작업(결과 포함) 보관 시간(초, 완료 시점부터)
+            max_jobs: 대기/실행 중인 최대 작업 수 (초과 시 새 작업 거절),
+                완료된 작업도 이 개수까지 보관 (초과 시 오래된 완료 작업부터 제거)
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query-job")
+        self._active: Dict[str, QueryJob] = {}
+        self._finished: TTLCache[QueryJob] = TTLCache(maxsize=max_jobs, ttl=result_ttl_seconds)
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self._rejected = 0
+
+    def submit(
+        self,
+        user_id: str,
+        params: Dict[str, Any],
+        fn: Callable[[], Dict[str, Any]],
+        error_status: Callable[[Exception], Optional[int]] = lambda e: None,
+    ) -> QueryJob:
+        """
+        작업 등록 및 실행 예약
+
+        Args:
+            user_id: 작업 소유자
+            params: 조회 응답에 포함할 요청 파라미터
+            fn: 결과를 반환하는 실제 작업 함수
+            error_status: 예외를 HTTP 상태 코드로 변환하는 함수 (조회 응답용)
+
+        Raises:
+            QueryJobQueueFull: 대기/실행 중인 작업이 max_jobs개인 경우
+        """
+        job = QueryJob(str(uuid.uuid4()), user_id, params)
+        with self._lock:
+            if len(self._active) >= self.max_jobs:
+                self._rejected += 1
+                raise QueryJobQueueFull(f"처리 중인 쿼리 작업이 너무 많습니다. (최대 {self.max_jobs}개)")
+            self._active[job.id] = job
+
+        def run():
+            job._set_status(JOB_RUNNING, started_at=time.time())
+            try:
+                result = fn()
+            except Exception as e:
+                print(f"쿼리 작업 실패: job_id={job.id}, {e}")
+                job._set_status(
+                    JOB_FAILED,
+                    error=getattr(e, "detail", None) or str(e),
+                    error_status_code=error_status(e),
+                    finished_at=time.time(),
+                )
+            else:
+                job._set_status(JOB_COMPLETED, result=result, finished_at=time.time())
+                print(f"쿼리 작업 완료: job_id={job.id}, 소요 시간={job.finished_at - job.started_at:.1f}초")
+            finally:
+                self._retire(job)
+
+        try:
+            self._executor.submit(run)
+        except Exception:
+            with self._lock:
+                self._active.pop(job.id, None)
+            raise
+        print(f"쿼리 작업 등록: job_id={job.id}")
+        return job
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[QueryJob]:
+        """작업 조회 (user_id가 주어지면 소유자가 다른 작업은 None)"""
+        with self._lock:
+            job = self._active.get(job_id) or self._finished.get(job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            active = len(self._active)
+        return {
+            "workers": self.max_workers,
+            "active_jobs": active,
+            "max_jobs": self.max_jobs,
+            "rejected": self._rejected,
+            "jobs": self._finished.stats(),
+        }
+
+    def _retire(self, job: QueryJob) -> None:
+        """완료된 작업을 결과 저장소로 이동 (보관 시간은 완료 시점부터)"""
+        with self._lock:
+            self._finished.set(job.id, job)
+            self._active.pop(job.id, None)
+
+
+_query_job_manager: Optional[QueryJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_query_job_manager() -> QueryJobManager:
+    """프로세스 전역 QueryJobManager 반환"""
+    global _query_job_manager
+    if _query_job_manager is None:
+        with _manager_lock:
+            if _query_job_manager is None:
+                from app.core.config import get_settings
+                settings = get_settings()
+                _query_job_manager = QueryJobManager(
+                    max_workers=settings.query_job_workers,
+                    result_ttl_seconds=settings.query_job_result_ttl_seconds,
+                    max_jobs=settings.query_job_max_jobs,
+                )
+    return _query_job_manager
@@ -0,0 +1,420 @@
+"""
+LLM / 임베딩 호출 복원력 계층
+
+OpenAI 호출 하나가 느려지면 클라이언트 라이브러리 기본 타임아웃 동안 워커가 묶이고
+p99 지연 시간이 이런 지연 요청에 좌우되므로, 호출마다 다음을 적용합니다.
+
+- 호출별 타임아웃: 제한 시간 안에 응답이 없으면 UpstreamTimeout
+- 헤지 요청: 응답이 최근 지연 시간의 백분위(예: p95)를 넘기면 같은 요청을 하나 더 보내고 먼저 온 응답 사용
+- 재시도: 타임아웃, 연결 오류, 429/5xx는 지수 백오프 + 지터 후 재시도
+- 서킷 브레이커: 연속 실패가 임계값을 넘으면 일정 시간 동안 호출 없이 즉시 실패 (CircuitOpenError)
+
+호출 함수는 주입 가능하므로 지연을 주입한 가짜 업스트림으로 검증할 수 있습니다
+(benchmarks/resilience_fake_upstream.py 참고).
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+from app.utils.deadline import Deadline, DeadlineExceeded
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    """업스트림(OpenAI) 호출을 완료할 수 없는 경우의 공통 예외"""
+
+
+class UpstreamTimeout(UpstreamUnavailable):
+    """호출이 제한 시간 안에 끝나지 않은 경우"""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """서킷 브레이커가 열려 있어 호출하지 않은 경우"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    재시도할 만한 오류인지 판단
+
+    openai 패키지를 직접 import하지 않고 상태 코드와 예외 이름으로 판단합니다.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, UpstreamTimeout):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code == 429 or status_code >= 500
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name or "RateLimit" in name
+
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커 (스레드 안전)"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            failure_threshold: 서킷을 여는 연속 실패 수 (0이면 비활성)
+            recovery_timeout: 열린 뒤 시험 호출을 허용할 때까지의 시간(초)
+            clock: 시간 함수 (테스트용으로 교체 가능)
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == CIRCUIT_OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = CIRCUIT_HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> None:
+        """
+        호출 허용 여부 확인
+
+        Raises:
+            CircuitOpenError: 서킷이 열려 있거나 반열림 상태에서 시험 호출이 진행 중인 경우
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            state = self._current_state()
+            if state == CIRCUIT_CLOSED:
+                return
+            if state == CIRCUIT_HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_after = max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+        raise CircuitOpenError("업스트림 장애로 요청을 일시적으로 차단했습니다.", retry_after=retry_after or 1.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = CIRCUIT_CLOSED
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """반열림 상태의 시험 호출이 결과 없이 끝난 경우 다른 호출이 시험할 수 있게 반환"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == CIRCUIT_HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != CIRCUIT_OPEN:
+                    print(f"서킷 브레이커 열림: 연속 실패 {self._failures}회")
+                self._state = CIRCUIT_OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """최근 호출 지연 시간 기록 및 백분위 계산 (스레드 안전)"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class ResilientCaller:
+    """타임아웃, 헤지 요청, 재시도, 서킷 브레이커를 적용하여 함수 호출"""
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 60.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge_percentile: float = 0.0,
+        hedge_min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 16,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Args:
+            name: 로그/통계용 이름 (예: "llm", "embedding")
+            timeout: 시도별 제한 시간(초)
+            max_retries: 최대 재시도 횟수
+            backoff_base: 백오프 기본 시간(초), 시도마다 2배 (full jitter 적용)
+            backoff_max: 백오프 최대 시간(초)
+            hedge_percentile: 이 백분위 지연을 넘기면 헤지 요청 전송 (0이면 비활성)
+            hedge_min_samples: 헤지 기준을 계산하기 위한 최소 표본 수
+            breaker: 서킷 브레이커 (None이면 기본 설정으로 생성)
+            max_workers: 호출 실행 스레드 수 (타임아웃된 호출도 끝날 때까지 스레드를 점유)
+            sleep: 대기 함수 (테스트용으로 교체 가능)
+            rng: 0~1 난수 함수 (테스트용으로 교체 가능)
+        """
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-call")
+        self._sleep = sleep
+        self._rng = rng
+
+        self._stats_lock = threading.Lock()
+        self._calls = 0
+        self._retries = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._timeouts = 0
+        self._failures = 0
+        self._short_circuited = 0
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        fn(*args, **kwargs)를 복원력 정책에 따라 호출
+
+        Raises:
+            CircuitOpenError: 서킷이 열려 있는 경우
+            UpstreamTimeout: 모든 시도가 제한 시간을 넘긴 경우
+            그 외 fn이 발생시킨 재시도 불가능한 예외 또는 마지막 시도의 예외
+        """
+        return self.call_with_deadline(None, fn, *args, **kwargs)
+
+    def call_with_deadline(self, deadline: Optional[Deadline], fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        call과 같지만 요청 마감 시간을 넘지 않도록 시도별 제한 시간과 재시도를 줄여서 호출
+
+        Raises:
+            DeadlineExceeded: 요청 마감 시간 안에 끝나지 않은 경우 (업스트림 장애로 집계하지 않음)
+            그 외 call과 같음
+        """
+        self._count("_calls")
+        attempt = 0
+        while True:
+            timeout = deadline.cap(self.timeout) if deadline is not None else self.timeout
+            if timeout <= 0:
+                self._count("_failures")
+                raise DeadlineExceeded(self.name)
+
+            try:
+                self.breaker.allow()
+            except CircuitOpenError:
+                self._count("_short_circuited")
+                raise
+
+            try:
+                result = self._attempt(fn, args, kwargs, timeout)
+            except UpstreamTimeout as e:
+                if timeout < self.timeout:
+                    # 요청 마감 시간 때문에 줄어든 제한 시간이면 업스트림 장애가 아님
+                    self.breaker.release_trial()
+                    self._count("_failures")
+                    raise DeadlineExceeded(self.name) from e
+                self._count("_timeouts")
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    self._count("_failures")
+                    raise
+                attempt = self._backoff(attempt, e, deadline)
+                continue
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    # 400 등 요청 자체의 오류는 업스트림 상태와 무관하므로 서킷에 반영하지 않음
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if attempt >= self.max_retries or not retryable:
+                    self._count("_failures")
+                    raise
+                attempt = self._backoff(attempt, e, deadline)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def _backoff(self, attempt: int, error: BaseException, deadline: Optional[Deadline]) -> int:
+        """
+        재시도 전 지터 백오프 대기
+
+        Returns:
+            다음 시도 번호
+
+        Raises:
+            error: 대기 후 요청 마감 시간이 남지 않는 경우 재시도하지 않고 원래 예외 전달
+        """
+        delay = self._rng() * min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        if deadline is not None and not deadline.has_at_least(delay + 0.1):
+            self._count("_failures")
+            raise error
+        attempt += 1
+        self._count("_retries")
+        print(f"{self.name} 호출 실패, {delay:.2f}초 후 재시도 ({attempt}/{self.max_retries}): {error}")
+        self._sleep(delay)
+        return attempt
+
+    def _attempt(self, fn: Callable[..., Any], args, kwargs, timeout: float) -> Any:
+        """한 번의 시도 (필요 시 헤지 요청 포함)"""
+        started = time.monotonic()
+        deadline = started + timeout
+        primary = self._executor.submit(fn, *args, **kwargs)
+        futures = {primary}
+
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                self._count("_hedges")
+                futures.add(self._executor.submit(fn, *args, **kwargs))
+
+        last_error: Optional[BaseException] = None
+        while futures:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, futures = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    if future is not primary:
+                        self._count("_hedge_wins")
+                    self.latency.record(time.monotonic() - started)
+                    self._discard(futures)
+                    return future.result()
+                last_error = error
+            # 실패한 요청 외에 진행 중인 헤지 요청이 있으면 계속 대기
+
+        if futures:
+            self._discard(futures)
+            raise UpstreamTimeout(f"{self.name} 호출이 {timeout:g}초 안에 끝나지 않았습니다.")
+        raise last_error
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile <= 0 or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    @staticmethod
+    def _discard(futures) -> None:
+        # 실행 중인 스레드는 중단할 수 없으므로 결과만 버림 (시작 전이면 취소)
+        for future in futures:
+            future.cancel()
+
+    def _count(self, field: str) -> None:
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = {
+                "calls": self._calls,
+                "retries": self._retries,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "timeouts": self._timeouts,
+                "failures": self._failures,
+                "short_circuited": self._short_circuited,
+            }
+        p50 = self.latency.percentile(50)
+        p95 = self.latency.percentile(95)
+        stats.update({
+            "circuit": self.breaker.state,
+            "latency_p50": round(p50, 3) if p50 is not None else None,
+            "latency_p95": round(p95, 3) if p95 is not None else None,
+        })
+        return stats
+
+
+_callers: Dict[str, ResilientCaller] = {}
+_callers_lock = threading.Lock()
+
+
+def _build_caller(name: str) -> ResilientCaller:
+    from app.core.config import get_settings
+    settings = get_settings()
+    breaker = CircuitBreaker(
+        failure_threshold=settings.circuit_breaker_failure_threshold,
+        recovery_timeout=settings.circuit_breaker_recovery_seconds,
+    )
+    if name == "embedding":
+        return ResilientCaller(
+            name,
+            timeout=settings.embedding_timeout_seconds,
+            max_retries=settings.embedding_max_retries,
+            hedge_percentile=settings.embedding_hedge_percentile,
+            breaker=breaker,
+        )
+    return ResilientCaller(
+        name,
+        timeout=settings.llm_timeout_seconds,
+        max_retries=settings.llm_max_retries,
+        hedge_percentile=settings.llm_hedge_percentile,
+        breaker=breaker,
+        max_workers=max(16, settings.llm_max_concurrency * 2),
+    )
+
+
+def get_resilient_caller(name: str) -> ResilientCaller:
+    """
+    프로세스 전역 ResilientCaller 반환 ("embedding" 또는 "llm.<단계>", 그 외 이름은 LLM 설정 사용)
+
+    업스트림 상태(서킷, 지연 시간 분포)는 프로세스 전체에서 공유해야 하므로 이름별 싱글톤으로 관리합니다.
+    """
+    caller = _callers.get(name)
+    if caller is None:
+        with _callers_lock:
+            caller = _callers.get(name)
+            if caller is None:
+                caller = _build_caller(name)
+                _callers[name] = caller
+    return caller
+
+
+def resilience_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: caller.stats() for name, caller in list(_callers.items())}
@@ -0,0 +1,205 @@
+"""
+문서 상태 변경 브로커 (SSE 구독용)
+
+문서마다 GET /documents/status/{document_id}를 폴링하는 대신, 사용자당 연결 하나
+(GET /documents/status/stream)로 상태 전환(uploaded → processing → completed/failed)과
+인덱싱 단계별 진행 상황(파싱한 페이지 수, 임베딩한 청크 수 등)을 받을 수 있게
+인덱싱 작업이 발행한 이벤트를 구독자에게 전달합니다.
+
+배치 인덱싱 스케줄러가 API와 같은 프로세스에서 실행되므로 프로세스 내 브로커로 충분합니다.
+발행은 스케줄러 스레드에서 이루어지고, 구독자는 이벤트 루프의 asyncio 큐로 이벤트를 받습니다.
+SSE 연결은 세션 내내 열려 있으므로 대기에 스레드풀 워커를 점유하지 않도록
+발행 스레드는 loop.call_soon_threadsafe로 구독자의 큐에 넣기만 합니다.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.utils.cache import TTLCache
+
+
+class TooManySubscriptions(Exception):
+    """사용자당 동시 구독 수 초과"""
+
+
+class StatusSubscription:
+    """구독 하나 (사용자 단위, 선택적으로 문서 ID 필터, 구독한 이벤트 루프에서만 대기)"""
+
+    def __init__(
+        self,
+        user_id: str,
+        loop: asyncio.AbstractEventLoop,
+        document_ids: Optional[Iterable[str]] = None,
+        max_pending: int = 500,
+    ):
+        self.user_id = user_id
+        self.document_ids: Optional[Set[str]] = set(document_ids) if document_ids else None
+        self._loop = loop
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if event.get("user_id") != self.user_id:
+            return False
+        return self.document_ids is None or event.get("document_id") in self.document_ids
+
+    def _push(self, event: Dict[str, Any]) -> None:
+        """발행 스레드에서 호출 (큐 조작은 이벤트 루프 스레드로 넘김)"""
+        try:
+            self._loop.call_soon_threadsafe(self._enqueue, event)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힘 (연결 종료 직후)
+            pass
+
+    def _enqueue(self, event: Dict[str, Any]) -> None:
+        if self._queue.full():
+            # 느린 구독자는 오래된 이벤트부터 버림 (최신 이벤트는 항상 유지)
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def next_events(self, timeout: float) -> List[Dict[str, Any]]:
+        """
+        이벤트가 올 때까지 최대 timeout초 대기 후 쌓인 이벤트를 모두 반환
+
+        Returns:
+            이벤트 목록 (타임아웃 시 빈 목록)
+        """
+        try:
+            events = [await asyncio.wait_for(self._queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+
+class DocumentStatusBroker:
+    """문서 상태 이벤트 발행/구독 (스레드 안전)"""
+
+    def __init__(
+        self,
+        max_pending_per_subscriber: int = 500,
+        max_tracked_documents: int = 10000,
+        max_subscriptions_per_user: int = 5,
+    ):
+        self.max_pending_per_subscriber = max_pending_per_subscriber
+        self.max_subscriptions_per_user = max_subscriptions_per_user
+        # 문서별 마지막 진행 이벤트 (일괄 상태 조회에서 진행 상황 제공용, 완료/실패 시 제거)
+        self._latest_progress: TTLCache[Dict[str, Any]] = TTLCache(maxsize=max_tracked_documents, ttl=60 * 60)
+        self._subscriptions: List[StatusSubscription] = []
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._published = 0
+        self._rejected = 0
+
+    def subscribe(self, user_id: str, document_ids: Optional[Iterable[str]] = None) -> StatusSubscription:
+        """
+        현재 이벤트 루프에서 구독 (async 함수 안에서 호출)
+
+        Raises:
+            TooManySubscriptions: 사용자의 동시 구독이 max_subscriptions_per_user개인 경우
+        """
+        subscription = StatusSubscription(
+            user_id, asyncio.get_running_loop(), document_ids, self.max_pending_per_subscriber
+        )
+        with self._lock:
+            active = sum(1 for existing in self._subscriptions if existing.user_id == user_id)
+            if active >= self.max_subscriptions_per_user:
+                self._rejected += 1
+                raise TooManySubscriptions(
+                    f"상태 구독은 사용자당 최대 {self.max_subscriptions_per_user}개까지 열 수 있습니다."
+                )
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: StatusSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(
+        self,
+        document_id: str,
+        user_id: Optional[str],
+        status: Optional[str] = None,
+        stage: Optional[str] = None,
+        progress: Optional[Dict[str, Any]] = None,
+        message: Optional[str] = None,
+    ) -> None:
+        """
+        상태 전환 또는 진행 상황 이벤트 발행
+
+        Args:
+            document_id: 문서 ID
+            user_id: 문서 소유자 (None이면 전달할 구독자가 없으므로 무시)
+            status: 새 문서 상태 (uploaded, processing, completed, failed), 진행 이벤트면 None
+            stage: 인덱싱 단계 (parsing, extracting, embedding)
+            progress: 단계별 진행 정보 (예: {"pages": 12}, {"done": 30, "total": 120})
+            message: 사람이 읽을 설명 (실패 사유 등)
+        """
+        if not user_id:
+            return
+        event = {
+            "seq": next(self._seq),
+            "type": "status" if status is not None else "progress",
+            "document_id": document_id,
+            "user_id": user_id,
+            "status": status,
+            "stage": stage,
+            "progress": progress or {},
+            "message": message,
+            "timestamp": time.time(),
+        }
+        if status is None:
+            self._latest_progress.set(document_id, event)
+        elif status in ("completed", "failed"):
+            self._latest_progress.pop(document_id)
+        with self._lock:
+            self._published += 1
+            targets = [subscription for subscription in self._subscriptions if subscription.matches(event)]
+        for subscription in targets:
+            subscription._push(event)
+
+    def latest_progress(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """
+        인덱싱 중인 문서의 마지막 진행 정보
+
+        Returns:
+            {"stage", "progress", "timestamp"} 또는 None (진행 중이 아니거나 다른 프로세스에서 처리 중)
+        """
+        event = self._latest_progress.get(document_id)
+        if event is None:
+            return None
+        return {"stage": event["stage"], "progress": event["progress"], "timestamp": event["timestamp"]}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tracked_documents": len(self._latest_progress),
+                "subscribers": len(self._subscriptions),
+                "published": self._published,
+                "rejected": self._rejected,
+                "dropped": sum(subscription.dropped for subscription in self._subscriptions),
+            }
+
+
+_document_status_broker: Optional[DocumentStatusBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_document_status_broker() -> DocumentStatusBroker:
+    """프로세스 전역 DocumentStatusBroker 반환"""
+    global _document_status_broker
+    if _document_status_broker is None:
+        with _broker_lock:
+            if _document_status_broker is None:
+                from app.core.config import get_settings
+                settings = get_settings()
+                _document_status_broker = DocumentStatusBroker(
+                    max_subscriptions_per_user=settings.document_status_stream_max_per_user,
+                )
+    return _document_status_broker
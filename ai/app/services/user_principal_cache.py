@@ -0,0 +1,82 @@
+"""
+인증 사용자(principal) 캐시
+
+get_current_user는 JWT를 검증한 뒤 매 요청마다 users 테이블을 조회하므로
+프론트엔드가 자주 호출하는 엔드포인트에서는 인증만으로 DB 부하가 두 배가 됩니다.
+사용자 ID를 키로 짧은 TTL(auth_user_cache_ttl_seconds) 동안 사용자 행을 메모리에 보관하여
+인증 비용을 로컬 해시 조회로 줄이고, 프로필 변경/삭제 시에는 invalidate()로 즉시 무효화합니다.
+
+존재하지 않거나 삭제된 사용자는 캐시하지 않으므로(매번 DB 확인) 다른 프로세스에서 삭제된 사용자는
+최대 TTL 동안만 인증될 수 있습니다.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+from supabase import Client
+
+from app.utils.cache import TTLCache
+
+
+class UserPrincipalCache:
+    """사용자 ID → 사용자 행 단기 캐시 (스레드 안전)"""
+
+    def __init__(self, ttl_seconds: float = 30.0, maxsize: int = 10000):
+        self._cache: TTLCache[Dict[str, Any]] = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+
+    def get(self, db: Client, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        활성 사용자 행 반환 (캐시 미스 시 users 테이블 조회)
+
+        Returns:
+            사용자 정보 딕셔너리, 없거나 삭제된 사용자면 None
+        """
+        user = self._cache.get(user_id)
+        if user is not None:
+            return user
+        result = db.table('users').select('*').eq('id', user_id).eq('deleted_at', None).execute()
+        if not result.data:
+            return None
+        user = result.data[0]
+        self._cache.set(user_id, user)
+        return user
+
+    def set(self, user: Dict[str, Any]) -> None:
+        """방금 조회/생성한 사용자 행을 캐시에 저장 (로그인 직후 첫 요청의 DB 조회 생략)"""
+        if user and user.get('id'):
+            self._cache.set(str(user['id']), user)
+
+    def invalidate(self, user_id: Optional[str]) -> None:
+        """사용자 프로필이 바뀌었거나 삭제된 경우 캐시된 행 제거"""
+        if user_id:
+            self._cache.pop(str(user_id))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+_user_principal_cache: Optional[UserPrincipalCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_user_principal_cache() -> UserPrincipalCache:
+    """프로세스 전역 UserPrincipalCache 반환"""
+    global _user_principal_cache
+    if _user_principal_cache is None:
+        with _cache_lock:
+            if _user_principal_cache is None:
+                from app.core.config import get_settings
+                settings = get_settings()
+                _user_principal_cache = UserPrincipalCache(
+                    ttl_seconds=settings.auth_user_cache_ttl_seconds,
+                    maxsize=settings.auth_user_cache_max_size,
+                )
+    return _user_principal_cache
+
+
+def invalidate_user(user_id: Optional[str]) -> None:
+    """사용자 변경/삭제 경로에서 호출하는 무효화 헬퍼"""
+    get_user_principal_cache().invalidate(user_id)
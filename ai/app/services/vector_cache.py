@@ -0,0 +1,165 @@
+"""
+프로세스 내 임베딩 행렬 캐시
+
+RPC 검색이 실패하거나 빈 결과를 반환할 때 사용하는 폴백 검색용 캐시입니다.
+문서 집합(document_ids)별로 정규화된 float32 행렬을 한 번만 만들어 두고,
+이후 검색은 행렬-벡터 곱 한 번과 argpartition으로 처리합니다.
+
+API 라우터와 배치 인덱싱 서비스가 서로 다른 QnARAGService 인스턴스를 사용하므로
+캐시는 모듈 단위 싱글톤으로 공유하여 인덱싱/삭제 시 무효화가 함께 적용되도록 합니다.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+import numpy as np
+
+from app.utils.vectors import normalize_rows, parse_embedding, top_k_indices
+
+
+class EmbeddingMatrix:
+    """문서 집합의 청크 임베딩을 정규화된 행렬로 보관하는 클래스"""
+
+    def __init__(
+        self,
+        ids: List[str],
+        document_ids: List[str],
+        contents: List[str],
+        metadatas: List[Dict],
+        matrix: np.ndarray,
+    ):
+        self.ids = ids
+        self.document_ids = document_ids
+        self.contents = contents
+        self.metadatas = metadatas
+        self.matrix = matrix
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> "EmbeddingMatrix":
+        """
+        document_chunks 조회 결과로 행렬 생성
+
+        임베딩이 없거나 차원이 다른 청크는 제외합니다.
+        """
+        ids, document_ids, contents, metadatas, vectors = [], [], [], [], []
+        dim = None
+        for row in rows:
+            vector = parse_embedding(row.get('embedding'))
+            if vector is None:
+                continue
+            if dim is None:
+                dim = vector.shape[0]
+            elif vector.shape[0] != dim:
+                continue
+            ids.append(row.get('id'))
+            document_ids.append(row.get('document_id'))
+            contents.append(row.get('content'))
+            metadatas.append(row.get('metadata') or {})
+            vectors.append(vector)
+
+        if vectors:
+            matrix = normalize_rows(np.vstack(vectors))
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        return cls(ids, document_ids, contents, metadatas, matrix)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.matrix.nbytes)
+
+    def search(self, query_embedding: List[float], top_k: int) -> List[Dict]:
+        """
+        코사인 유사도 상위 top_k개 청크 반환
+
+        Returns:
+            _search_chunks_with_pgvector와 같은 형식의 청크 딕셔너리 리스트
+        """
+        if len(self) == 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape[0] != self.matrix.shape[1]:
+            print(f"임베딩 차원 불일치: query={query.shape[0]}, matrix={self.matrix.shape[1]}")
+            return []
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = self.matrix @ (query / norm)
+
+        chunks = []
+        for idx in top_k_indices(scores, top_k):
+            chunks.append({
+                'id': self.ids[idx],
+                'document_id': self.document_ids[idx],
+                'content': self.contents[idx],
+                'metadata': self.metadatas[idx],
+                'score': float(scores[idx]),
+            })
+        return chunks
+
+
+class EmbeddingMatrixCache:
+    """문서 집합별 EmbeddingMatrix LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[FrozenSet[str], EmbeddingMatrix]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(document_ids: Iterable[str]) -> FrozenSet[str]:
+        return frozenset(str(doc_id) for doc_id in document_ids)
+
+    def get(self, document_ids: Iterable[str]) -> Optional[EmbeddingMatrix]:
+        key = self.make_key(document_ids)
+        with self._lock:
+            matrix = self._entries.get(key)
+            if matrix is not None:
+                self._entries.move_to_end(key)
+            return matrix
+
+    def put(self, document_ids: Iterable[str], matrix: EmbeddingMatrix) -> None:
+        key = self.make_key(document_ids)
+        with self._lock:
+            self._entries[key] = matrix
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_document(self, document_id: str) -> int:
+        """
+        해당 문서를 포함하는 모든 캐시 항목 제거
+
+        Returns:
+            제거된 항목 수
+        """
+        document_id = str(document_id)
+        with self._lock:
+            stale_keys = [key for key in self._entries if document_id in key]
+            for key in stale_keys:
+                del self._entries[key]
+            return len(stale_keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_embedding_matrix_cache: Optional[EmbeddingMatrixCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_matrix_cache() -> EmbeddingMatrixCache:
+    """프로세스 전역 EmbeddingMatrixCache 반환 (싱글톤)"""
+    global _embedding_matrix_cache
+    if _embedding_matrix_cache is None:
+        with _cache_lock:
+            if _embedding_matrix_cache is None:
+                from app.core.config import get_settings
+                _embedding_matrix_cache = EmbeddingMatrixCache(
+                    max_entries=get_settings().fallback_matrix_cache_size,
+                )
+    return _embedding_matrix_cache
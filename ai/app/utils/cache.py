@@ -0,0 +1,112 @@
+"""
+프로세스 내 캐시 유틸리티
+
+크기 제한(LRU)과 만료 시간(TTL)을 함께 지원하는 스레드 안전 캐시입니다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """크기 제한 + TTL 캐시 (스레드 안전, 통계 제공)"""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            maxsize: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+            ttl: 항목 유효 시간(초), None이면 만료 없음
+            clock: 시간 함수 (테스트용으로 교체 가능)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._entries.get(key, _MISSING)
+            if item is _MISSING:
+                self._misses += 1
+                return default
+            expires_at, value = item
+            if expires_at and expires_at <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """
+        Args:
+            ttl: 이 항목에만 적용할 유효 시간(초), None이면 기본값 사용
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self._clock() + ttl if ttl else 0.0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], V]) -> V:
+        """
+        캐시에 없으면 factory()로 값을 만들어 저장 후 반환
+
+        factory는 lock 밖에서 호출되므로 같은 키가 동시에 계산될 수 있습니다.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = factory()
+        self.set(key, value)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._entries.pop(key, _MISSING)
+            if item is _MISSING:
+                return default
+            return item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
@@ -0,0 +1,66 @@
+"""
+요청 마감 시간(deadline) 유틸리티
+
+요청 단위 전체 시간 예산을 만들고, 파이프라인의 각 단계가 남은 시간을 확인하여
+제한 시간을 줄이거나 선택 단계를 생략할 수 있게 합니다.
+"""
+
+import time
+from typing import Callable, Optional
+
+
+class DeadlineExceeded(Exception):
+    """요청 마감 시간을 넘긴 경우"""
+
+    def __init__(self, stage: str):
+        super().__init__(f"요청 처리 시간이 초과되었습니다. (단계: {stage})")
+        self.stage = stage
+
+
+class Deadline:
+    """요청 마감 시간 (timeout이 None이면 제한 없음)"""
+
+    def __init__(self, timeout: Optional[float], clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            timeout: 지금부터 허용할 시간(초), None이면 제한 없음
+            clock: 시간 함수 (테스트용으로 교체 가능)
+        """
+        self._clock = clock
+        self.timeout = timeout
+        self.expires_at = clock() + timeout if timeout is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """남은 시간(초), 제한이 없으면 None"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def has_at_least(self, seconds: float) -> bool:
+        """seconds 이상 남았는지 (제한이 없으면 항상 True)"""
+        remaining = self.remaining()
+        return remaining is None or remaining >= seconds
+
+    def cap(self, timeout: Optional[float]) -> Optional[float]:
+        """단계별 제한 시간을 남은 시간 이하로 제한"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def check(self, stage: str) -> None:
+        """
+        마감 시간이 지났으면 예외 발생
+
+        Raises:
+            DeadlineExceeded: 남은 시간이 없는 경우
+        """
+        if self.expired:
+            raise DeadlineExceeded(stage)
@@ -0,0 +1,54 @@
+"""
+키셋(커서) 페이지네이션 유틸리티
+
+(created_at, id) 내림차순 목록에서 마지막 행의 정렬 키를 불투명한 커서 문자열로 주고받아
+OFFSET 없이 다음 페이지를 조회합니다.
+변경분 동기화(since)는 같은 형식의 커서를 (updated_at, id) 오름차순으로 사용합니다.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    """해석할 수 없는 커서"""
+
+
+def encode_cursor(row: Dict[str, Any], sort_key: str = "created_at") -> str:
+    """행의 (sort_key, id)를 URL에 안전한 커서 문자열로 변환"""
+    payload = json.dumps({"c": row[sort_key], "i": row["id"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    커서 문자열을 (정렬 키 값, id)로 변환
+
+    Raises:
+        InvalidCursor: 형식이 올바르지 않은 경우
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        created_at, row_id = payload["c"], payload["i"]
+        # 필터 문자열에 그대로 들어가므로 형식을 검증 (따옴표 등 주입 방지)
+        datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        uuid.UUID(str(row_id))
+    except Exception as e:
+        raise InvalidCursor(f"잘못된 커서입니다: {cursor}") from e
+    return str(created_at), str(row_id)
+
+
+def keyset_filter(value: str, row_id: str, sort_key: str = "created_at", descending: bool = True) -> str:
+    """
+    (sort_key, id) 정렬에서 커서 다음 행을 고르는 PostgREST or 필터
+
+    타임스탬프의 '.', ':', '+' 등 예약 문자가 있으므로 값을 큰따옴표로 감쌉니다.
+    """
+    op = "lt" if descending else "gt"
+    return f'{sort_key}.{op}."{value}",and({sort_key}.eq."{value}",id.{op}."{row_id}")'
@@ -0,0 +1,86 @@
+"""
+동일 요청 병합 (single-flight) 유틸리티
+
+같은 키로 동시에 들어온 호출 중 첫 번째만 실제로 실행하고,
+나머지 호출은 그 결과(또는 예외)를 함께 받습니다.
+완료된 결과는 보관하지 않으므로 캐시가 아니라 "진행 중인 호출"만 병합합니다.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """진행 중인 호출 하나"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """키별 진행 중 호출 병합 (스레드 안전)"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        같은 키의 호출이 진행 중이면 그 결과를 기다리고, 아니면 fn()을 실행
+
+        Args:
+            key: 병합 기준 키
+            fn: 실제 실행할 함수
+
+        Returns:
+            (결과, 다른 호출의 결과를 공유받았는지 여부)
+
+        Raises:
+            fn()이 발생시킨 예외 (대기 중이던 호출에도 같은 예외 전달)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+        if call.waiters:
+            print(f"동일 요청 병합: {call.waiters}개 요청이 결과를 공유했습니다.")
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executions": self._executions,
+                "shared": self._shared,
+            }
@@ -0,0 +1,32 @@
+"""
+텍스트 정규화 유틸리티
+"""
+
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """
+    캐시 키 등으로 사용하기 위해 질문 텍스트를 정규화
+
+    - Unicode NFC 정규화 (자모가 분리된 한글을 완성형으로 결합)
+    - 구두점 제거 (?, ？, ., ! 등)
+    - 공백 연속 제거 및 양쪽 공백 제거
+    - 대소문자 통일
+
+    Args:
+        question: 원본 질문
+
+    Returns:
+        정규화된 질문
+    """
+    text = unicodedata.normalize("NFC", question or "")
+    text = "".join(
+        " " if unicodedata.category(ch).startswith("P") else ch
+        for ch in text
+    )
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text.casefold()
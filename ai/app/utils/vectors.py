@@ -0,0 +1,87 @@
+"""
+임베딩 벡터 연산 유틸리티
+
+document_chunks 에서 가져온 임베딩을 NumPy 행렬로 다루기 위한 공용 함수 모음입니다.
+"""
+
+import json
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+def parse_embedding(value: Any) -> Optional[np.ndarray]:
+    """
+    DB에서 읽은 임베딩 값을 float32 벡터로 변환
+
+    PostgREST는 vector 타입을 '[0.1,0.2,...]' 문자열로 반환하고,
+    RPC 실패 시 직접 insert한 청크는 JSON 문자열로 저장되어 있을 수 있음
+
+    Args:
+        value: 리스트, 문자열 또는 None
+
+    Returns:
+        float32 벡터 (변환 불가 시 None)
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return None
+    try:
+        vector = np.asarray(value, dtype=np.float32)
+    except (TypeError, ValueError):
+        return None
+    if vector.ndim != 1 or vector.size == 0:
+        return None
+    return vector
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    행렬의 각 행을 L2 정규화 (내적 = 코사인 유사도가 되도록)
+
+    노름이 0인 행은 0 벡터로 유지합니다.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    점수 배열에서 상위 k개 인덱스를 점수 내림차순으로 반환
+
+    전체 정렬 대신 argpartition으로 후보를 먼저 고른 뒤 k개만 정렬합니다.
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= n:
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+def shorten_embedding(embedding: Any, dims: int) -> List[float]:
+    """
+    임베딩의 앞쪽 dims 차원만 남기고 L2 정규화
+
+    text-embedding-3 계열은 이렇게 줄인 벡터도 의미를 유지합니다
+    (OpenAI API의 dimensions 파라미터와 같은 방식).
+
+    Args:
+        embedding: 전체 차원 임베딩
+        dims: 남길 차원 수
+
+    Returns:
+        축소된 임베딩 (float 리스트)
+    """
+    vector = np.asarray(embedding, dtype=np.float32)[:dims]
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector = vector / norm
+    return vector.tolist()
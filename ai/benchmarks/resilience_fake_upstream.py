@@ -0,0 +1,161 @@
+"""
+복원력 계층(ResilientCaller) 가짜 업스트림 벤치마크
+
+OpenAI를 호출하지 않고, 지연 시간 분포와 오류율을 주입한 가짜 업스트림 함수로
+타임아웃 / 헤지 요청 / 재시도 / 서킷 브레이커 동작과 지연 시간 분포(p50/p95/p99)를 확인합니다.
+
+시나리오:
+    baseline  - 복원력 계층 없이 직접 호출
+    resilient - 타임아웃 + 재시도 + 헤지 요청 적용
+    outage    - 중간에 업스트림이 장애 상태가 되었을 때 서킷 브레이커가 즉시 실패시키는지 확인
+
+실행 예시:
+    cd ai
+    python benchmarks/resilience_fake_upstream.py --calls 300 --straggler-rate 0.05 --hedge-percentile 90
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.resilience import CircuitBreaker, ResilientCaller, UpstreamUnavailable
+
+
+class FakeUpstreamError(Exception):
+    """가짜 업스트림의 5xx 오류"""
+
+    status_code = 503
+
+
+class FakeUpstream:
+    """지연 시간과 오류를 주입하는 가짜 업스트림"""
+
+    def __init__(self, base_latency: float, straggler_rate: float, straggler_latency: float, error_rate: float, seed: int):
+        self.base_latency = base_latency
+        self.straggler_rate = straggler_rate
+        self.straggler_latency = straggler_latency
+        self.error_rate = error_rate
+        self.down = False
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+            jitter = self._rng.lognormvariate(0, 0.25)
+        if self.down:
+            time.sleep(self.base_latency * 0.1)
+            raise FakeUpstreamError("upstream down")
+        if roll < self.straggler_rate:
+            time.sleep(self.straggler_latency)
+        else:
+            time.sleep(self.base_latency * jitter)
+        if roll > 1 - self.error_rate:
+            raise FakeUpstreamError("transient error")
+        return f"answer: {prompt}"
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run(label: str, call: Callable[[str], str], calls: int, concurrency: int) -> None:
+    latencies: List[float] = []
+    errors = {"count": 0}
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        started = time.perf_counter()
+        try:
+            call(f"q{i}")
+        except Exception:
+            with lock:
+                errors["count"] += 1
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(calls)))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"[{label:9s}] 호출 {calls}회, 실패 {errors['count']}회, 총 {elapsed:.1f}초 | "
+        f"p50={percentile(latencies, 50) * 1000:.0f}ms "
+        f"p95={percentile(latencies, 95) * 1000:.0f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.0f}ms "
+        f"max={max(latencies) * 1000:.0f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="복원력 계층 가짜 업스트림 벤치마크")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-latency", type=float, default=0.05, help="정상 응답 지연(초)")
+    parser.add_argument("--straggler-rate", type=float, default=0.05, help="지연 요청 비율")
+    parser.add_argument("--straggler-latency", type=float, default=1.0, help="지연 요청 지연(초)")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="일시적 5xx 비율")
+    parser.add_argument("--timeout", type=float, default=0.5, help="시도별 제한 시간(초)")
+    parser.add_argument("--hedge-percentile", type=float, default=90.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    def upstream() -> FakeUpstream:
+        return FakeUpstream(args.base_latency, args.straggler_rate, args.straggler_latency, args.error_rate, args.seed)
+
+    run("baseline", upstream(), args.calls, args.concurrency)
+
+    fake = upstream()
+    caller = ResilientCaller(
+        "fake",
+        timeout=args.timeout,
+        max_retries=2,
+        backoff_base=0.05,
+        hedge_percentile=args.hedge_percentile,
+        hedge_min_samples=20,
+        breaker=CircuitBreaker(failure_threshold=10, recovery_timeout=1.0),
+        max_workers=args.concurrency * 3,
+    )
+    run("resilient", lambda prompt: caller.call(fake, prompt), args.calls, args.concurrency)
+    print(f"            업스트림 호출 {fake.calls}회 (헤지/재시도 포함), 통계: {caller.stats()}")
+
+    # 장애 시나리오: 업스트림이 모두 실패하면 서킷이 열려 업스트림 호출 없이 즉시 실패
+    fake = upstream()
+    fake.down = True
+    caller = ResilientCaller(
+        "outage",
+        timeout=args.timeout,
+        max_retries=1,
+        backoff_base=0.01,
+        breaker=CircuitBreaker(failure_threshold=5, recovery_timeout=1.0),
+    )
+    short_circuited = 0
+    for i in range(50):
+        try:
+            caller.call(fake, f"q{i}")
+        except UpstreamUnavailable:
+            short_circuited += 1
+        except FakeUpstreamError:
+            pass
+    print(
+        f"[outage   ] 요청 50회 중 서킷 차단 {short_circuited}회, 실제 업스트림 호출 {fake.calls}회, "
+        f"서킷 상태={caller.breaker.state}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+벡터 검색 벤치마크
+
+합성 코퍼스를 PostgreSQL(pgvector)에 적재한 뒤, document_id 필터가 걸린
+정확 검색(순차 스캔)과 HNSW 인덱스 검색의 재현율(recall@k)과 지연 시간을 비교합니다.
+search_document_chunks RPC와 같은 형태의 쿼리(document_id = ANY(...) + <=> 정렬)를 사용합니다.
+
+--quantization 옵션으로 양자화 인덱스(halfvec / binary) + 전체 정밀도 재정렬 검색
+(search_document_chunks_quantized와 같은 형태)의 저장 크기, 인덱스 생성 시간, 재현율, 지연 시간도 측정합니다.
+
+실행 예시:
+    cd ai
+    python benchmarks/vector_search_benchmark.py --rows 50000 --ef-search 40 100 200
+
+.env의 POSTGRES_* 설정을 사용하며, 벤치마크용 테이블(bench_document_chunks)을 생성 후 삭제합니다.
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import get_settings
+
+BENCH_TABLE = "bench_document_chunks"
+
+
+def connect():
+    """POSTGRES_* 설정으로 DB 연결"""
+    settings = get_settings()
+    if not settings.postgres_host:
+        raise ValueError("POSTGRES_HOST 등 PostgreSQL 연결 설정이 필요합니다.")
+    conn = psycopg2.connect(
+        host=settings.postgres_host,
+        port=settings.postgres_port,
+        dbname=settings.postgres_database,
+        user=settings.postgres_user,
+        password=settings.postgres_password,
+    )
+    conn.autocommit = True
+    return conn
+
+
+def to_vector_literal(vector: np.ndarray) -> str:
+    """NumPy 벡터를 pgvector 리터럴 문자열로 변환"""
+    return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+
+def make_corpus(
+    rows: int,
+    dim: int,
+    documents: int,
+    clusters: int,
+    seed: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    군집 구조를 가진 정규화된 합성 임베딩 생성
+
+    Returns:
+        (임베딩 행렬 [rows, dim], 행별 문서 인덱스 [rows])
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, clusters, rows)
+    vectors = centers[assignments] + 0.6 * rng.standard_normal((rows, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    doc_index = rng.integers(0, documents, rows)
+    return vectors, doc_index
+
+
+def make_queries(corpus: np.ndarray, count: int, seed: int) -> np.ndarray:
+    """코퍼스 벡터에 노이즈를 더해 쿼리 생성"""
+    rng = np.random.default_rng(seed + 1)
+    picked = corpus[rng.integers(0, corpus.shape[0], count)]
+    queries = picked + 0.3 * rng.standard_normal(picked.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def load_corpus(conn, vectors: np.ndarray, doc_index: np.ndarray, document_ids: List[str]) -> List[str]:
+    """벤치마크 테이블 생성 및 데이터 적재"""
+    dim = vectors.shape[1]
+    chunk_ids = [str(uuid.uuid4()) for _ in range(vectors.shape[0])]
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        cur.execute(
+            f"""CREATE TABLE {BENCH_TABLE} (
+                id uuid PRIMARY KEY,
+                document_id uuid NOT NULL,
+                embedding vector({dim})
+            )"""
+        )
+        batch = 1000
+        for start in range(0, vectors.shape[0], batch):
+            values = []
+            for i in range(start, min(start + batch, vectors.shape[0])):
+                literal = to_vector_literal(vectors[i])
+                values.append((chunk_ids[i], document_ids[doc_index[i]], literal))
+            execute_values(
+                cur,
+                f"INSERT INTO {BENCH_TABLE} (id, document_id, embedding) VALUES %s",
+                values,
+                template="(%s, %s, %s::vector)",
+            )
+        cur.execute(f"CREATE INDEX ON {BENCH_TABLE}(document_id)")
+        cur.execute(f"ANALYZE {BENCH_TABLE}")
+    return chunk_ids
+
+
+def exact_top_k(
+    corpus: np.ndarray,
+    doc_index: np.ndarray,
+    query: np.ndarray,
+    allowed_docs: Sequence[int],
+    k: int,
+) -> List[int]:
+    """NumPy로 계산한 필터 적용 정확 top-k (정답 집합)"""
+    mask = np.isin(doc_index, allowed_docs)
+    candidates = np.nonzero(mask)[0]
+    scores = corpus[candidates] @ query
+    order = np.argsort(-scores)[:k]
+    return candidates[order].tolist()
+
+
+def run_queries(
+    conn,
+    queries: np.ndarray,
+    filters: List[List[str]],
+    k: int,
+    session_settings: Dict[str, str],
+) -> Tuple[List[List[str]], List[float]]:
+    """주어진 세션 설정으로 필터 검색을 실행하고 결과 ID와 지연 시간(ms) 반환"""
+    results, latencies = [], []
+    with conn.cursor() as cur:
+        for name, value in session_settings.items():
+            cur.execute("SELECT set_config(%s, %s, false)", (name, value))
+        for query, doc_filter in zip(queries, filters):
+            literal = to_vector_literal(query)
+            started = time.perf_counter()
+            cur.execute(
+                f"""SELECT id FROM {BENCH_TABLE}
+                WHERE document_id = ANY(%s::uuid[])
+                ORDER BY embedding <=> %s::vector
+                LIMIT %s""",
+                (doc_filter, literal, k),
+            )
+            rows = cur.fetchall()
+            latencies.append((time.perf_counter() - started) * 1000)
+            results.append([str(row[0]) for row in rows])
+        for name in session_settings:
+            cur.execute(f"RESET {name}")
+    return results, latencies
+
+
+def run_quantized_queries(
+    conn,
+    queries: np.ndarray,
+    filters: List[List[str]],
+    k: int,
+    quantization: str,
+    candidate_count: int,
+    ef_search: int,
+) -> Tuple[List[List[str]], List[float]]:
+    """압축 인덱스로 후보를 뽑고 원본 embedding으로 재정렬하는 검색 실행"""
+    dim = queries.shape[1]
+    if quantization == "binary":
+        order_expr = f"binary_quantize(embedding)::bit({dim}) <~> binary_quantize(%s::vector)::bit({dim})"
+    else:
+        order_expr = f"embedding::halfvec({dim}) <=> %s::halfvec({dim})"
+
+    results, latencies = [], []
+    with conn.cursor() as cur:
+        cur.execute("SELECT set_config('hnsw.ef_search', %s, false)", (str(max(ef_search, candidate_count)),))
+        cur.execute("SELECT set_config('hnsw.iterative_scan', 'relaxed_order', false)")
+        for query, doc_filter in zip(queries, filters):
+            literal = to_vector_literal(query)
+            started = time.perf_counter()
+            cur.execute(
+                f"""WITH candidates AS MATERIALIZED (
+                    SELECT id, embedding FROM {BENCH_TABLE}
+                    WHERE document_id = ANY(%s::uuid[])
+                    ORDER BY {order_expr}
+                    LIMIT %s
+                )
+                SELECT id FROM candidates
+                ORDER BY embedding <=> %s::vector
+                LIMIT %s""",
+                (doc_filter, literal, candidate_count, literal, k),
+            )
+            rows = cur.fetchall()
+            latencies.append((time.perf_counter() - started) * 1000)
+            results.append([str(row[0]) for row in rows])
+        cur.execute("RESET hnsw.ef_search")
+        cur.execute("RESET hnsw.iterative_scan")
+    return results, latencies
+
+
+def create_index(conn, name: str, definition: str) -> Tuple[float, int]:
+    """인덱스를 생성하고 (생성 시간(s), 인덱스 크기(bytes)) 반환"""
+    with conn.cursor() as cur:
+        started = time.perf_counter()
+        cur.execute(f"CREATE INDEX {name} ON {BENCH_TABLE} {definition}")
+        elapsed = time.perf_counter() - started
+        cur.execute("SELECT pg_relation_size(%s::regclass)", (name,))
+        size = cur.fetchone()[0]
+    return elapsed, size
+
+
+def report_storage(conn) -> None:
+    """임베딩 컬럼별 저장 크기 출력"""
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""SELECT
+                sum(pg_column_size(embedding)),
+                sum(pg_column_size(embedding::halfvec)),
+                sum(pg_column_size(binary_quantize(embedding)))
+            FROM {BENCH_TABLE}"""
+        )
+        full, half, binary = cur.fetchone()
+    print(f"컬럼 크기: vector={full / 1e6:.1f}MB, halfvec={half / 1e6:.1f}MB, bit={binary / 1e6:.1f}MB")
+
+
+def recall_at_k(results: List[List[str]], truth: List[List[str]]) -> float:
+    """정답 집합 대비 평균 재현율"""
+    total = 0.0
+    for got, expected in zip(results, truth):
+        if expected:
+            total += len(set(got) & set(expected)) / len(expected)
+    return total / max(len(truth), 1)
+
+
+def summarize(label: str, latencies: List[float], recall: float) -> None:
+    """결과 한 줄 출력"""
+    p50 = float(np.percentile(latencies, 50))
+    p95 = float(np.percentile(latencies, 95))
+    print(f"{label:<32} recall@k={recall:.4f}  p50={p50:8.2f}ms  p95={p95:8.2f}ms")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="pgvector 정확 검색 vs HNSW 검색 벤치마크")
+    parser.add_argument("--rows", type=int, default=20000, help="합성 청크 수")
+    parser.add_argument("--dim", type=int, default=1536, help="임베딩 차원")
+    parser.add_argument("--documents", type=int, default=200, help="합성 문서 수")
+    parser.add_argument("--clusters", type=int, default=50, help="임베딩 군집 수")
+    parser.add_argument("--queries", type=int, default=100, help="쿼리 수")
+    parser.add_argument("--k", type=int, default=10, help="검색 결과 수 (match_count)")
+    parser.add_argument("--filter-documents", type=int, default=20, help="쿼리당 document_id 필터 크기")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[40, 100, 200], help="비교할 ef_search 값")
+    parser.add_argument("--m", type=int, default=16, help="HNSW m")
+    parser.add_argument("--ef-construction", type=int, default=64, help="HNSW ef_construction")
+    parser.add_argument(
+        "--quantization", nargs="*", choices=["halfvec", "binary"], default=[],
+        help="비교할 양자화 방식 (압축 인덱스 + 전체 정밀도 재정렬)",
+    )
+    parser.add_argument("--rescore-factor", type=int, default=4, help="재정렬 후보 배수 (candidate_count = k * factor)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="벤치마크 테이블을 삭제하지 않음")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"합성 코퍼스 생성: rows={args.rows}, dim={args.dim}, documents={args.documents}")
+    print("=" * 60)
+    corpus, doc_index = make_corpus(args.rows, args.dim, args.documents, args.clusters, args.seed)
+    queries = make_queries(corpus, args.queries, args.seed)
+    document_ids = [str(uuid.uuid4()) for _ in range(args.documents)]
+
+    rng = np.random.default_rng(args.seed + 2)
+    filter_indices = [
+        rng.choice(args.documents, size=min(args.filter_documents, args.documents), replace=False).tolist()
+        for _ in range(args.queries)
+    ]
+    filters = [[document_ids[i] for i in indices] for indices in filter_indices]
+
+    conn = connect()
+    try:
+        started = time.perf_counter()
+        chunk_ids = load_corpus(conn, corpus, doc_index, document_ids)
+        print(f"적재 완료: {time.perf_counter() - started:.1f}s")
+
+        truth = [
+            [chunk_ids[i] for i in exact_top_k(corpus, doc_index, q, indices, args.k)]
+            for q, indices in zip(queries, filter_indices)
+        ]
+
+        # 정확 검색 (인덱스 비활성화 → 순차 스캔)
+        results, latencies = run_queries(
+            conn, queries, filters, args.k,
+            {"enable_indexscan": "off", "enable_bitmapscan": "off"},
+        )
+        summarize("exact (seq scan)", latencies, recall_at_k(results, truth))
+
+        # HNSW 인덱스 생성
+        with_params = f"WITH (m = {args.m}, ef_construction = {args.ef_construction})"
+        elapsed, size = create_index(
+            conn, "bench_embedding_hnsw", f"USING hnsw (embedding vector_cosine_ops) {with_params}",
+        )
+        print(f"HNSW 인덱스 생성 (vector): {elapsed:.1f}s, {size / 1e6:.1f}MB")
+
+        for ef_search in args.ef_search:
+            for iterative_scan in ["off", "relaxed_order"]:
+                results, latencies = run_queries(
+                    conn, queries, filters, args.k,
+                    {"hnsw.ef_search": str(ef_search), "hnsw.iterative_scan": iterative_scan},
+                )
+                summarize(
+                    f"hnsw ef={ef_search} iter={iterative_scan}",
+                    latencies,
+                    recall_at_k(results, truth),
+                )
+
+        # 양자화 인덱스 + 전체 정밀도 재정렬
+        if args.quantization:
+            report_storage(conn)
+        for quantization in args.quantization:
+            if quantization == "binary":
+                definition = (
+                    f"USING hnsw ((binary_quantize(embedding)::bit({args.dim})) bit_hamming_ops) {with_params}"
+                )
+            else:
+                definition = f"USING hnsw ((embedding::halfvec({args.dim})) halfvec_cosine_ops) {with_params}"
+            elapsed, size = create_index(conn, f"bench_embedding_{quantization}", definition)
+            print(f"HNSW 인덱스 생성 ({quantization}): {elapsed:.1f}s, {size / 1e6:.1f}MB")
+
+            candidate_count = args.k * args.rescore_factor
+            for ef_search in args.ef_search:
+                results, latencies = run_quantized_queries(
+                    conn, queries, filters, args.k, quantization, candidate_count, ef_search,
+                )
+                summarize(
+                    f"{quantization} ef={ef_search} cand={candidate_count}",
+                    latencies,
+                    recall_at_k(results, truth),
+                )
+    finally:
+        if not args.keep:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+GoogleTokenVerifier 테스트
+
+RSA 키와 자체 서명 인증서를 만들고 {kid: PEM} 을 돌려주는 fetcher를 주입하여 네트워크 없이 검증합니다.
+실행: ai 디렉터리에서 python -m pytest -q
+"""
+
+import datetime
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("cryptography")
+pytest.importorskip("google.auth")
+
+import google.auth.crypt
+import google.auth.jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from app.services.google_token_verifier import GoogleTokenVerifier
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+
+
+class KeyPair:
+    """서명용 개인 키와 검증용 자체 서명 인증서(PEM)"""
+
+    def __init__(self, kid: str):
+        self.kid = kid
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .sign(key, hashes.SHA256())
+        )
+        self.cert_pem = cert.public_bytes(serialization.Encoding.PEM).decode()
+        private_pem = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        self.signer = google.auth.crypt.RSASigner.from_string(private_pem, key_id=kid)
+
+    def token(self, **overrides) -> str:
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "sub": "1234567890",
+            "email": "user@example.com",
+            "iat": now,
+            "exp": now + 3600,
+        }
+        payload.update(overrides)
+        return google.auth.jwt.encode(self.signer, payload).decode()
+
+
+class FakeFetcher:
+    """주입용 인증서 fetcher (호출 횟수 기록, 실패/지연 재현)"""
+
+    def __init__(self, *keys: KeyPair, max_age: float = 3600.0):
+        self.certs = {key.kid: key.cert_pem for key in keys}
+        self.max_age = max_age
+        self.calls = 0
+        self.error = None
+        self.started = threading.Event()
+        self.release = None  # threading.Event를 지정하면 set될 때까지 응답 지연
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        if self.release is not None:
+            self.release.wait(10)
+        if self.error is not None:
+            raise self.error
+        return dict(self.certs), self.max_age
+
+
+@pytest.fixture(scope="module")
+def key_a():
+    return KeyPair("kid-a")
+
+
+@pytest.fixture(scope="module")
+def key_b():
+    return KeyPair("kid-b")
+
+
+@pytest.fixture
+def fetcher(key_a):
+    return FakeFetcher(key_a)
+
+
+@pytest.fixture
+def verifier(fetcher):
+    return GoogleTokenVerifier(CLIENT_ID, fetcher=fetcher, min_refresh_interval_seconds=30.0)
+
+
+def test_valid_token_accepted(verifier, key_a):
+    claims = verifier.verify(key_a.token())
+    assert claims["sub"] == "1234567890"
+    assert claims["email"] == "user@example.com"
+
+
+def test_accepts_issuer_without_scheme(verifier, key_a):
+    assert verifier.verify(key_a.token(iss="accounts.google.com"))["sub"] == "1234567890"
+
+
+def test_bad_signature_rejected(verifier):
+    # 같은 kid지만 다른 키로 서명
+    forged = KeyPair("kid-a")
+    with pytest.raises(ValueError):
+        verifier.verify(forged.token())
+
+
+def test_wrong_audience_rejected(verifier, key_a):
+    with pytest.raises(ValueError):
+        verifier.verify(key_a.token(aud="other-client.apps.googleusercontent.com"))
+
+
+def test_wrong_issuer_rejected(verifier, key_a):
+    with pytest.raises(ValueError):
+        verifier.verify(key_a.token(iss="https://evil.example.com"))
+
+
+def test_expired_token_rejected(verifier, key_a):
+    now = int(time.time())
+    with pytest.raises(ValueError):
+        verifier.verify(key_a.token(iat=now - 7200, exp=now - 3600))
+
+
+def test_unknown_kid_refreshes_within_rate_limit(verifier, fetcher, key_a, key_b):
+    verifier.verify(key_a.token())
+    assert fetcher.calls == 1
+
+    # 구글이 키를 교체함
+    fetcher.certs[key_b.kid] = key_b.cert_pem
+
+    # 직전 조회 후 min_refresh_interval이 지나지 않았으면 다시 조회하지 않음
+    with pytest.raises(ValueError):
+        verifier.verify(key_b.token())
+    assert fetcher.calls == 1
+
+    verifier._last_attempt_at -= 60
+    assert verifier.verify(key_b.token())["sub"] == "1234567890"
+    assert fetcher.calls == 2
+
+    # 알 수 없는 kid가 반복돼도 간격 안에서는 조회하지 않음
+    with pytest.raises(ValueError):
+        verifier.verify(KeyPair("kid-unknown").token())
+    assert fetcher.calls == 2
+
+
+def test_failed_refresh_keeps_old_keys(verifier, fetcher, key_a):
+    verifier.verify(key_a.token())
+    fetcher.error = ConnectionError("certs endpoint down")
+
+    verifier.refresh(force=True)
+    assert verifier.stats()["fetch_errors"] == 1
+    assert verifier.verify(key_a.token())["sub"] == "1234567890"
+
+    # 캐시가 만료돼도 기존 인증서로 검증하고, 잠시 동안은 재조회하지 않음
+    verifier._expires_at = 0.0
+    assert verifier.verify(key_a.token())["sub"] == "1234567890"
+    calls = fetcher.calls
+    assert verifier.verify(key_a.token())["sub"] == "1234567890"
+    assert fetcher.calls == calls
+
+
+def test_failed_initial_fetch_raises(verifier, fetcher, key_a):
+    fetcher.error = ConnectionError("certs endpoint down")
+    with pytest.raises(ConnectionError):
+        verifier.verify(key_a.token())
+
+
+def _verify_in_thread(verifier, token, timeout=2.0):
+    result = {}
+
+    def run():
+        result["claims"] = verifier.verify(token)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "verify가 백그라운드 갱신을 기다림"
+    return result["claims"]
+
+
+def test_background_refresh_does_not_block_verify(verifier, fetcher, key_a):
+    verifier.verify(key_a.token())
+
+    # 만료가 가까워진 상태에서 느린 갱신
+    verifier._expires_at = time.monotonic() + 10
+    verifier._last_attempt_at -= 60
+    fetcher.release = threading.Event()
+    fetcher.started.clear()
+    try:
+        assert _verify_in_thread(verifier, key_a.token())["sub"] == "1234567890"
+        assert fetcher.started.wait(2)
+
+        # 백그라운드 갱신이 조회 락을 잡고 있는 동안에도 검증은 기존 인증서로 바로 진행됨
+        assert _verify_in_thread(verifier, key_a.token())["sub"] == "1234567890"
+
+        # 진행 중 여부 확인은 조회 락을 기다리지 않고, 갱신은 한 번만 시작됨
+        thread = threading.Thread(target=verifier.refresh_in_background, daemon=True)
+        thread.start()
+        thread.join(2)
+        assert not thread.is_alive(), "refresh_in_background가 조회 락을 기다림"
+        assert verifier.stats()["background_refreshes"] == 1
+    finally:
+        fetcher.release.set()
+
+    deadline = time.monotonic() + 2
+    while verifier._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not verifier._refreshing
+    assert fetcher.calls == 2
+    assert verifier._expires_at > time.monotonic() + 3000
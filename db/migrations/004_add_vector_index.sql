@@ -0,0 +1,104 @@
+-- 마이그레이션: document_chunks.embedding 벡터 인덱스 및 검색 파라미터 조정
+-- 실행 날짜: 2025-01-XX
+-- 설명: document_id 필터 + 코사인 거리 정렬이 순차 스캔으로 처리되지 않도록 ANN 인덱스를 추가하고,
+--       search_document_chunks RPC에서 ef_search / probes / iterative scan 옵션을 받도록 변경
+-- 주의: iterative scan(hnsw.iterative_scan)은 pgvector 0.8.0 이상에서 동작합니다.
+--       pgvector는 hnsw / ivfflat 설정 접두사를 예약하므로 PG15+ 에서 이전 버전에 존재하지 않는
+--       iterative_scan을 설정하면 "invalid configuration parameter" 오류가 발생합니다.
+--       set_vector_iterative_scan()이 이 오류를 무시하므로 이전 버전에서는 일반 HNSW 검색으로 동작합니다.
+
+-- 1. HNSW 인덱스 생성 (코사인 거리)
+-- 운영 중인 테이블에서는 CONCURRENTLY로 생성하여 쓰기 잠금을 피합니다.
+-- (CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 단독으로 실행하세요)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_embedding
+ON document_chunks
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- 1-1. (선택) IVFFlat 인덱스를 사용하는 경우
+-- 데이터가 어느 정도 쌓인 뒤 생성해야 리스트 분할이 의미가 있습니다. (lists ≈ 행 수 / 1000)
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_embedding_ivfflat
+-- ON document_chunks
+-- USING ivfflat (embedding vector_cosine_ops)
+-- WITH (lists = 100);
+
+-- 1-2. document_id 필터용 인덱스 (청크 존재 여부 확인 및 폴백 검색에도 사용)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_document_id
+ON document_chunks(document_id);
+
+-- 2. iterative scan 설정 (pgvector 0.8.0 미만이면 무시)
+-- 트랜잭션 범위(is_local)로 설정하므로 호출한 검색 함수의 트랜잭션에만 적용됩니다.
+-- 이후 마이그레이션의 검색 RPC들도 이 함수를 사용합니다.
+CREATE OR REPLACE FUNCTION set_vector_iterative_scan(mode text)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  BEGIN
+    PERFORM set_config('hnsw.iterative_scan', mode, true);
+    PERFORM set_config('ivfflat.iterative_scan', CASE WHEN mode = 'off' THEN 'off' ELSE 'relaxed_order' END, true);
+  EXCEPTION WHEN undefined_object OR invalid_parameter_value OR invalid_name THEN
+    -- pgvector < 0.8.0: 설정이 없으므로 일반 인덱스 검색으로 동작
+    NULL;
+  END;
+END;
+$$;
+
+-- 3. 기존 검색 함수 제거 (시그니처가 변경되므로 CREATE OR REPLACE로 대체 불가)
+DROP FUNCTION IF EXISTS search_document_chunks(vector, uuid[], int);
+
+-- 4. 검색 파라미터를 받는 벡터 검색 RPC 함수
+-- ef_search: HNSW 검색 후보 수 (클수록 정확하지만 느림, match_count 이상 권장)
+-- probes: IVFFlat 인덱스 사용 시 탐색할 리스트 수
+-- iterative_scan: 'off' | 'relaxed_order' | 'strict_order'
+--   document_id 필터로 후보가 걸러져도 match_count개를 채울 때까지 인덱스를 계속 탐색
+CREATE OR REPLACE FUNCTION search_document_chunks(
+  query_embedding vector(1536),
+  document_ids uuid[],
+  match_count int DEFAULT 10,
+  ef_search int DEFAULT 100,
+  probes int DEFAULT 10,
+  iterative_scan text DEFAULT 'relaxed_order'
+)
+RETURNS TABLE (
+  id uuid,
+  document_id uuid,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  -- 트랜잭션 범위(SET LOCAL)로만 적용되므로 다른 요청에 영향 없음
+  PERFORM set_config('hnsw.ef_search', GREATEST(ef_search, match_count)::text, true);
+  PERFORM set_config('ivfflat.probes', probes::text, true);
+  PERFORM set_vector_iterative_scan(iterative_scan);
+
+  -- relaxed_order는 결과 순서가 약간 어긋날 수 있으므로 후보를 구체화한 뒤 다시 정렬
+  RETURN QUERY
+  WITH candidates AS MATERIALIZED (
+    SELECT
+      dc.id,
+      dc.document_id,
+      dc.content,
+      dc.metadata,
+      dc.embedding <=> query_embedding AS distance
+    FROM document_chunks dc
+    WHERE dc.document_id = ANY(document_ids)
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT match_count
+  )
+  SELECT
+    c.id,
+    c.document_id,
+    c.content,
+    c.metadata,
+    1 - c.distance AS similarity
+  FROM candidates c
+  ORDER BY c.distance;
+END;
+$$;
+
+-- 5. 권한 설정 (필요시)
+-- GRANT EXECUTE ON FUNCTION search_document_chunks TO authenticated;
@@ -0,0 +1,129 @@
+-- 마이그레이션: document_chunks 전문 검색 인덱스 및 하이브리드(어휘 + 벡터) 검색 RPC
+-- 실행 날짜: 2025-01-XX
+-- 설명: 법령 번호, 제품명, 성분명처럼 정확한 문자열 일치가 중요한 질문에서 임베딩 유사도만으로는
+--       순위가 낮게 나오는 문제를 보완하기 위해, 어휘 검색과 벡터 검색 순위를
+--       Reciprocal Rank Fusion(RRF)으로 DB 안에서 한 번에 결합
+-- 주의: PostgreSQL 기본 텍스트 검색 설정에는 한국어 형태소 분석기가 없으므로
+--       'simple' 설정(공백 단위 토큰) + pg_trgm(부분 문자열 유사도)을 함께 사용합니다.
+
+-- 1. 확장 기능
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 2. tsvector 생성 컬럼 (content 변경 시 자동 갱신)
+ALTER TABLE document_chunks
+ADD COLUMN IF NOT EXISTS content_tsv tsvector
+GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED;
+
+-- 3. 전문 검색 / 트라이그램 인덱스
+-- (CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 단독으로 실행하세요)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_content_tsv
+ON document_chunks USING gin (content_tsv);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_content_trgm
+ON document_chunks USING gin (content gin_trgm_ops);
+
+-- 4. 하이브리드 검색 RPC 함수
+-- vector_hits: 코사인 거리 순위 상위 candidate_count개
+-- lexical_hits: 전문 검색(OR 결합) 또는 트라이그램 단어 유사도로 일치하는 청크의 어휘 점수 순위 상위 candidate_count개
+-- 최종 점수: rrf_score = 1/(rrf_k + vector_rank) + 1/(rrf_k + lexical_rank)
+-- similarity 컬럼은 기존 search_document_chunks와 같은 코사인 유사도를 유지합니다.
+-- lexical_score(0~1): 어휘 일치의 강도 = greatest(질문 단어 중 청크에 있는 단어 비율, 트라이그램 단어 유사도)
+--   OR 결합과 트라이그램 조건 때문에 흔한 단어 하나만 겹쳐도 lexical_rank가 생기므로,
+--   관련도 게이트 예외는 lexical_rank가 아니라 이 점수로 판단합니다.
+-- (반환 컬럼이 바뀌었으므로 이전 정의를 먼저 제거)
+DROP FUNCTION IF EXISTS hybrid_search_document_chunks(text, vector, uuid[], int, int, int, int, text);
+
+CREATE OR REPLACE FUNCTION hybrid_search_document_chunks(
+  query_text text,
+  query_embedding vector(1536),
+  document_ids uuid[],
+  match_count int DEFAULT 10,
+  candidate_count int DEFAULT 40,
+  rrf_k int DEFAULT 60,
+  ef_search int DEFAULT 100,
+  iterative_scan text DEFAULT 'relaxed_order'
+)
+RETURNS TABLE (
+  id uuid,
+  document_id uuid,
+  content text,
+  metadata jsonb,
+  similarity float,
+  vector_rank int,
+  lexical_rank int,
+  rrf_score float,
+  lexical_score float
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  -- 긴 자연어 질문에서 모든 단어가 일치해야 하는 AND 조건을 피하기 위해 OR로 결합
+  lexical_query tsquery := nullif(
+    replace(plainto_tsquery('simple', query_text)::text, ' & ', ' | '),
+    ''
+  )::tsquery;
+  query_lexemes text[] := tsvector_to_array(to_tsvector('simple', query_text));
+BEGIN
+  PERFORM set_config('hnsw.ef_search', GREATEST(ef_search, candidate_count)::text, true);
+  PERFORM set_vector_iterative_scan(iterative_scan);  -- 004 참고 (pgvector 0.8.0 미만이면 무시)
+
+  RETURN QUERY
+  WITH vector_hits AS MATERIALIZED (
+    SELECT
+      dc.id,
+      (ROW_NUMBER() OVER (ORDER BY dc.embedding <=> query_embedding))::int AS rank
+    FROM document_chunks dc
+    WHERE dc.document_id = ANY(document_ids)
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT candidate_count
+  ),
+  lexical_hits AS MATERIALIZED (
+    SELECT
+      scored.id,
+      (ROW_NUMBER() OVER (ORDER BY scored.score DESC))::int AS rank
+    FROM (
+      SELECT
+        dc.id,
+        coalesce(ts_rank_cd(dc.content_tsv, lexical_query), 0)
+          + word_similarity(query_text, dc.content) AS score
+      FROM document_chunks dc
+      WHERE dc.document_id = ANY(document_ids)
+        AND (dc.content_tsv @@ lexical_query OR query_text <% dc.content)
+    ) scored
+    ORDER BY scored.score DESC
+    LIMIT candidate_count
+  ),
+  fused AS (
+    SELECT
+      coalesce(v.id, l.id) AS id,
+      v.rank AS vector_rank,
+      l.rank AS lexical_rank,
+      coalesce(1.0 / (rrf_k + v.rank), 0) + coalesce(1.0 / (rrf_k + l.rank), 0) AS rrf_score
+    FROM vector_hits v
+    FULL OUTER JOIN lexical_hits l ON v.id = l.id
+  )
+  SELECT
+    dc.id,
+    dc.document_id,
+    dc.content,
+    dc.metadata,
+    1 - (dc.embedding <=> query_embedding) AS similarity,
+    f.vector_rank,
+    f.lexical_rank,
+    f.rrf_score::float,
+    CASE WHEN f.lexical_rank IS NULL THEN NULL ELSE greatest(
+      (
+        SELECT count(*) FROM unnest(query_lexemes) AS q(lexeme)
+        WHERE q.lexeme = ANY(tsvector_to_array(dc.content_tsv))
+      )::float / nullif(cardinality(query_lexemes), 0),
+      word_similarity(query_text, dc.content)::float
+    ) END
+  FROM fused f
+  JOIN document_chunks dc ON dc.id = f.id
+  ORDER BY f.rrf_score DESC
+  LIMIT match_count;
+END;
+$$;
+
+-- 5. 권한 설정 (필요시)
+-- GRANT EXECUTE ON FUNCTION hybrid_search_document_chunks TO authenticated;
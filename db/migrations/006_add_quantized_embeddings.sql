@@ -0,0 +1,107 @@
+-- 마이그레이션: 양자화 임베딩(halfvec / binary) 저장 및 전체 정밀도 재정렬 검색
+-- 실행 날짜: 2025-01-XX
+-- 설명: float32 vector(1536) HNSW 인덱스 대신 압축된 표현(halfvec: 2배, binary: 32배)에 인덱스를 만들고,
+--       압축 인덱스로 후보를 넉넉히 뽑은 뒤 원본 embedding으로 다시 정렬하여 재현율을 유지
+-- 주의: halfvec / binary_quantize는 pgvector 0.7.0 이상이 필요합니다.
+--       압축 표현은 별도 컬럼에 저장하지 않고 식 인덱스로만 만들며(테이블 크기 변화 없음),
+--       원본 embedding 컬럼은 재정렬과 폴백 검색을 위해 유지합니다.
+--       실제 저장 공간 절감은 양자화 검색으로 전환한 뒤 float32 HNSW 인덱스를 제거(4번)할 때 생깁니다.
+
+-- 1. 이전 버전 마이그레이션 정리 (embedding_half 컬럼 + 동기화 트리거를 사용하던 경우)
+DROP TRIGGER IF EXISTS trg_document_chunks_embedding_half ON document_chunks;
+DROP FUNCTION IF EXISTS sync_document_chunk_embedding_half();
+ALTER TABLE document_chunks DROP COLUMN IF EXISTS embedding_half;  -- 컬럼 인덱스도 함께 제거됨
+
+-- 2. 압축 식 인덱스 생성 (검색 쿼리도 같은 캐스트를 사용해야 인덱스가 사용됨)
+-- (CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 단독으로 실행하세요)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_embedding_half
+ON document_chunks
+USING hnsw ((embedding::halfvec(1536)) halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- 이진 양자화 인덱스 (컬럼 추가 없이 식 인덱스로 생성)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_embedding_binary
+ON document_chunks
+USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- 3. 양자화 검색 + 전체 정밀도 재정렬 RPC 함수
+-- quantization: 'halfvec' | 'binary'
+-- candidate_count: 압축 인덱스에서 뽑을 후보 수 (match_count의 수 배 권장, binary는 더 크게)
+CREATE OR REPLACE FUNCTION search_document_chunks_quantized(
+  query_embedding vector(1536),
+  document_ids uuid[],
+  match_count int DEFAULT 10,
+  candidate_count int DEFAULT 40,
+  quantization text DEFAULT 'halfvec',
+  ef_search int DEFAULT 100,
+  iterative_scan text DEFAULT 'relaxed_order'
+)
+RETURNS TABLE (
+  id uuid,
+  document_id uuid,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  PERFORM set_config('hnsw.ef_search', GREATEST(ef_search, candidate_count)::text, true);
+  PERFORM set_vector_iterative_scan(iterative_scan);  -- 004 참고 (pgvector 0.8.0 미만이면 무시)
+
+  IF quantization = 'binary' THEN
+    RETURN QUERY
+    WITH candidates AS MATERIALIZED (
+      SELECT dc.id
+      FROM document_chunks dc
+      WHERE dc.document_id = ANY(document_ids)
+      ORDER BY binary_quantize(dc.embedding)::bit(1536) <~> binary_quantize(query_embedding)::bit(1536)
+      LIMIT candidate_count
+    )
+    SELECT
+      dc.id,
+      dc.document_id,
+      dc.content,
+      dc.metadata,
+      1 - (dc.embedding <=> query_embedding) AS similarity
+    FROM candidates c
+    JOIN document_chunks dc ON dc.id = c.id
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT match_count;
+  ELSE
+    RETURN QUERY
+    WITH candidates AS MATERIALIZED (
+      SELECT dc.id
+      FROM document_chunks dc
+      WHERE dc.document_id = ANY(document_ids)
+      ORDER BY dc.embedding::halfvec(1536) <=> query_embedding::halfvec(1536)
+      LIMIT candidate_count
+    )
+    SELECT
+      dc.id,
+      dc.document_id,
+      dc.content,
+      dc.metadata,
+      1 - (dc.embedding <=> query_embedding) AS similarity
+    FROM candidates c
+    JOIN document_chunks dc ON dc.id = c.id
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT match_count;
+  END IF;
+END;
+$$;
+
+-- 4. 전체 정밀도 HNSW 인덱스 제거 (저장 공간 절감 단계)
+-- 압축 인덱스만 남기면 벡터 인덱스 크기가 halfvec은 약 1/2, binary는 약 1/32로 줄어듭니다.
+-- 양자화 검색(vector_quantization=halfvec|binary)으로 전환하고 재현율을 확인한 뒤 실행하세요.
+-- (이후 vector_quantization=none으로 되돌리면 순차 스캔이 되므로 주의)
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_document_chunks_embedding;
+
+-- 5. 테이블 크기 축소 (선택, 되돌릴 수 없음)
+-- 재정렬을 halfvec 기준으로 해도 충분하다면 embedding 컬럼을 halfvec로 바꿔 행 크기를 절반으로 줄일 수 있습니다.
+-- 이 경우 search_document_chunks / insert_document_chunk 함수의 타입도 함께 변경해야 합니다.
+-- ALTER TABLE document_chunks ALTER COLUMN embedding TYPE halfvec(1536) USING embedding::halfvec(1536);
+
+-- 6. 권한 설정 (필요시)
+-- GRANT EXECUTE ON FUNCTION search_document_chunks_quantized TO authenticated;
@@ -0,0 +1,193 @@
+-- 마이그레이션: 축소 차원 임베딩 저장 및 2단계(축소 차원 ANN → 전체 차원 재정렬) 검색
+-- 실행 날짜: 2025-01-XX
+-- 설명: text-embedding-3 계열 임베딩은 앞쪽 N차원만 잘라 L2 정규화해도 의미를 유지하므로
+--       (OpenAI API의 dimensions 파라미터와 같은 방식) 256/512차원 벡터로 1차 ANN 검색을 하고
+--       저장된 1536차원 embedding으로 재정렬합니다.
+--       차원 수는 컬럼 타입에 고정하지 않고 청크별 embedding_short_dims 컬럼으로 관리합니다.
+-- 주의: subvector / l2_normalize는 pgvector 0.7.0 이상이 필요합니다.
+--       지원 차원은 부분 인덱스가 있는 256 / 512뿐입니다 (EMBEDDING_SHORT_DIMS 설정도 같은 값만 허용).
+--       검색 대상 문서 중 설정한 차원으로 채워지지 않은 청크가 있으면 전체 차원 검색으로 처리하므로
+--       백필이 끝나기 전이나 차원 설정을 바꾼 직후에도 결과에서 청크가 빠지지 않습니다.
+
+-- 1. 축소 차원 임베딩 컬럼 (차원 수를 타입에 고정하지 않음)
+ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS embedding_short vector;
+ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS embedding_short_dims smallint;
+
+-- 2. 기존 행 백필 (배치 단위, 반복 실행 가능)
+-- 한 번 호출할 때 p_batch_size개 행만 갱신하고 갱신한 행 수를 반환합니다.
+-- 잠금 시간을 짧게 유지하도록 각 호출을 별도 트랜잭션으로 0을 반환할 때까지 반복하세요.
+--   SELECT backfill_document_chunk_short_embeddings(512);  -- EMBEDDING_SHORT_DIMS 설정값
+-- 차원 설정을 바꾼 경우에도 같은 방법으로 다시 채웁니다.
+CREATE OR REPLACE FUNCTION backfill_document_chunk_short_embeddings(
+  p_dims int,
+  p_batch_size int DEFAULT 5000
+)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  updated_count int;
+BEGIN
+  IF p_dims NOT IN (256, 512) THEN
+    RAISE EXCEPTION 'unsupported short_dims: %', p_dims;
+  END IF;
+
+  UPDATE document_chunks
+  SET
+    embedding_short = l2_normalize(subvector(embedding, 1, p_dims)),
+    embedding_short_dims = p_dims
+  WHERE id IN (
+    SELECT dc.id FROM document_chunks dc
+    WHERE dc.embedding IS NOT NULL
+      AND dc.embedding_short_dims IS DISTINCT FROM p_dims
+    LIMIT p_batch_size
+    FOR UPDATE SKIP LOCKED
+  );
+
+  GET DIAGNOSTICS updated_count = ROW_COUNT;
+  RETURN updated_count;
+END;
+$$;
+
+-- 3. 차원별 부분 식 인덱스 (HNSW는 고정 차원이 필요하므로 차원마다 하나씩 생성)
+-- (CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 단독으로 실행하세요)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_embedding_short_512
+ON document_chunks
+USING hnsw ((embedding_short::vector(512)) vector_cosine_ops)
+WHERE embedding_short_dims = 512;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_chunks_embedding_short_256
+ON document_chunks
+USING hnsw ((embedding_short::vector(256)) vector_cosine_ops)
+WHERE embedding_short_dims = 256;
+
+-- 4. 청크 저장 RPC 함수에 축소 차원 임베딩 파라미터 추가
+-- 기본값이 있으므로 기존 호출(p_embedding_short 없이)도 그대로 동작합니다.
+DROP FUNCTION IF EXISTS insert_document_chunk(uuid, text, vector, jsonb);
+
+CREATE OR REPLACE FUNCTION insert_document_chunk(
+  p_document_id uuid,
+  p_content text,
+  p_embedding vector(1536),
+  p_metadata jsonb DEFAULT '{}'::jsonb,
+  p_embedding_short vector DEFAULT NULL,
+  p_embedding_short_dims smallint DEFAULT NULL
+)
+RETURNS uuid
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  chunk_id uuid;
+BEGIN
+  INSERT INTO document_chunks (
+    id,
+    document_id,
+    content,
+    embedding,
+    metadata,
+    embedding_short,
+    embedding_short_dims
+  )
+  VALUES (
+    gen_random_uuid(),
+    p_document_id,
+    p_content,
+    p_embedding,
+    p_metadata,
+    p_embedding_short,
+    CASE WHEN p_embedding_short IS NULL THEN NULL ELSE coalesce(p_embedding_short_dims, vector_dims(p_embedding_short)) END
+  )
+  RETURNING id INTO chunk_id;
+
+  RETURN chunk_id;
+END;
+$$;
+
+-- 5. 2단계 검색 RPC 함수
+-- short_dims 차원 부분 인덱스로 candidate_count개 후보를 뽑고, 1536차원 embedding으로 재정렬
+-- 인덱스 식과 같은 타입 캐스트(vector(N))가 필요하므로 동적 SQL 사용
+-- 대상 문서에 short_dims로 채워지지 않은 청크가 하나라도 있으면 (백필 전, 차원 변경 직후)
+-- 부분 인덱스 검색에서 해당 청크가 빠지므로 전체 차원 검색으로 처리
+CREATE OR REPLACE FUNCTION search_document_chunks_two_stage(
+  query_embedding vector(1536),
+  query_embedding_short vector,
+  short_dims int,
+  document_ids uuid[],
+  match_count int DEFAULT 10,
+  candidate_count int DEFAULT 40,
+  ef_search int DEFAULT 100,
+  iterative_scan text DEFAULT 'relaxed_order'
+)
+RETURNS TABLE (
+  id uuid,
+  document_id uuid,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF short_dims NOT IN (256, 512) THEN
+    RAISE EXCEPTION 'unsupported short_dims: %', short_dims;
+  END IF;
+
+  PERFORM set_config('hnsw.ef_search', GREATEST(ef_search, candidate_count)::text, true);
+  PERFORM set_vector_iterative_scan(iterative_scan);  -- 004 참고 (pgvector 0.8.0 미만이면 무시)
+
+  -- document_id 인덱스로 확인 (일부만 채워진 경우 전체 차원 검색)
+  IF EXISTS (
+    SELECT 1 FROM document_chunks dc
+    WHERE dc.document_id = ANY(document_ids)
+      AND dc.embedding IS NOT NULL
+      AND dc.embedding_short_dims IS DISTINCT FROM short_dims
+  ) THEN
+    RETURN QUERY
+    WITH candidates AS MATERIALIZED (
+      SELECT dc.id, dc.embedding <=> query_embedding AS distance
+      FROM document_chunks dc
+      WHERE dc.document_id = ANY(document_ids)
+      ORDER BY dc.embedding <=> query_embedding
+      LIMIT match_count
+    )
+    SELECT
+      dc.id,
+      dc.document_id,
+      dc.content,
+      dc.metadata,
+      (1 - c.distance)::float AS similarity
+    FROM candidates c
+    JOIN document_chunks dc ON dc.id = c.id
+    ORDER BY c.distance;
+    RETURN;
+  END IF;
+
+  RETURN QUERY EXECUTE format(
+    $sql$
+    WITH candidates AS MATERIALIZED (
+      SELECT dc.id
+      FROM document_chunks dc
+      WHERE dc.document_id = ANY($2)
+        AND dc.embedding_short_dims = %1$s
+      ORDER BY dc.embedding_short::vector(%1$s) <=> $1::vector(%1$s)
+      LIMIT $3
+    )
+    SELECT
+      dc.id,
+      dc.document_id,
+      dc.content,
+      dc.metadata,
+      (1 - (dc.embedding <=> $4))::float AS similarity
+    FROM candidates c
+    JOIN document_chunks dc ON dc.id = c.id
+    ORDER BY dc.embedding <=> $4
+    LIMIT $5
+    $sql$,
+    short_dims
+  )
+  USING query_embedding_short, document_ids, candidate_count, query_embedding, match_count;
+END;
+$$;
+
+-- 6. 권한 설정 (필요시)
+-- GRANT EXECUTE ON FUNCTION search_document_chunks_two_stage TO authenticated;
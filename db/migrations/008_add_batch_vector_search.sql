@@ -0,0 +1,114 @@
+-- 마이그레이션: 여러 질문을 한 번에 검색하는 배치 벡터 검색 RPC
+-- 실행 날짜: 2025-01-XX
+-- 설명: /documents/query/batch 요청에서 질문마다 search_document_chunks를 호출하지 않고
+--       질문 임베딩 배열을 한 번에 받아 LATERAL 조인으로 질문별 상위 match_count개를 반환합니다.
+--       query_embeddings는 PostgREST에서 vector[]를 직접 받을 수 없으므로 jsonb 배열([[...], [...]])로 받습니다.
+--       단일 /query와 같은 이웃과 비용이 되도록 단일 검색의 설정을 그대로 따릅니다.
+--       - quantization=halfvec|binary: 압축 식 인덱스로 후보 추출 후 전체 정밀도 재정렬 (006과 같은 식)
+--       - short_dims=256|512: 축소 차원 부분 인덱스로 후보 추출 후 전체 차원 재정렬 (007과 같은 방식,
+--         대상 문서에 해당 차원으로 채워지지 않은 청크가 있으면 전체 차원 검색)
+--       인덱스 식과 같은 캐스트가 필요하므로 동적 SQL 사용
+
+-- 이전 시그니처 제거 (파라미터가 추가되므로 CREATE OR REPLACE로 대체 불가)
+DROP FUNCTION IF EXISTS search_document_chunks_batch(jsonb, uuid[], int, int, text);
+
+CREATE OR REPLACE FUNCTION search_document_chunks_batch(
+  query_embeddings jsonb,
+  document_ids uuid[],
+  match_count int DEFAULT 10,
+  ef_search int DEFAULT 100,
+  iterative_scan text DEFAULT 'relaxed_order',
+  quantization text DEFAULT 'none',
+  candidate_count int DEFAULT NULL,
+  query_embeddings_short jsonb DEFAULT NULL,
+  short_dims int DEFAULT NULL
+)
+RETURNS TABLE (
+  query_index int,
+  id uuid,
+  document_id uuid,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_candidates int := GREATEST(coalesce(candidate_count, match_count), match_count);
+  candidate_filter text := '';
+  candidate_order text := 'c.embedding <=> q.embedding';
+BEGIN
+  IF short_dims IS NOT NULL AND short_dims NOT IN (256, 512) THEN
+    RAISE EXCEPTION 'unsupported short_dims: %', short_dims;
+  END IF;
+
+  -- 트랜잭션 범위(SET LOCAL)로만 적용되므로 다른 요청에 영향 없음
+  PERFORM set_config('hnsw.ef_search', GREATEST(ef_search, n_candidates)::text, true);
+  PERFORM set_vector_iterative_scan(iterative_scan);  -- 004 참고 (pgvector 0.8.0 미만이면 무시)
+
+  IF short_dims IS NOT NULL AND query_embeddings_short IS NOT NULL AND NOT EXISTS (
+    SELECT 1 FROM document_chunks dc
+    WHERE dc.document_id = ANY(document_ids)
+      AND dc.embedding IS NOT NULL
+      AND dc.embedding_short_dims IS DISTINCT FROM short_dims
+  ) THEN
+    candidate_filter := format('AND c.embedding_short_dims = %s', short_dims);
+    candidate_order := format('c.embedding_short::vector(%1$s) <=> q.embedding_short::vector(%1$s)', short_dims);
+  ELSIF short_dims IS NOT NULL THEN
+    -- 축소 차원이 일부만 채워진 경우 전체 차원 검색 (후보 = 최종 결과)
+    n_candidates := match_count;
+  ELSIF quantization = 'halfvec' THEN
+    candidate_order := 'c.embedding::halfvec(1536) <=> q.embedding::halfvec(1536)';
+  ELSIF quantization = 'binary' THEN
+    candidate_order := 'binary_quantize(c.embedding)::bit(1536) <~> binary_quantize(q.embedding)::bit(1536)';
+  ELSE
+    n_candidates := match_count;
+  END IF;
+
+  -- 질문별로 후보를 뽑은 뒤 전체 정밀도 embedding으로 재정렬 (전체 정밀도 검색이면 후보가 곧 결과)
+  RETURN QUERY EXECUTE format(
+    $sql$
+    WITH queries AS MATERIALIZED (
+      SELECT
+        (q.ordinality - 1)::int AS query_index,
+        (q.value::text)::vector(1536) AS embedding,
+        CASE WHEN $5 IS NULL THEN NULL ELSE (($5 -> (q.ordinality - 1)::int)::text)::vector END AS embedding_short
+      FROM jsonb_array_elements($1) WITH ORDINALITY AS q(value, ordinality)
+    )
+    SELECT
+      q.query_index,
+      m.id,
+      m.document_id,
+      m.content,
+      m.metadata,
+      (1 - m.distance)::float AS similarity
+    FROM queries q
+    CROSS JOIN LATERAL (
+      SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        dc.metadata,
+        dc.embedding <=> q.embedding AS distance
+      FROM (
+        SELECT c.id
+        FROM document_chunks c
+        WHERE c.document_id = ANY($2) %1$s
+        ORDER BY %2$s
+        LIMIT $3
+      ) candidates
+      JOIN document_chunks dc ON dc.id = candidates.id
+      ORDER BY dc.embedding <=> q.embedding
+      LIMIT $4
+    ) m
+    ORDER BY q.query_index, m.distance
+    $sql$,
+    candidate_filter,
+    candidate_order
+  )
+  USING query_embeddings, document_ids, n_candidates, match_count, query_embeddings_short;
+END;
+$$;
+
+-- 권한 설정 (필요시)
+-- GRANT EXECUTE ON FUNCTION search_document_chunks_batch TO authenticated;
@@ -0,0 +1,97 @@
+-- 마이그레이션: 폴더 목록 집계 RPC 및 '최근 문서함' 생성 RPC
+-- 실행 날짜: 2025-01-XX
+-- 설명: GET /documents/folders가 폴더마다 문서 수를 count 쿼리로 따로 조회(N+1)하고,
+--       조회할 때마다 '최근 문서함' 생성과 루트 문서 이동(UPDATE)까지 수행하던 문제를 해결합니다.
+--       - list_folders_with_counts: 폴더 목록과 문서 수를 한 번의 왕복으로 반환 (읽기 전용)
+--       - ensure_recent_folder: '최근 문서함'이 없으면 만들고 루트 문서를 옮기는 멱등 함수
+--         (업로드 경로와 폴더가 처음 없을 때만 호출)
+
+-- 1. 폴더별 문서 수 집계용 인덱스
+-- (CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 단독으로 실행하세요)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_folder_active
+ON documents (user_id, folder_id)
+WHERE deleted_at IS NULL;
+
+-- 2. 폴더 목록 + 문서 수 ('최근 문서함'을 맨 앞, 나머지는 생성일 순)
+CREATE OR REPLACE FUNCTION list_folders_with_counts(p_user_id uuid)
+RETURNS TABLE (
+  id uuid,
+  name text,
+  parent_id uuid,
+  created_at timestamptz,
+  document_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    f.id,
+    f.name::text,
+    f.parent_id,
+    f.created_at,
+    count(d.id) AS document_count
+  FROM folders f
+  LEFT JOIN documents d
+    ON d.folder_id = f.id
+   AND d.user_id = p_user_id
+   AND d.deleted_at IS NULL
+  WHERE f.user_id = p_user_id
+    AND f.deleted_at IS NULL
+  GROUP BY f.id, f.name, f.parent_id, f.created_at
+  ORDER BY (f.name = '최근 문서함') DESC, f.created_at ASC;
+$$;
+
+-- 3. '최근 문서함' 보장 (멱등)
+-- 같은 사용자의 동시 호출은 advisory lock으로 직렬화하여 폴더가 중복 생성되지 않게 합니다.
+CREATE OR REPLACE FUNCTION ensure_recent_folder(p_user_id uuid)
+RETURNS uuid
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_folder_id uuid;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('recent_folder:' || p_user_id::text));
+
+  SELECT f.id INTO v_folder_id
+  FROM folders f
+  WHERE f.user_id = p_user_id
+    AND f.name = '최근 문서함'
+    AND f.deleted_at IS NULL
+  ORDER BY f.created_at ASC
+  LIMIT 1;
+
+  IF v_folder_id IS NULL THEN
+    INSERT INTO folders (user_id, name, parent_id, created_at, updated_at)
+    VALUES (p_user_id, '최근 문서함', NULL, now(), now())
+    RETURNING folders.id INTO v_folder_id;
+  END IF;
+
+  -- 폴더 없이 저장된 기존 루트 문서를 '최근 문서함'으로 이동
+  UPDATE documents
+  SET folder_id = v_folder_id, updated_at = now()
+  WHERE user_id = p_user_id
+    AND folder_id IS NULL
+    AND deleted_at IS NULL;
+
+  RETURN v_folder_id;
+END;
+$$;
+
+-- 4. 기존 데이터 일괄 정리 (한 번만 실행)
+-- 이미 '최근 문서함'이 있는 사용자의 루트 문서를 가장 오래된 '최근 문서함'으로 이동
+UPDATE documents d
+SET folder_id = r.folder_id, updated_at = now()
+FROM (
+  SELECT DISTINCT ON (f.user_id) f.user_id, f.id AS folder_id
+  FROM folders f
+  WHERE f.name = '최근 문서함'
+    AND f.deleted_at IS NULL
+  ORDER BY f.user_id, f.created_at ASC
+) r
+WHERE d.user_id = r.user_id
+  AND d.folder_id IS NULL
+  AND d.deleted_at IS NULL;
+
+-- 권한 설정 (필요시)
+-- GRANT EXECUTE ON FUNCTION list_folders_with_counts TO authenticated;
+-- GRANT EXECUTE ON FUNCTION ensure_recent_folder TO authenticated;
@@ -0,0 +1,22 @@
+-- 마이그레이션: 문서 목록 키셋(커서) 페이지네이션 인덱스
+-- 실행 날짜: 2025-01-XX
+-- 설명: GET /documents/list가 (created_at, id) 내림차순 키셋 페이지네이션으로 바뀌면서
+--       사용자/폴더/상태 필터와 정렬을 한 번에 처리할 수 있는 복합 인덱스를 추가합니다.
+--       커서 조건(created_at < c OR (created_at = c AND id < i))과 LIMIT이 인덱스 순서대로
+--       필요한 행만 읽으므로 문서 수와 무관하게 페이지 조회 비용이 일정합니다.
+-- (CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 단독으로 실행하세요)
+
+-- 1. 전체 문서 목록 (user_id + 최신순)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_created_id
+ON documents (user_id, created_at DESC, id DESC)
+WHERE deleted_at IS NULL;
+
+-- 2. 폴더별 문서 목록 (user_id + folder_id + 최신순)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_folder_created_id
+ON documents (user_id, folder_id, created_at DESC, id DESC)
+WHERE deleted_at IS NULL;
+
+-- 3. 상태 필터 문서 목록 (예: 처리 중/실패 문서만)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_status_created_id
+ON documents (user_id, status, created_at DESC, id DESC)
+WHERE deleted_at IS NULL;
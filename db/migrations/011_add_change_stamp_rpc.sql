@@ -0,0 +1,31 @@
+-- 마이그레이션: 사용자별 변경 스탬프 RPC 및 변경분 동기화 인덱스
+-- 실행 날짜: 2025-01-XX
+-- 설명: 문서 목록 / 폴더 목록 / 문서 상태 폴링에 ETag(If-None-Match → 304)와
+--       변경분 동기화(since)를 적용하기 위해 사용자의 최신 updated_at을 한 번에 조회합니다.
+--       문서 업로드, 상태 변경, 소프트 삭제는 모두 updated_at을 갱신하므로
+--       최신 updated_at이 같으면 목록도 바뀌지 않은 것으로 판단합니다.
+-- (CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 단독으로 실행하세요)
+
+-- 1. 최신 updated_at 조회 / 변경분 조회용 인덱스 (소프트 삭제된 행 포함)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_user_updated_id
+ON documents (user_id, updated_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_folders_user_updated
+ON folders (user_id, updated_at);
+
+-- 2. 변경 스탬프 (인덱스 끝 행 두 개만 읽음)
+CREATE OR REPLACE FUNCTION get_user_change_stamp(p_user_id uuid)
+RETURNS TABLE (
+  documents_updated_at timestamptz,
+  folders_updated_at timestamptz
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    (SELECT max(d.updated_at) FROM documents d WHERE d.user_id = p_user_id),
+    (SELECT max(f.updated_at) FROM folders f WHERE f.user_id = p_user_id);
+$$;
+
+-- 권한 설정 (필요시)
+-- GRANT EXECUTE ON FUNCTION get_user_change_stamp TO authenticated;
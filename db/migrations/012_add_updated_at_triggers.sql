@@ -0,0 +1,34 @@
+-- 마이그레이션: updated_at을 DB 시계로만 기록
+-- 실행 날짜: 2025-01-XX
+-- 설명: 변경 스탬프(011)와 변경분 동기화(since)는 사용자의 최신 updated_at에 의존하므로
+--       updated_at이 단조 증가해야 합니다. 애플리케이션이 보내던 timezone 없는 로컬 시각
+--       (datetime.now())과 RPC의 now()가 섞이면 서버 timezone이 UTC가 아닐 때 순서가 뒤집혀
+--       잘못된 304 응답이나 누락된 변경분이 생길 수 있으므로, 트리거로 항상 now()를 기록합니다.
+--       (애플리케이션이 보낸 updated_at 값은 무시됩니다)
+-- 주의: now()는 트랜잭션 시작 시각이므로 긴 쓰기 트랜잭션은 이미 발급된 동기화 토큰보다
+--       이른 updated_at으로 나중에 커밋될 수 있습니다. API는 동기화 토큰을
+--       sync_token_lag_seconds만큼 과거 위치로 발급하여 이 구간을 다시 조회합니다. (change_stamps.py)
+
+-- 1. updated_at 갱신 함수
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updated_at := now();
+  RETURN NEW;
+END;
+$$;
+
+-- 2. documents / folders 트리거
+DROP TRIGGER IF EXISTS trg_documents_set_updated_at ON documents;
+CREATE TRIGGER trg_documents_set_updated_at
+BEFORE INSERT OR UPDATE ON documents
+FOR EACH ROW
+EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_folders_set_updated_at ON folders;
+CREATE TRIGGER trg_folders_set_updated_at
+BEFORE INSERT OR UPDATE ON folders
+FOR EACH ROW
+EXECUTE FUNCTION set_updated_at();
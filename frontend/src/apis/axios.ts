@@ -44,4 +44,44 @@ client.interceptors.response.use(
   }
 );
 
-export { client };
+// ETag 조건부 GET 캐시
+// API 호출은 서버 액션('use server')에서 Node axios로 실행되어 브라우저 HTTP 캐시를 거치지 않으므로,
+// 마지막 응답의 ETag와 본문을 보관했다가 If-None-Match로 재검증하고 304면 보관한 본문을 재사용합니다.
+const ETAG_CACHE_MAX_ENTRIES = 500;
+const etagCache = new Map<string, { etag: string; data: any }>();
+
+async function conditionalGet<T = any>(url: string, params: Record<string, string | number | undefined> = {}): Promise<T> {
+  const definedParams = Object.entries(params)
+    .filter(([, value]) => value !== undefined)
+    .sort(([a], [b]) => a.localeCompare(b)) as Array<[string, string | number]>;
+  const key = `${url}?${new URLSearchParams(definedParams.map(([name, value]) => [name, String(value)])).toString()}`;
+  const cached = etagCache.get(key);
+
+  const response = await client.get(url, {
+    params: Object.fromEntries(definedParams),
+    headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+
+  if (response.status === 304 && cached) {
+    // 최근 사용 순서 갱신 (Map은 삽입 순서를 유지)
+    etagCache.delete(key);
+    etagCache.set(key, cached);
+    return cached.data as T;
+  }
+
+  const etag = response.headers['etag'];
+  etagCache.delete(key);
+  if (etag) {
+    etagCache.set(key, { etag, data: response.data });
+    if (etagCache.size > ETAG_CACHE_MAX_ENTRIES) {
+      const oldestKey = etagCache.keys().next().value;
+      if (oldestKey !== undefined) {
+        etagCache.delete(oldestKey);
+      }
+    }
+  }
+  return response.data as T;
+}
+
+export { client, conditionalGet };
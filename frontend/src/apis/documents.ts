@@ -1,6 +1,6 @@
 // 문서 관련 API 호출 함수
 
-import { client } from './axios';
+import { client, conditionalGet } from './axios';
 
 /**
  * 문서 파일을 백엔드에 업로드합니다.
@@ -41,23 +41,36 @@ export async function uploadDocumentToBackend(
 }
 
 /**
- * 문서 목록을 조회합니다.
+ * 문서 목록을 한 페이지 조회합니다.
+ * 백엔드는 커서 기반 페이지네이션으로 응답하므로, 다음 페이지는 반환된 nextCursor로 다시 요청합니다.
  */
 export async function getDocumentsFromBackend(
   userId: string = '00000000-0000-0000-0000-000000000001',  // UUID 형식
-  folderId?: string  // UUID 형식
-): Promise<{ success: boolean; documents?: any[]; error?: string }> {
+  folderId?: string,  // UUID 형식
+  options: { status?: string[]; pageSize?: number; cursor?: string } = {}
+): Promise<{ success: boolean; documents?: any[]; nextCursor?: string | null; error?: string }> {
   try {
-    const params: { user_id: string; folder_id?: string } = { user_id: userId };
+    const params: Record<string, string | number | undefined> = { user_id: userId };
     if (folderId) {
       params.folder_id = folderId;
     }
+    if (options.status && options.status.length > 0) {
+      params.status = options.status.join(',');
+    }
+    if (options.pageSize) {
+      params.limit = options.pageSize;
+    }
+    if (options.cursor) {
+      params.cursor = options.cursor;
+    }
 
-    const response = await client.get('/api/documents/list', { params });
+    // 변경이 없으면 백엔드가 304로 응답하고 보관한 응답을 재사용
+    const data = await conditionalGet('/api/documents/list', params);
 
     return {
       success: true,
-      documents: response.data.documents || [],
+      documents: data.documents || [],
+      nextCursor: data.has_more ? data.next_cursor : null,
     };
   } catch (error: any) {
     console.error('❌ 문서 목록 조회 실패:', error);
@@ -76,13 +89,11 @@ export async function getFoldersFromBackend(
   userId: string = '00000000-0000-0000-0000-000000000001'  // UUID 형식
 ): Promise<{ success: boolean; folders?: any[]; error?: string }> {
   try {
-    const response = await client.get('/api/documents/folders', {
-      params: { user_id: userId },
-    });
+    const data = await conditionalGet('/api/documents/folders', { user_id: userId });
 
     return {
       success: true,
-      folders: response.data.folders || [],
+      folders: data.folders || [],
     };
   } catch (error: any) {
     console.error('❌ 폴더 목록 조회 실패:', error);
@@ -127,16 +138,40 @@ export async function getDocumentStatusFromBackend(
   userId: string = '00000000-0000-0000-0000-000000000001'  // UUID 형식
 ): Promise<{ success: boolean; status?: string; error?: string }> {
   try {
-    const response = await client.get(`/api/documents/status/${documentId}`, {
+    const data = await conditionalGet(`/api/documents/status/${documentId}`, { user_id: userId });
+
+    return {
+      success: true,
+      status: data.status,
+    };
+  } catch (error: any) {
+    console.error('❌ 문서 상태 조회 실패:', error);
+    const errorMessage = error.response?.data?.detail || error.message || '알 수 없는 오류가 발생했습니다.';
+    return {
+      success: false,
+      error: errorMessage,
+    };
+  }
+}
+
+/**
+ * 여러 문서의 인덱싱 상태를 한 번에 조회합니다.
+ */
+export async function getDocumentStatusesFromBackend(
+  documentIds: string[],  // UUID 형식
+  userId: string = '00000000-0000-0000-0000-000000000001'  // UUID 형식
+): Promise<{ success: boolean; statuses?: Array<{ document_id: string; folder_id: string | null; status: string }>; error?: string }> {
+  try {
+    const response = await client.post('/api/documents/status/bulk', { document_ids: documentIds }, {
       params: { user_id: userId },
     });
 
     return {
       success: true,
-      status: response.data.status,
+      statuses: response.data.statuses || [],
     };
   } catch (error: any) {
-    console.error('❌ 문서 상태 조회 실패:', error);
+    console.error('❌ 문서 상태 일괄 조회 실패:', error);
     const errorMessage = error.response?.data?.detail || error.message || '알 수 없는 오류가 발생했습니다.';
     return {
       success: false,
@@ -8,6 +8,7 @@ export {
   getFoldersFromBackend,
   deleteDocumentFromBackend,
   getDocumentStatusFromBackend,
+  getDocumentStatusesFromBackend,
   queryDocumentsFromBackend
 } from './documents';
 
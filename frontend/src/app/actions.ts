@@ -7,6 +7,7 @@ import {
   getFoldersFromBackend,
   deleteDocumentFromBackend,
   getDocumentStatusFromBackend,
+  getDocumentStatusesFromBackend,
   queryDocumentsFromBackend
 } from '@/apis';
 
@@ -78,20 +79,23 @@ export async function getFolders(): Promise<Folder[]> {
 }
 
 /**
- * 문서 목록 조회
- * 백엔드 API에서 문서 목록을 가져옵니다.
+ * 문서 목록 조회 (한 페이지)
+ * 백엔드 API에서 문서 목록을 가져옵니다. 다음 페이지는 반환된 nextCursor로 조회합니다.
  */
-export async function getDocuments(folderId?: string): Promise<Document[]> {
+export async function getDocuments(
+  folderId?: string,
+  cursor?: string
+): Promise<{ documents: Document[]; nextCursor: string | null }> {
   try {
     // 루트 폴더 ID인 경우 folderId를 undefined로 처리 (folder_id가 NULL인 문서 조회)
     const ROOT_FOLDER_ID = '00000000-0000-0000-0000-000000000000';
     const actualFolderId = folderId === ROOT_FOLDER_ID ? undefined : folderId;
     
-    const result = await getDocumentsFromBackend(DEFAULT_USER_ID, actualFolderId);
+    const result = await getDocumentsFromBackend(DEFAULT_USER_ID, actualFolderId, { cursor });
     
     if (!result.success) {
       console.error('❌ 문서 목록 조회 실패:', result.error);
-      return [];
+      return { documents: [], nextCursor: null };
     }
 
     // 백엔드 응답을 Frontend Document 타입으로 변환
@@ -115,10 +119,10 @@ export async function getDocuments(folderId?: string): Promise<Document[]> {
         uploadedAt: new Date(doc.created_at),
       };
     });
-    return documents;
+    return { documents, nextCursor: result.nextCursor || null };
   } catch (error) {
     console.error('❌ 문서 목록 조회 실패:', error);
-    return [];
+    return { documents: [], nextCursor: null };
   }
 }
 
@@ -169,6 +173,33 @@ export async function getDocumentStatus(
   }
 }
 
+/**
+ * 여러 문서의 인덱싱 상태를 한 번에 조회합니다.
+ * 반환값: 문서 ID → 상태 (조회 실패 시 빈 객체)
+ */
+export async function getDocumentStatuses(
+  documentIds: string[]
+): Promise<Record<string, string>> {
+  if (documentIds.length === 0) {
+    return {};
+  }
+  try {
+    const result = await getDocumentStatusesFromBackend(documentIds, DEFAULT_USER_ID);
+    if (!result.success) {
+      console.error('❌ 문서 상태 일괄 조회 실패:', result.error);
+      return {};
+    }
+    const statuses: Record<string, string> = {};
+    for (const item of result.statuses || []) {
+      statuses[item.document_id] = item.status;
+    }
+    return statuses;
+  } catch (error) {
+    console.error('문서 상태 일괄 조회 실패:', error);
+    return {};
+  }
+}
+
 /**
  * RAG 기반 초안 생성
  * 폴더별로 인덱싱된 PDF 문서들에서 질문에 대한 답변을 생성합니다.
@@ -7,7 +7,7 @@ import { Workspace } from '@/components/Workspace/Workspace';
 import { EvidencePanel } from '@/components/Evidence/EvidencePanel';
 import { SvgIcon } from '@/components/icons';
 import { Folder, DraftResult, Document } from '@/types';
-import { uploadDocument, getFolders, getDocuments, generateDraft, deleteDocument, getDocumentStatus } from '@/app/actions';
+import { uploadDocument, getFolders, getDocuments, generateDraft, deleteDocument, getDocumentStatuses } from '@/app/actions';
 
 export function Dashboard() {
   const [folders, setFolders] = useState<Folder[]>([]);
@@ -32,7 +32,7 @@ export function Dashboard() {
   // 인덱싱 중인 문서들의 상태를 주기적으로 확인하는 함수
   const checkDocumentStatuses = useCallback(async () => {
     // 현재 폴더 상태를 기반으로 처리 중인 문서 찾기 (uploaded 또는 processing 상태)
-    const processingDocuments: Array<{ documentId: string; folderId: string }> = [];
+    const processingDocuments: Array<{ documentId: string; folderId: string; status: string }> = [];
     
     folders.forEach(folder => {
       folder.documents.forEach(doc => {
@@ -40,28 +40,42 @@ export function Dashboard() {
           processingDocuments.push({
             documentId: doc.id,
             folderId: folder.id,
+            status: doc.status,
           });
         }
       });
     });
 
-    // 각 문서의 상태를 확인하고 업데이트
-    for (const { documentId, folderId } of processingDocuments) {
-      const statusResult = await getDocumentStatus(documentId);
-      
-      if (statusResult.success && statusResult.status) {
-        // 상태가 변경되었으면 문서 목록 업데이트
-        // uploaded -> processing -> completed/failed로 변경되는 경우 모두 업데이트
-        const documents = await getDocuments(folderId);
-        setFolders(prevFolders => 
-          prevFolders.map(f => 
-            f.id === folderId 
-              ? { ...f, documents }
-              : f
-          )
-        );
-      }
+    if (processingDocuments.length === 0) {
+      return;
     }
+
+    // 모든 문서의 상태를 한 번의 요청으로 확인
+    const statuses = await getDocumentStatuses(processingDocuments.map(doc => doc.documentId));
+
+    // 상태가 변경된 문서만 그 자리에서 업데이트 (불러온 페이지를 유지하기 위해 목록은 다시 조회하지 않음)
+    // uploaded -> processing -> completed/failed로 변경되는 경우 모두 업데이트
+    const changedFolderIds = new Set(
+      processingDocuments
+        .filter(doc => statuses[doc.documentId] && statuses[doc.documentId] !== doc.status)
+        .map(doc => doc.folderId)
+    );
+    if (changedFolderIds.size === 0) {
+      return;
+    }
+
+    setFolders(prevFolders =>
+      prevFolders.map(f =>
+        changedFolderIds.has(f.id)
+          ? {
+              ...f,
+              documents: f.documents.map(doc =>
+                statuses[doc.id] ? { ...doc, status: statuses[doc.id] as Document['status'] } : doc
+              ),
+            }
+          : f
+      )
+    );
   }, [folders]);
 
   // 인덱싱 중인 문서들의 상태를 주기적으로 확인
@@ -105,11 +119,11 @@ export function Dashboard() {
         );
         
         for (const folderId of foldersToLoad) {
-          const documents = await getDocuments(folderId);
+          const { documents, nextCursor } = await getDocuments(folderId);
           setFolders(prevFolders => 
             prevFolders.map(f => 
               f.id === folderId 
-                ? { ...f, documents }
+                ? { ...f, documents, nextCursor }
                 : f
             )
           );
@@ -126,17 +140,39 @@ export function Dashboard() {
   };
 
   const handleLoadDocuments = async (folderId: string) => {
-    // 폴더 확장 시 해당 폴더의 문서를 불러와서 폴더 객체에 추가
-    const documents = await getDocuments(folderId);
+    // 폴더 확장 시 해당 폴더의 첫 페이지 문서를 불러와서 폴더 객체에 추가
+    const { documents, nextCursor } = await getDocuments(folderId);
     setFolders(prevFolders => 
       prevFolders.map(folder => 
         folder.id === folderId 
-          ? { ...folder, documents }
+          ? { ...folder, documents, nextCursor }
           : folder
       )
     );
   };
 
+  const handleLoadMoreDocuments = async (folderId: string) => {
+    // '더 보기' 클릭 시 다음 페이지 문서를 이어 붙임
+    const cursor = folders.find(folder => folder.id === folderId)?.nextCursor;
+    if (!cursor) {
+      return;
+    }
+    const { documents, nextCursor } = await getDocuments(folderId, cursor);
+    setFolders(prevFolders => 
+      prevFolders.map(folder => {
+        if (folder.id !== folderId) {
+          return folder;
+        }
+        const loadedIds = new Set(folder.documents.map(doc => doc.id));
+        return {
+          ...folder,
+          documents: [...folder.documents, ...documents.filter(doc => !loadedIds.has(doc.id))],
+          nextCursor,
+        };
+      })
+    );
+  };
+
   const handleDocumentUpload = async (file: File, folderId: string | null) => {
     // folderId가 null이면 '최근 문서함' 폴더를 찾아서 사용
     let targetFolderId = folderId;
@@ -198,6 +234,7 @@ export function Dashboard() {
           onFolderSelect={handleFolderSelect}
           onDocumentUpload={handleDocumentUpload}
           onLoadDocuments={handleLoadDocuments}
+          onLoadMoreDocuments={handleLoadMoreDocuments}
           onDocumentDelete={handleDocumentDelete}
           isLoadingFolders={isLoadingFolders}
           onToggleFolder={(id: string) => {
@@ -15,6 +15,7 @@ type FolderTreeProps = {
   onFolderSelect: (id: string | null) => void;
   onToggleFolder: (id: string) => void;
   onLoadDocuments?: (folderId: string) => Promise<void>;  // 폴더 확장 시 문서 로드
+  onLoadMoreDocuments?: (folderId: string) => Promise<void>;  // 다음 페이지 문서 로드
   onDocumentDelete?: (documentId: string, folderId: string) => Promise<void>;  // 문서 삭제 핸들러
 };
 
@@ -37,10 +38,12 @@ export function FolderTree({
   onFolderSelect,
   onToggleFolder,
   onLoadDocuments,
+  onLoadMoreDocuments,
   onDocumentDelete,
 }: FolderTreeProps) {
   const theme = useTheme();
   const [selectedDocumentId, setSelectedDocumentId] = useState<string | null>(null);
+  const [loadingMoreFolderId, setLoadingMoreFolderId] = useState<string | null>(null);
 
   // 계층 구조를 위한 정렬 (parentId가 null인 것부터, 그 다음 자식들)
   const sortedFolders = [...folders].sort((a, b) => {
@@ -71,6 +74,18 @@ export function FolderTree({
     }
   };
 
+  const handleLoadMoreClick = async (folderId: string) => {
+    if (!onLoadMoreDocuments || loadingMoreFolderId) {
+      return;
+    }
+    setLoadingMoreFolderId(folderId);
+    try {
+      await onLoadMoreDocuments(folderId);
+    } finally {
+      setLoadingMoreFolderId(null);
+    }
+  };
+
   const handleDeleteClick = async (e: React.MouseEvent, documentId: string, folderId: string) => {
     e.stopPropagation(); // 문서 클릭 이벤트 전파 방지
     
@@ -131,6 +146,14 @@ export function FolderTree({
                     </DocumentItem>
                   );
                 })}
+                {folder.nextCursor && onLoadMoreDocuments && (
+                  <LoadMoreButton
+                    onClick={() => handleLoadMoreClick(folder.id)}
+                    disabled={loadingMoreFolderId === folder.id}
+                  >
+                    {loadingMoreFolderId === folder.id ? '불러오는 중...' : '더 보기'}
+                  </LoadMoreButton>
+                )}
               </DocumentList>
             )}
           </FolderItem>
@@ -247,6 +270,28 @@ const StatusIconWrapper = styled.div`
   margin-left: 0.25rem;
 `;
 
+const LoadMoreButton = styled.button`
+  padding: 0.375rem 0.5rem;
+  background: none;
+  border: none;
+  border-radius: ${({ theme }) => theme.borderRadius.sm};
+  ${({ theme }) => theme.fonts.Body2};
+  font-size: 0.875rem;
+  color: ${({ theme }) => theme.colors.Primary};
+  text-align: left;
+  cursor: pointer;
+  transition: background-color 0.2s;
+
+  &:hover:not(:disabled) {
+    background-color: ${({ theme }) => theme.colors.Slate50};
+  }
+
+  &:disabled {
+    color: ${({ theme }) => theme.colors.Slate400};
+    cursor: default;
+  }
+`;
+
 const DeleteButton = styled.button`
   flex-shrink: 0;
   padding: 0.25rem 0.5rem;
@@ -18,6 +18,7 @@ type KnowledgeSidebarProps = {
   onFolderSelect: (id: string | null) => void;
   onDocumentUpload: (file: File, folderId: string | null) => Promise<void>;
   onLoadDocuments?: (folderId: string) => Promise<void>;  // 폴더 확장 시 문서 로드
+  onLoadMoreDocuments?: (folderId: string) => Promise<void>;  // 다음 페이지 문서 로드
   onDocumentDelete?: (documentId: string, folderId: string) => Promise<void>;  // 문서 삭제 핸들러
   onToggleFolder: (id: string) => void;
   isLoadingFolders?: boolean;  // 폴더 목록 로딩 상태
@@ -30,6 +31,7 @@ export function KnowledgeSidebar({
   onFolderSelect,
   onDocumentUpload,
   onLoadDocuments,
+  onLoadMoreDocuments,
   onDocumentDelete,
   onToggleFolder,
   isLoadingFolders = false,
@@ -115,6 +117,7 @@ export function KnowledgeSidebar({
               onFolderSelect={onFolderSelect}
               onToggleFolder={onToggleFolder}
               onLoadDocuments={onLoadDocuments}
+              onLoadMoreDocuments={onLoadMoreDocuments}
               onDocumentDelete={onDocumentDelete}
             />
           )}
@@ -44,6 +44,7 @@ export type Folder = {
   parentId: string | null;  // UUID 형식, NULL이면 루트 폴더
   documentCount: number;
   documents: Document[];  // 클라이언트에서 필요시 로드
+  nextCursor?: string | null;  // 다음 문서 페이지 커서 (null이면 모든 문서를 불러옴)
 };
 
 export type User = {